@@ -0,0 +1,237 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent import futures
+from typing import Callable, Iterable, Iterator, TextIO
+
+from pkg import conf, logs
+
+# recognizes and translates image files without a window, e.g. an archive of screenshots:
+# whole files are recognized by a pool of worker processes, texts are translated by a few threads,
+# and every file becomes one json line {"path", "lang", "text", "translated", "ocr_ms", "translate_ms"},
+# or {"path", "error"}, as soon as it is done or in the order of the input.
+# --resume skips files an earlier run into the same output already did, failed files are tried again
+# and end up in the output once
+# usage: python batch.py [-o results.jsonl] [--resume] [--unordered] [--lang eng] [--to zh] [-j 8] <file or dir>...
+
+Recognize = Callable[[str], tuple[str, str]]
+
+
+def find(inputs: Iterable[str], extensions: Iterable[str]) -> Iterator[str]:
+    # files in the order given, directories walked in name order
+    extensions = {ext.lower() for ext in extensions}
+    for path in inputs:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if os.path.splitext(name)[1].lower() in extensions:
+                    yield os.path.join(root, name)
+
+
+def load_done(output: str) -> set[str]:
+    # absolute paths of the files with a result in output. the lines of failed files and a line cut off by
+    # an interrupted run are removed, so that the next run appends the files it tries again once
+    done = set()
+    if not os.path.exists(output):
+        return done
+
+    with open(output, "rb") as f:
+        data = f.read()
+    kept = []
+    for line in data.splitlines(keepends=True):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if not line.endswith(b"\n") or "error" in record:
+            continue
+        path = os.path.abspath(record["path"])
+        if path not in done:
+            done.add(path)
+            kept.append(line)
+
+    kept = b"".join(kept)
+    if kept != data:
+        # replaced in one step, an interrupted rewrite leaves the old output
+        tmp = output + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(kept)
+        os.replace(tmp, output)
+    return done
+
+
+def recognize(path: str) -> tuple[str, str]:
+    # (text, tesseract language) of an image file, runs in a worker process
+    from pkg import ocr
+    result = ocr.read_file(path)
+    return result.text.strip(), result.lang
+
+
+def _init_worker(ocr_conf: dict):
+    # spawned workers start from the conf files, the command line settings are passed on.
+    # files are the unit of parallelism, blocks of one file are not recognized in parallel again
+    for name, value in ocr_conf.items():
+        setattr(conf.ocr, name, value)
+    conf.ocr.workers = 1
+
+
+def _timed(fn: Recognize, path: str) -> tuple[str, str, float]:
+    start = time.perf_counter()
+    text, lang = fn(path)
+    return text, lang, time.perf_counter() - start
+
+
+class _Item:
+    __slots__ = ("index", "record", "recognized")
+
+    def __init__(self, index: int, path: str):
+        self.index = index
+        self.record = {"path": path}
+        # once set, the pending future of the item is its translation
+        self.recognized = False
+
+
+class Batch:
+    def __init__(self, recognize_fn: Recognize | None = None, workers: int = 0, translate_workers: int = 4,
+                 ordered: bool = True, translate: bool = True):
+        # recognize_fn runs in the worker processes and must be picklable, a module level function,
+        # recognize by default. ordered writes results in input order, holding back the ones that finish early
+        self.recognize_fn = recognize_fn if recognize_fn is not None else recognize
+        self.workers = workers if workers > 0 else os.cpu_count() or 1
+        self.translate_workers = translate_workers
+        self.ordered = ordered
+        self.translate = translate
+        # files between being read and being written at most, bounds the memory of a huge input
+        self.max_pending = self.workers * 4
+        self.done = 0
+        self.failed = 0
+
+    def run(self, paths: Iterable[str], write: Callable[[dict], None]):
+        ocr_conf = {name: value for name, value in vars(conf.ocr).items() if not name.startswith("_")}
+        # spawned rather than forked, the logging and translate threads of this process are not safe to fork
+        ocr_pool = futures.ProcessPoolExecutor(self.workers, multiprocessing.get_context("spawn"),
+                                               initializer=_init_worker, initargs=(ocr_conf,))
+        translate_pool = futures.ThreadPoolExecutor(self.translate_workers, thread_name_prefix="batch-translate")
+        logs.info(f"batch with {self.workers} ocr workers and {self.translate_workers} translate workers")
+
+        paths = iter(enumerate(paths))
+        pending: dict[futures.Future, _Item] = {}
+        finished: dict[int, dict] = {}
+        submitted = written = 0
+        try:
+            while True:
+                while submitted - written < self.max_pending:
+                    entry = next(paths, None)
+                    if entry is None:
+                        break
+                    item = _Item(*entry)
+                    pending[ocr_pool.submit(_timed, self.recognize_fn, item.record["path"])] = item
+                    submitted += 1
+                if not pending:
+                    break
+
+                done, _ = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+                for future in done:
+                    item = pending.pop(future)
+                    if self._on_done(item, future):
+                        pending[translate_pool.submit(self._translate, item.record)] = item
+                        continue
+
+                    if not self.ordered:
+                        write(item.record)
+                        written += 1
+                        continue
+                    finished[item.index] = item.record
+                    while written in finished:
+                        write(finished.pop(written))
+                        written += 1
+        finally:
+            ocr_pool.shutdown(wait=False, cancel_futures=True)
+            translate_pool.shutdown(wait=False, cancel_futures=True)
+
+    def _on_done(self, item: _Item, future: futures.Future) -> bool:
+        # True when the item is recognized and still to be translated
+        record = item.record
+        try:
+            result = future.result()
+        except Exception as e:
+            # a text that failed to translate is kept, the file is tried again on resume anyway
+            logs.warning(f"failed to process {record['path']}: {e}")
+            record["error"] = f"{type(e).__name__}: {e}"
+            self.failed += 1
+            return False
+
+        if not item.recognized:
+            item.recognized = True
+            text, lang, elapsed = result
+            record.update(lang=lang, text=text, translated="", ocr_ms=round(elapsed * 1000, 2))
+            if self.translate and text:
+                return True
+        self.done += 1
+        return False
+
+    @staticmethod
+    def _translate(record: dict):
+        from pkg import ocr, translator
+        start = time.perf_counter()
+        record["translated"] = translator.translate(record["text"], ocr.translator_lang(record["lang"]))
+        record["translate_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="recognize and translate image files")
+    parser.add_argument("inputs", nargs="+", help="image files and directories")
+    parser.add_argument("-o", "--output", help="json lines file, stdout if not given")
+    parser.add_argument("--resume", action="store_true", help="skip files already in the output")
+    parser.add_argument("--unordered", action="store_true", help="write results as they finish")
+    parser.add_argument("--lang", default=conf.ocr.from_lang, help="tesseract language, or auto")
+    parser.add_argument("--to", default=conf.ocr.to_lang, help="language to translate to")
+    parser.add_argument("--no-translate", action="store_true")
+    parser.add_argument("-j", "--workers", type=int, default=conf.batch.workers, help="ocr processes, 0 for every core")
+    parser.add_argument("--translate-workers", type=int, default=conf.batch.translate_workers)
+    args = parser.parse_args()
+    if args.resume and not args.output:
+        parser.error("--resume needs --output")
+
+    logs.init(level=logs.INFO)
+    conf.ocr.from_lang = args.lang
+    conf.ocr.to_lang = args.to
+
+    paths: Iterable[str] = find(args.inputs, conf.batch.extensions)
+    if args.resume:
+        done = load_done(args.output)
+        logs.info(f"resume after {len(done)} files")
+        paths = (p for p in paths if os.path.abspath(p) not in done)
+
+    out: TextIO = open(args.output, "a" if args.resume else "w", encoding="utf-8") if args.output else sys.stdout
+
+    def write(record: dict):
+        # a line at a time, an interrupted run leaves complete lines behind
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+
+    batch = Batch(workers=args.workers, translate_workers=args.translate_workers,
+                  ordered=not args.unordered, translate=not args.no_translate)
+    start = time.perf_counter()
+    try:
+        batch.run(paths, write)
+    except KeyboardInterrupt:
+        logs.warning("interrupted, run again with --resume to continue")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    logs.info(f"{batch.done} files done, {batch.failed} failed in {elapsed:.1f}s, "
+              f"{batch.done / max(elapsed, 1e-9):.1f} files per second")
+    logs.shutdown()
+    sys.exit(1 if batch.failed else 0)
+
+
+if __name__ == '__main__':
+    main()
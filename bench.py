@@ -0,0 +1,235 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+# must be set before Qt is imported, the suite runs without a display
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6 import QtWidgets, QtGui, QtCore
+
+from pkg import logs, conf, ocr, translator, trace
+from pkg.ocr import samples
+from pkg.translator import local_server
+
+# end-to-end benchmark of the clip pipeline on synthetic screenshots:
+# showing the ClipWindow, rect scaling, pixmap copy, ocr.from_qpixmap, the first streamed segment of
+# translator.translate_iter and the whole translator.translate
+# against a local stand-in service. per-stage p50/p95/p99 latency and peak memory go to a json file
+# usage: python bench.py [-n 20] [-o bench_result.json] [--font font.ttf] [--compare old.json]
+
+STAGES = ["window", "scale_rect", "copy", "ocr", "translate_first", "translate"]
+
+TEXTS = {
+    "eng": "The quick brown fox jumps over the lazy dog",
+    "deu": "Zwölf Boxkämpfer jagen Viktor quer über den großen Sylter Deich",
+    "fra": "Portez ce vieux whisky au juge blond qui fume",
+    "spa": "El veloz murciélago hindú comía feliz cardillo y kiwi",
+}
+
+REGIONS = {
+    # name -> (screen size, clipped region size)
+    "word": ((1920, 1080), (240, 60)),
+    "line": ((1920, 1080), (1200, 80)),
+    "paragraph": ((1920, 1080), (1200, 400)),
+    "full_4k": ((3840, 2160), (3840, 2160)),
+}
+
+
+class Case:
+    def __init__(self, lang: str, font_size: int, region: str, font_path: str | None):
+        self.lang = lang
+        self.font_size = font_size
+        self.region = region
+        self.font_path = font_path
+        self.name = f"{lang}/{font_size}px/{region}" + (f"/{os.path.basename(font_path)}" if font_path else "")
+
+    def screenshot(self) -> tuple[QtGui.QPixmap, QtCore.QRect]:
+        (screen_w, screen_h), (clip_w, clip_h) = REGIONS[self.region]
+        lines = max(1, (clip_h - 20) // int(self.font_size * 1.4))
+        text = "\n".join([TEXTS[self.lang]] * lines)
+        left, top = (screen_w - clip_w) // 2, (screen_h - clip_h) // 2
+        img = samples.render_text(text, size=(screen_w, screen_h), font_size=self.font_size,
+                                  origin=(left + 10, top + 10), font_path=self.font_path)
+        qimg = QtGui.QImage(img.tobytes(), screen_w, screen_h, screen_w * 3, QtGui.QImage.Format.Format_RGB888)
+        # screen grabs are 32-bit pixmaps
+        return QtGui.QPixmap.fromImage(qimg.convertToFormat(QtGui.QImage.Format.Format_RGB32)), \
+            QtCore.QRect(left, top, clip_w, clip_h)
+
+
+def run_once(case: Case, window, pixmap: QtGui.QPixmap, screen_rect: QtCore.QRect, use_ocr: bool,
+             measure: Callable[[str, Callable], object]):
+    # the clip window is built once and reused like in the app, "window" is the time to show it with a screenshot
+    measure("window", lambda: window.open(pixmap))
+    # the user drags in widget coordinates, which are scaled back to the screenshot
+    x_scale = window.clipper.width() / pixmap.width()
+    y_scale = window.clipper.height() / pixmap.height()
+    widget_rect = QtCore.QRect(int(screen_rect.x() * x_scale), int(screen_rect.y() * y_scale),
+                               int(screen_rect.width() * x_scale), int(screen_rect.height() * y_scale))
+
+    rect = measure("scale_rect", lambda: window._scale_rect_by_size(widget_rect))
+    clipped = measure("copy", lambda: window.img.copy(rect))
+    text = measure("ocr", lambda: ocr.from_qpixmap(clipped)) if use_ocr else TEXTS[case.lang]
+    # the first translated segment is what the user sees first, the rest of the stream is not timed
+    segments = translator.translate_iter(text)
+    measure("translate_first", lambda: next(segments, None))
+    for _ in segments:
+        pass
+    measure("translate", lambda: translator.translate(text))
+    window.close()
+    QtWidgets.QApplication.processEvents()
+
+
+def run_case(case: Case, n: int, use_ocr: bool) -> dict:
+    from component import clip_window
+
+    pixmap, screen_rect = case.screenshot()
+    window = clip_window.ClipWindow()
+    latencies: dict[str, list[float]] = {stage: [] for stage in STAGES}
+
+    def timed(stage: str, fn: Callable):
+        start = time.perf_counter()
+        result = fn()
+        latencies[stage].append(time.perf_counter() - start)
+        return result
+
+    for _ in range(n):
+        run_once(case, window, pixmap, screen_rect, use_ocr, timed)
+
+    # one more pass under tracemalloc for the peak memory of every stage, kept out of the latencies
+    peaks: dict[str, int] = {}
+
+    def traced(stage: str, fn: Callable):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        result = fn()
+        peaks[stage] = tracemalloc.get_traced_memory()[1] - before
+        return result
+
+    tracemalloc.start()
+    run_once(case, window, pixmap, screen_rect, use_ocr, traced)
+    tracemalloc.stop()
+    window.deleteLater()
+
+    stages = {}
+    for stage, values in latencies.items():
+        if not values:
+            continue
+        ordered = sorted(values)
+        stages[stage] = {
+            "n": len(values),
+            "p50_ms": trace.nearest_rank(ordered, 50) * 1000,
+            "p95_ms": trace.nearest_rank(ordered, 95) * 1000,
+            "p99_ms": trace.nearest_rank(ordered, 99) * 1000,
+            "mean_ms": sum(values) / len(values) * 1000,
+            "peak_alloc_kb": peaks.get(stage, 0) / 1024,
+        }
+    return {"name": case.name, "lang": case.lang, "font_size": case.font_size, "region": case.region,
+            "stages": stages}
+
+
+def peak_rss_kb() -> int:
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macos, kilobytes on linux
+    return usage // 1024 if sys.platform == "darwin" else usage
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ""
+
+
+def compare(old_path: str, result: dict):
+    with open(old_path) as f:
+        old = json.load(f)
+    old_cases = {case["name"]: case for case in old["cases"]}
+    print(f"compare with {old_path} ({old['meta'].get('commit')})")
+    for case in result["cases"]:
+        old_case = old_cases.get(case["name"])
+        if old_case is None:
+            continue
+        for stage, stats in case["stages"].items():
+            old_stats = old_case["stages"].get(stage)
+            if old_stats is None or old_stats["p50_ms"] == 0:
+                continue
+            ratio = stats["p50_ms"] / old_stats["p50_ms"]
+            print(f"{case['name']:>32} {stage:>10}: p50 {old_stats['p50_ms']:9.2f} -> {stats['p50_ms']:9.2f} ms "
+                  f"({ratio:5.2f}x){'  REGRESSION' if ratio > 1.2 else ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=20)
+    parser.add_argument("-o", "--output", default="bench_result.json")
+    parser.add_argument("--langs", default=",".join(TEXTS))
+    parser.add_argument("--font-sizes", default="12,24,48")
+    parser.add_argument("--regions", default=",".join(REGIONS))
+    parser.add_argument("--font", action="append", default=[], help="ttf/otf files, the pillow default if none")
+    parser.add_argument("--compare", help="a previous result file")
+    args = parser.parse_args()
+
+    logs.init(level=logs.WARNING)
+    app = QtWidgets.QApplication(sys.argv)
+
+    # every iteration should pay for the real work, not hit a cache
+    conf.ocr.result_cache_entries = 0
+    conf.translator.cache_path = ""
+    conf.translator.cache_memory_entries = 0
+
+    try:
+        ocr.default_engine()
+        use_ocr = True
+    except ocr.EngineUnavailable as e:
+        logs.warning(f"no ocr engine, the ocr stage is skipped and the expected text is translated: {e}")
+        use_ocr = False
+
+    cases = [
+        Case(lang, int(font_size), region, font_path)
+        for font_path in (args.font or [None])
+        for lang in args.langs.split(",")
+        for font_size in args.font_sizes.split(",")
+        for region in args.regions.split(",")
+    ]
+
+    with local_server.LocalServer() as server:
+        translator.init(translator=translator.new_translator("libre", from_lang="auto", to_lang="zh", url=server.url))
+        results = []
+        for case in cases:
+            result = run_case(case, args.n, use_ocr)
+            results.append(result)
+            print(f"{case.name:>32}: " + ", ".join(
+                f"{stage} {stats['p50_ms']:.2f}/{stats['p95_ms']:.2f}/{stats['p99_ms']:.2f}"
+                for stage, stats in result["stages"].items()) + " ms (p50/p95/p99)")
+
+    result = {
+        "meta": {
+            "commit": git_commit(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "qt_platform": app.platformName(),
+            "ocr": use_ocr,
+            "n": args.n,
+        },
+        "peak_rss_kb": peak_rss_kb(),
+        "cases": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"peak rss {result['peak_rss_kb'] / 1024:.1f} MiB, result is written to {args.output}")
+
+    if args.compare:
+        compare(args.compare, result)
+
+
+if __name__ == '__main__':
+    main()
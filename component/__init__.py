@@ -1,3 +1,4 @@
 from component.main_window import Window
+from component import prewarm
 
-__all__ = ["Window"]
+__all__ = ["Window", "prewarm"]
@@ -0,0 +1,111 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# must be set before Qt is imported
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6 import QtWidgets, QtGui, QtCore
+from PySide6.QtCore import Qt
+
+from component import clip_window
+
+# frame time of dragging a selection over the clipper at several screen resolutions,
+# a selection frame repaints only what changed, a full frame repaints the whole widget.
+# then the time from a clip request to the shown overlay, building a ClipWindow per clip against reusing one
+# usage: python -m component.bench_clipper [-n 200]
+
+RESOLUTIONS = [(1920, 1080), (2560, 1440), (3840, 2160), (7680, 2160)]
+
+
+def _mouse_event(kind: QtCore.QEvent.Type, x: int, y: int) -> QtGui.QMouseEvent:
+    pos = QtCore.QPointF(x, y)
+    return QtGui.QMouseEvent(kind, pos, pos, Qt.MouseButton.LeftButton, Qt.MouseButton.LeftButton,
+                             Qt.KeyboardModifier.NoModifier)
+
+
+def _screenshot(width: int, height: int) -> QtGui.QPixmap:
+    img = QtGui.QImage(width, height, QtGui.QImage.Format.Format_RGB32)
+    painter = QtGui.QPainter(img)
+    gradient = QtGui.QLinearGradient(0, 0, width, height)
+    gradient.setColorAt(0, Qt.GlobalColor.white)
+    gradient.setColorAt(1, Qt.GlobalColor.darkBlue)
+    painter.fillRect(img.rect(), gradient)
+    painter.end()
+    return QtGui.QPixmap.fromImage(img)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=200)
+    args = parser.parse_args()
+
+    app = QtWidgets.QApplication(sys.argv)
+    for width, height in RESOLUTIONS:
+        clipper = clip_window._ImageClipper()
+        clipper.resize(width, height)
+        pixmap = _screenshot(width, height)
+        start = time.perf_counter()
+        clipper.setPixmap(pixmap)
+        clipper.show()
+        app.processEvents()
+        setup = time.perf_counter() - start
+
+        clipper.mousePressEvent(_mouse_event(QtCore.QEvent.Type.MouseButtonPress, 100, 100))
+        app.processEvents()
+        frames = []
+        for i in range(args.n):
+            start = time.perf_counter()
+            clipper.mouseMoveEvent(_mouse_event(QtCore.QEvent.Type.MouseMove, 110 + i * 2, 105 + i))
+            app.processEvents()
+            frames.append(time.perf_counter() - start)
+
+        full = []
+        for _ in range(max(args.n // 10, 1)):
+            start = time.perf_counter()
+            clipper.repaint()
+            full.append(time.perf_counter() - start)
+
+        print(f"{width:>5}x{height:<5}: setup {setup * 1000:7.2f} ms, "
+              f"selection frame p50 {statistics.median(frames) * 1000:6.3f} ms "
+              f"max {max(frames) * 1000:6.3f} ms, full frame p50 {statistics.median(full) * 1000:6.2f} ms")
+        clipper.close()
+        clipper.deleteLater()
+        app.processEvents()
+
+    _bench_open(app, args.n)
+
+
+def _bench_open(app: QtWidgets.QApplication, n: int):
+    size = app.primaryScreen().size()
+    pixmap = _screenshot(size.width(), size.height())
+    reused = clip_window.ClipWindow()
+
+    def per_clip():
+        window = clip_window.ClipWindow(pixmap)
+        app.processEvents()
+        return window
+
+    def reuse():
+        reused.open(pixmap)
+        app.processEvents()
+        return reused
+
+    for label, open_window in (("new window", per_clip), ("reused", reuse)):
+        latencies = []
+        for _ in range(n):
+            start = time.perf_counter()
+            window = open_window()
+            latencies.append(time.perf_counter() - start)
+            window.close()
+            if window is not reused:
+                window.deleteLater()
+            app.processEvents()
+        print(f"{label:>10}: open p50 {statistics.median(latencies) * 1000:6.2f} ms "
+              f"max {max(latencies) * 1000:6.2f} ms at {size.width()}x{size.height()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+import argparse
+import os
+import time
+
+# must be set before Qt is imported
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6 import QtWidgets, QtCore
+
+from component import clip_window
+from pkg import conf, logs, trace
+
+# cpu cost of a pinned region whose content does not change: the region is captured at conf.pin.max_fps
+# and compared with the last capture, nothing is recognized or translated. prints the cpu time per wall second
+# and per capture, and the time spent capturing and diffing
+# usage: python -m component.bench_pinned [--seconds 3] [--fps 4] [--size 1200x120]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--fps", type=float, default=conf.pin.max_fps)
+    parser.add_argument("--size", default="1200x120")
+    args = parser.parse_args()
+
+    logs.init(level=logs.WARNING)
+    trace.enable()
+    conf.pin.max_fps = args.fps
+    width, height = (int(v) for v in args.size.split("x"))
+
+    app = QtWidgets.QApplication([])
+    region = clip_window.PinnedRegion(app.primaryScreen(), QtCore.QRect(100, 100, width, height))
+    QtCore.QTimer.singleShot(int(args.seconds * 1000), app.quit)
+    wall, cpu = time.perf_counter(), time.process_time()
+    app.exec()
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    region.stop()
+
+    capture = trace.histogram("pin.capture").summary()
+    print(f"{args.fps:g} fps, {width}x{height}: {region.captures} captures, {region.recognitions} recognitions, "
+          f"cpu {cpu / wall * 100:.2f}% of one core, {cpu / max(region.captures, 1) * 1000:.2f} ms per capture, "
+          f"capture p50 {capture['p50_ms']:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,18 +1,46 @@
 import enum
 import threading
+import time
+from concurrent import futures
 from typing import override, AnyStr
 
-import win32gui
 from PySide6 import QtWidgets, QtGui, QtCore
 from PySide6.QtCore import Qt
 
 import ui_py
 from component import util
-from pkg import logs, conf, fsm, ocr, translator
+from pkg import logs, conf, fsm, ocr, translator, trace, history
+
+try:
+    import win32gui
+except ImportError:
+    # the foreground window is only restored on windows, elsewhere (e.g. headless benchmarks) it is skipped
+    win32gui = None
+
+
+# clips are recognized on this thread, never on the gui thread: ocr engine handles are per thread, so the one
+# warm_up_ocr creates ahead of the first clip is the one every clip uses
+_ocr_worker = futures.ThreadPoolExecutor(1, thread_name_prefix="clip-ocr")
+
+
+def warm_up_ocr():
+    # blocks until the clip ocr thread has loaded the engine and made its handles, see component.prewarm
+    _ocr_worker.submit(ocr.warm_up).result()
+
+
+class _Relay(QtCore.QObject):
+    # carries the results of one worker task to the gui thread: the worker emits on it and deletes it when done,
+    # the receivers' slots are connected queued, so the worker never touches a widget that may be gone meanwhile
+    recognized_sig = QtCore.Signal(str, str, QtGui.QImage)
+    # (generation, index, translation) of a translated segment, (generation, reason) of a failed translation
+    segment_sig = QtCore.Signal(int, int, str)
+    failed_sig = QtCore.Signal(int, str)
 
 
 class ClipWindow(QtWidgets.QMainWindow):
-    def __init__(self, img: QtGui.QPixmap | QtGui.QImage):
+    # one window is built ahead of time and reused: open() shows it with a new screenshot,
+    # close() hides it and drops the screenshot and the translations of the last clip
+    def __init__(self, img: QtGui.QPixmap | QtGui.QImage | None = None):
         super().__init__(None)  # parent should be None to display in fullscreen
         self.setWindowFlags(
             Qt.WindowType.FramelessWindowHint
@@ -21,15 +49,32 @@ class ClipWindow(QtWidgets.QMainWindow):
         )
         self.resize(self.screen().size())
 
-        self.img = img
-        self.clipper = self._new_clipper(self.img)
-        self._hwnd = win32gui.GetForegroundWindow()
-        self._window_placement = win32gui.GetWindowPlacement(self._hwnd)
+        self.img: QtGui.QPixmap | QtGui.QImage | None = None
+        self.clipper = self._new_clipper()
+        self._hwnd = None
+        self._window_placement = None
+        # regions pinned from this window, they outlive it until their label is closed
+        self.pinned: list[PinnedRegion] = []
 
         confirm_shortcut = QtGui.QShortcut(conf.key.confirm_clip, self)
         confirm_shortcut.activated.connect(self._confirm)
         cancel_shortcut = QtGui.QShortcut(conf.key.cancel_clip, self)
         cancel_shortcut.activated.connect(self._cancel)
+        pin_shortcut = QtGui.QShortcut(conf.key.pin_clip, self)
+        pin_shortcut.activated.connect(self.clipper.pin_sig)
+
+        if img is not None:
+            self.open(img)
+
+    def open(self, img: QtGui.QPixmap | QtGui.QImage):
+        self._hwnd = win32gui.GetForegroundWindow() if win32gui else None
+        self._window_placement = win32gui.GetWindowPlacement(self._hwnd) if win32gui else None
+
+        if self.screen() is not None and self.size() != self.screen().size():
+            self.resize(self.screen().size())
+        self.img = img
+        self.clipper.reset()
+        self.clipper.setPixmap(img)
 
         self.show()
 
@@ -41,23 +86,35 @@ class ClipWindow(QtWidgets.QMainWindow):
             w.height()
         )
 
-    def _new_translated_display_widget(self, text: AnyStr):
+    def _new_translated_display_widget(self, text: AnyStr, from_lang: str | None = None,
+                                       image: QtGui.QImage | None = None):
         text = text.strip()
         if len(text) == 0:
             logs.warning("text length is zero, is not going to show label")
             return
 
-        label = _TranslateLabel(self, text)
+        label = _TranslateLabel(self, text, from_lang, image=image)
+        # a label closed by the user is freed at once, the others go with the clip in close()
+        label.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
         util.center_widget(self.size(), label)
 
     @override
     def close(self):
         self._restore_foreground_window()
-        self.layout().removeWidget(self.clipper)
-        self.clipper = None
         super().close()
 
+        # nothing of the last clip outlives it, the window itself is kept for the next one
+        for label in self.findChildren(_TranslateLabel):
+            label.deleteLater()
+        self.clipper.reset()
+        self.clipper.setPixmap(None)
+        self.img = None
+        self._hwnd = self._window_placement = None
+
     def _restore_foreground_window(self):
+        if win32gui is None or self._hwnd is None:
+            return
+
         window_placement = win32gui.GetWindowPlacement(self._hwnd)
         logs.info(f"window hwnd is {self._hwnd}, before window placement: {self._window_placement}, current window placement: {window_placement}")
         if self._window_placement[1] == window_placement[1]:
@@ -85,17 +142,53 @@ class ClipWindow(QtWidgets.QMainWindow):
             self.close()
             return
 
-        clipped_pixmap = self.img.copy(self._scale_rect_by_size(rect))
-        self._new_translated_display_widget(ocr.from_qpixmap(clipped_pixmap))
+        with trace.span("clip.copy"):
+            image = self.img.copy(self._scale_rect_by_size(rect))
+            if isinstance(image, QtGui.QPixmap):
+                # a pixmap must not leave the gui thread
+                image = image.toImage()
+        relay = _Relay()
+        relay.recognized_sig.connect(self._on_recognized, Qt.ConnectionType.QueuedConnection)
+        _ocr_worker.submit(self._recognize, relay, image)
 
-    def _new_clipper(self, img: QtGui.QPixmap | QtGui.QImage):
+    @staticmethod
+    def _recognize(relay: _Relay, image: QtGui.QImage):
+        try:
+            result = ocr.read_qpixmap(image)
+            relay.recognized_sig.emit(result.text, ocr.translator_lang(result.lang) or "", image)
+        except Exception as e:
+            logs.error("failed to recognize clip: %s", e)
+        finally:
+            # after the queued result, on the gui thread
+            relay.deleteLater()
+
+    @QtCore.Slot(str, str, QtGui.QImage)
+    def _on_recognized(self, text: str, lang: str, image: QtGui.QImage):
+        if self.img is None:
+            # closed while the clip was recognized
+            return
+        self._new_translated_display_widget(text, lang or None, image)
+
+    @QtCore.Slot(QtCore.QRect)
+    def _on_pinned(self, rect: QtCore.QRect):
+        # the region is captured from the live screen, in logical pixels of the screen this window covers
+        region = PinnedRegion(self.screen(), rect)
+        region.closed_sig.connect(lambda: self.pinned.remove(region))
+        self.pinned.append(region)
+        self.close()
+
+    def _new_clipper(self):
         clipper = _ImageClipper(self)
-        clipper.resize(self.size())
-        clipper.setPixmap(img)
         clipper.clipped_sig.connect(self._on_clipped_success)
+        clipper.pinned_sig.connect(self._on_pinned)
         clipper.setGeometry(0, 0, self.width(), self.height())
         return clipper
 
+    @override
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.clipper.setGeometry(0, 0, self.width(), self.height())
+
     def _scale_rect_by_size(self, rect: QtCore.QRect) -> QtCore.QRect:
         img_size = self.img.size()
         clipper_size = self.clipper.size()
@@ -106,25 +199,26 @@ class ClipWindow(QtWidgets.QMainWindow):
         x_scale = img_size.width() / clipper_size.width()
         y_scale = img_size.height() / clipper_size.height()
 
-        logs.debug(f"rect before resize: {rect}")
+        logs.debug("rect before resize: %s", rect)
         rect.setRect(
             int(rect.x() * x_scale),
             int(rect.y() * y_scale),
             int(rect.width() * x_scale),
             int(rect.height() * y_scale),
         )
-        logs.debug(f"rect after resize: {rect}")
+        logs.debug("rect after resize: %s", rect)
         return rect
 
 
-class _ImageClipper(QtWidgets.QLabel):
+class _ImageClipper(QtWidgets.QWidget):
     _CLIPPED_THRESHOLD = 1
     clipped_sig = QtCore.Signal(QtCore.QRect)
+    pinned_sig = QtCore.Signal(QtCore.QRect)
     confirm_sig = QtCore.Signal()
     cancel_sig = QtCore.Signal()
+    pin_sig = QtCore.Signal()
 
-    _OVERLAY_BRUSH = QtGui.QBrush(QtGui.QColor(0, 0, 0, 50))
-    _EMPTY_BRUSH = QtGui.QBrush()
+    _OVERLAY_COLOR = QtGui.QColor(0, 0, 0, 50)
     _BORDER_WIDTH = 1
     _BORDER_PEN = QtGui.QPen(Qt.GlobalColor.red, _BORDER_WIDTH)
 
@@ -141,35 +235,110 @@ class _ImageClipper(QtWidgets.QLabel):
         self._toolkit.confirm_sig.connect(self.confirm_sig)
 
         self._rect = QtCore.QRect()
-        self._overlay_rect = QtCore.QRect()
         self._abs_rect = QtCore.QRect()
-
-        self.confirm_sig.connect(self._confirm)
-        self.cancel_sig.connect(self._cancel)
-
-        self._state_machine = fsm.Machine(
+        # the selection as of the last repaint request
+        self._shown_rect = QtCore.QRect()
+
+        # the screenshot scaled to the widget at device pixel ratio and a darkened copy of it, both are
+        # composited once per pixmap or size, a frame only copies the repainted region out of them
+        self._img: QtGui.QPixmap | None = None
+        self._screen = QtGui.QPixmap()
+        self._dimmed = QtGui.QPixmap()
+        self._composited_key: tuple | None = None
+        # the whole widget is covered by the pixmaps, qt does not need to clear the background first
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+
+        self.confirm_sig.connect(lambda: self._state_machine.post("confirm"))
+        self.cancel_sig.connect(lambda: self._state_machine.post("cancel"))
+        self.pin_sig.connect(lambda: self._state_machine.post("pin"))
+
+        # mouse events, the toolkit buttons and the shortcuts are events of one machine, an event posted while
+        # another is handled, e.g. by a slot of clipped_sig closing the window, runs after it
+        empty, clipping, clipped = self.State.Empty, self.State.Clipping, self.State.Clipped
+        self._state_machine = fsm.EventMachine(
             {
                 fsm.State(
-                    name=self.State.Empty,
+                    name=empty,
                     next_states={"clipping"},
                 ),
                 fsm.State(
-                    name=self.State.Clipping,
+                    name=clipping,
                     next_states={"empty", "clipped"},
                 ),
                 fsm.State(
-                    name=self.State.Clipped,
+                    name=clipped,
                     next_states={"empty", "clipping"},
                     on_enter=self._on_enter_clipped,
                     on_exit=self._on_exit_clipped,
                 ),
             },
-            self.State.Empty
+            empty,
+            [
+                fsm.Transition("press", {empty, clipping, clipped}, clipping, action=self._start),
+                fsm.Transition("move", clipping, clipping, action=self._drag),
+                # a drag that began outside the clipper
+                fsm.Transition("move", {empty, clipped}, clipping, action=self._start),
+                fsm.Transition("release", clipping, clipped, guard=self._selected),
+                fsm.Transition("release", {empty, clipping, clipped}, empty, guard=self._too_small,
+                               action=self._clear),
+                fsm.Transition("cancel", {empty, clipping, clipped}, empty, action=self._clear),
+                fsm.Transition("confirm", {clipping, clipped}, empty, guard=self._confirmable,
+                               action=lambda _: self._emit_selection(self.clipped_sig)),
+                fsm.Transition("pin", {clipping, clipped}, empty, guard=self._confirmable,
+                               action=lambda _: self._emit_selection(self.pinned_sig)),
+            ],
         )
 
     def state(self):
         return self._state_machine.state()
 
+    def setPixmap(self, img: QtGui.QPixmap | QtGui.QImage | None):
+        self._img = QtGui.QPixmap.fromImage(img) if isinstance(img, QtGui.QImage) else img
+        self._composite()
+        self.update()
+
+    def reset(self):
+        self._reset()
+
+    @override
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._composite()
+
+    def _composite(self):
+        if self._img is None or self.width() == 0 or self.height() == 0:
+            self._screen = self._dimmed = QtGui.QPixmap()
+            self._composited_key = None
+            return
+
+        dpr = self.devicePixelRatioF()
+        size = QtCore.QSize(round(self.width() * dpr), round(self.height() * dpr))
+        key = (self._img.cacheKey(), size.width(), size.height())
+        if key == self._composited_key:
+            return
+
+        # a shallow copy, the device pixel ratio of the caller's pixmap is left alone
+        screen = QtGui.QPixmap(self._img)
+        if screen.size() != size:
+            screen = screen.scaled(size, Qt.AspectRatioMode.IgnoreAspectRatio,
+                                   Qt.TransformationMode.SmoothTransformation)
+        screen.setDevicePixelRatio(dpr)
+
+        dimmed = QtGui.QPixmap(screen)
+        painter = QtGui.QPainter(dimmed)
+        painter.fillRect(QtCore.QRectF(0, 0, self.width(), self.height()), self._OVERLAY_COLOR)
+        painter.end()
+
+        self._screen, self._dimmed = screen, dimmed
+        self._composited_key = key
+
+    def _update_selection(self):
+        # repaint only the union of the old and the new selection, including their borders
+        util.abs_rect(self._rect, self._abs_rect)
+        margin = self._BORDER_WIDTH + 1
+        self.update(self._shown_rect.united(self._abs_rect).adjusted(-margin, -margin, margin, margin))
+        self._shown_rect.setRect(self._abs_rect.x(), self._abs_rect.y(), self._abs_rect.width(), self._abs_rect.height())
+
     def _on_enter_clipped(self, from_state: fsm.Str):
         util.abs_rect(self._rect, self._abs_rect)
         self._toolkit.setGeometry(self._abs_rect.right() - self._toolkit.width() + self._BORDER_WIDTH,
@@ -181,61 +350,54 @@ class _ImageClipper(QtWidgets.QLabel):
     def _on_exit_clipped(self, to_state: fsm.Str):
         self._toolkit.hide()
 
-    def _cancel(self):
-        logs.debug(f"_cancel is called, current state is {self.state()}")
-        self._reset()
+    def _selected(self, _=None) -> bool:
+        return self._clip_area() >= self._CLIPPED_THRESHOLD
 
-    def _confirm(self):
-        logs.debug(f"_confirm is called, current state is {self.state()}")
-        if self.state() in {"clipping", "clipped"}:
-            if self._clip_area() < self._CLIPPED_THRESHOLD:
-                logs.info(f"selected area {self._abs_rect} is too small, please reselect an area")
-                return
-            self._reset()
-            self.clipped_sig.emit(QtCore.QRect(self._abs_rect))
+    def _too_small(self, _=None) -> bool:
+        if self._selected():
+            return False
+        logs.info(f"selected area {self._abs_rect} is too small, reset to zero")
+        return True
+
+    def _confirmable(self, _=None) -> bool:
+        if self._selected():
+            return True
+        logs.info(f"selected area {self._abs_rect} is too small, please reselect an area")
+        return False
+
+    def _start(self, pos: QtCore.QPoint):
+        self._rect.setRect(pos.x(), pos.y(), 0, 0)
+        self._update_selection()
+
+    def _drag(self, pos: QtCore.QPoint):
+        start_x, start_y = self._rect.x(), self._rect.y()
+        self._rect.setRect(start_x, start_y, pos.x() - start_x, pos.y() - start_y)
+        self._update_selection()
+
+    def _clear(self, _=None):
+        self._rect.setRect(0, 0, 0, 0)
+        self._update_selection()
+
+    def _emit_selection(self, sig: QtCore.SignalInstance):
+        # the guard has just measured the selection, the clear resets it
+        rect = QtCore.QRect(self._abs_rect)
+        self._clear()
+        sig.emit(rect)
 
     @override
     def mousePressEvent(self, ev):
-        self._reset()
-        try:
-            self._state_machine.trans_to("clipping")
-            self._rect.setRect(ev.x(), ev.y(), 0, 0)
-        except (fsm.StateNotFound, fsm.StateTransIllegal) as e:
-            logs.error(e)
+        self._state_machine.post("press", ev.position().toPoint())
 
     @override
     def mouseMoveEvent(self, ev):
-        if self.state() != "clipping":
-            try:
-                self._state_machine.trans_to("clipping")
-                self._rect.setRect(ev.x(), ev.y(), 0, 0)
-            except (fsm.StateNotFound, fsm.StateTransIllegal) as e:
-                logs.error(e)
-            return
-
-        start_x, start_y = self._rect.x(), self._rect.y()
-        self._rect.setRect(start_x, start_y, ev.x() - start_x, ev.y() - start_y)
-        self.update()
+        self._state_machine.post("move", ev.position().toPoint())
 
     @override
     def mouseReleaseEvent(self, ev):
-        if self._clip_area() < self._CLIPPED_THRESHOLD:
-            logs.info(f"selected area {self._abs_rect} is too small, reset to zero")
-            self._reset()
-            return
-
-        try:
-            self._state_machine.trans_to("clipped")
-        except (fsm.StateNotFound, fsm.StateTransIllegal) as e:
-            logs.error(e)
+        self._state_machine.post("release")
 
     def _reset(self):
-        try:
-            self._state_machine.trans_to("empty")
-            self._rect.setRect(0, 0, 0, 0)
-            self.update()
-        except (fsm.StateNotFound, fsm.StateTransIllegal) as e:
-            logs.error(e)
+        self._state_machine.post("cancel")
 
     def _clip_area(self) -> int:
         util.abs_rect(self._rect, self._abs_rect)
@@ -243,38 +405,138 @@ class _ImageClipper(QtWidgets.QLabel):
 
     @override
     def paintEvent(self, event):
-        super().paintEvent(event)
         util.abs_rect(self._rect, self._abs_rect)
+        dirty = event.rect()
 
         painter = QtGui.QPainter()
         painter.begin(self)
-        self._draw_outside_overlay(painter, self._abs_rect)
-        self._draw_rect(painter, self._abs_rect)
+        self._draw_pixmap(painter, self._dimmed, dirty)
+        selected = dirty.intersected(self._abs_rect)
+        if not selected.isEmpty():
+            self._draw_pixmap(painter, self._screen, selected)
+        if not self._abs_rect.isEmpty():
+            self._draw_rect(painter, self._abs_rect)
         painter.end()
 
+    @staticmethod
+    def _draw_pixmap(painter: QtGui.QPainter, pixmap: QtGui.QPixmap, rect: QtCore.QRect):
+        if pixmap.isNull():
+            return
+        dpr = pixmap.devicePixelRatio()
+        source = QtCore.QRectF(rect.x() * dpr, rect.y() * dpr, rect.width() * dpr, rect.height() * dpr)
+        painter.drawPixmap(QtCore.QRectF(rect), pixmap, source)
+
     def _draw_rect(self, painter: QtGui.QPainter, rect: QtCore.QRect):
         painter.setPen(self._BORDER_PEN)
         painter.drawRect(rect)
 
-    def _draw_outside_overlay(self, painter: QtGui.QPainter, rect: QtCore.QRect):
-        painter.setPen(Qt.PenStyle.NoPen)
-        painter.setBrush(self._OVERLAY_BRUSH)
 
-        # left
-        self._overlay_rect.setRect(0, 0, rect.left(), self.height())
-        painter.drawRect(self._overlay_rect)
-        # top
-        self._overlay_rect.setRect(rect.left(), 0, self.width() - rect.left(), rect.top())
-        painter.drawRect(self._overlay_rect)
-        # right
-        # +1 to avoid unintended problem
-        self._overlay_rect.setRect(rect.right() + 1, rect.top(), self.width() - rect.width(), self.height() - rect.top())
-        painter.drawRect(self._overlay_rect)
-        # bottom
-        self._overlay_rect.setRect(rect.left(), rect.bottom(), rect.width(), self.height() - rect.bottom())
-        painter.drawRect(self._overlay_rect)
+class PinnedRegion(QtCore.QObject):
+    # keeps translating one region of a screen, e.g. game subtitles: the region is captured at most conf.pin.max_fps
+    # times a second, and only a capture that changed and then settled is recognized, in a worker thread of the region.
+    # a new text is translated in place in one floating label, closing the label unpins the region
+    recognized_sig = QtCore.Signal(str, str, QtGui.QImage)
+    closed_sig = QtCore.Signal()
+    _LABEL_GAP = 8
+
+    def __init__(self, screen: QtGui.QScreen, rect: QtCore.QRect):
+        super().__init__()
+        self._screen = screen
+        self._rect = QtCore.QRect(rect)
+        self._diff = ocr.FrameDiff(conf.pin.max_pixels, conf.pin.tolerance, conf.pin.outliers)
+        self._recognizing = False
+        self._stopped = False
+        self._text = ""
+        self._label: _TranslateLabel | None = None
+        self.captures = 0
+        self.recognitions = 0
+        # one thread recognizes every change, ocr engine handles are per thread and made once for it.
+        # they are freed when the region stops
+        self._worker = futures.ThreadPoolExecutor(1, thread_name_prefix="pin")
+
+        self.recognized_sig.connect(self._on_recognized)
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(max(round(1000 / conf.pin.max_fps), 1))
+        self._timer.timeout.connect(self._capture)
+        self._timer.start()
+        logs.info(f"pin region {rect} at {conf.pin.max_fps} captures per second")
+
+    def stop(self):
+        if self._stopped:
+            return
+        self._stopped = True
+        self._timer.stop()
+        label, self._label = self._label, None
+        if label is not None:
+            label.close()
+        self.closed_sig.emit()
+        self._worker.submit(self._release)
+        self._worker.shutdown(wait=False)
+        # a worker still recognizing emits to this object, it is deleted once the result is in
+        if not self._recognizing:
+            self.deleteLater()
+
+    @staticmethod
+    def _release():
+        try:
+            ocr.release()
+        except Exception as e:
+            logs.error("failed to release the ocr engine of pinned region: %s", e)
+
+    def _capture(self):
+        if self._recognizing:
+            # the last change is still being recognized, the diff picks up whatever changed since then
+            return
+        self.captures += 1
+        with trace.span("pin.capture"):
+            image = self._screen.grabWindow(0, self._rect.x(), self._rect.y(), self._rect.width(),
+                                            self._rect.height()).toImage()
+            settled = self._diff.settled(ocr.qimage.to_pixels(image))
+        if not settled:
+            return
+
+        self._recognizing = True
+        self.recognitions += 1
+        self._worker.submit(self._recognize, image)
+
+    def _recognize(self, image: QtGui.QImage):
+        text, lang = "", ""
+        try:
+            result = ocr.read_qpixmap(image)
+            text, lang = result.text.strip(), ocr.translator_lang(result.lang) or ""
+        except Exception as e:
+            logs.error("failed to recognize pinned region: %s", e)
+        self.recognized_sig.emit(text, lang, image)
+
+    @QtCore.Slot(str, str, QtGui.QImage)
+    def _on_recognized(self, text: str, lang: str, image: QtGui.QImage):
+        self._recognizing = False
+        if self._stopped:
+            self.deleteLater()
+            return
+        # the same text re-rendered, e.g. a blinking cursor, is not translated again
+        if not text or text == self._text:
+            return
+        self._text = text
 
-        painter.setBrush(self._EMPTY_BRUSH)
+        if self._label is not None:
+            self._label.set_text(text, lang or None, image)
+            return
+        self._label = _TranslateLabel(None, text, lang or None, window_flags=(
+            Qt.WindowType.FramelessWindowHint | Qt.WindowType.WindowStaysOnTopHint | Qt.WindowType.Tool
+        ), image=image)
+        self._label.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        self._label.closed_sig.connect(self.stop)
+        self._place_label()
+
+    def _place_label(self):
+        # below the region, or above it when there is no room, never over it or it would be captured
+        screen = self._screen.geometry()
+        x = screen.x() + self._rect.x()
+        y = screen.y() + self._rect.bottom() + self._LABEL_GAP
+        if y + self._label.height() > screen.bottom():
+            y = screen.y() + self._rect.top() - self._LABEL_GAP - self._label.height()
+        self._label.move(x, y)
 
 
 class _ClipToolkit(QtWidgets.QWidget, ui_py.clip_toolkit.Ui_Form):
@@ -289,24 +551,69 @@ class _ClipToolkit(QtWidgets.QWidget, ui_py.clip_toolkit.Ui_Form):
         self.confirm_btn.clicked.connect(self.confirm_sig)
 
 
-class _TranslateLabel(QtWidgets.QLabel, ui_py.translate_label.Ui_Form):
-    on_translated_sig = QtCore.Signal(str)
+class _Generation:
+    # the generation of the text a label translates, shared with its translate threads:
+    # a thread whose generation is no longer the current one stops, -1 once the label is gone
+    def __init__(self):
+        self.value = 0
+
+    def close(self):
+        self.value = -1
 
-    def __init__(self, parent, text):
+
+class _TranslateLabel(QtWidgets.QLabel, ui_py.translate_label.Ui_Form):
+    # translated segments arrive one by one from the translate thread, repaints are coalesced to one per interval.
+    # set_text replaces the text in place, segments still arriving for the old text are dropped by generation.
+    # a text translated completely is kept in the history with the image it was recognized from
+    closed_sig = QtCore.Signal()
+    _RENDER_INTERVAL_MS = 16
+    _PENDING = "…"
+
+    def __init__(self, parent, text, from_lang: str | None = None, window_flags: Qt.WindowType | None = None,
+                 image: QtGui.QImage | None = None):
+        # from_lang is the source language when ocr knows it, the translator's configured one otherwise
         super().__init__(parent)
         self.setupUi(self)
+        if window_flags is not None:
+            self.setWindowFlags(window_flags)
 
         self._relative = QtCore.QPoint()
-        self._raw_text = text
-        self.label.setText(self._format(text, "translating..."))
-        self._resize()
+        self._generation = _Generation()
+        self.destroyed.connect(self._generation.close)
         self.setGraphicsEffect(util.shadow_background_effect(self))
 
-        self.on_translated_sig.connect(self.on_translated)
-        threading.Thread(target=self._start_translate).start()
+        self._render_timer = QtCore.QTimer(self)
+        self._render_timer.setSingleShot(True)
+        self._render_timer.setInterval(self._RENDER_INTERVAL_MS)
+        self._render_timer.timeout.connect(self._render)
+
+        self.set_text(text, from_lang, image)
 
         self.show()
 
+    def set_text(self, text: str, from_lang: str | None = None, image: QtGui.QImage | None = None):
+        self._generation.value += 1
+        self._raw_text = text
+        self._from_lang = from_lang
+        self._segments, self._separators = translator.split(text)
+        self._translated: list[str | None] = [None] * len(self._segments)
+        self._created = time.perf_counter()
+        self._first_shown = False
+
+        self._render_timer.stop()
+        self.label.setText(self._format(text, "translating..."))
+        self._resize()
+        relay = _Relay()
+        relay.segment_sig.connect(self.on_segment, Qt.ConnectionType.QueuedConnection)
+        relay.failed_sig.connect(self.on_failed, Qt.ConnectionType.QueuedConnection)
+        args = (relay, self._generation, self._generation.value, text, from_lang, image)
+        threading.Thread(target=self._start_translate, args=args, daemon=True).start()
+
+    @override
+    def closeEvent(self, event):
+        super().closeEvent(event)
+        self.closed_sig.emit()
+
     @override
     def mouseDoubleClickEvent(self, event):
         self.close()
@@ -314,7 +621,7 @@ class _TranslateLabel(QtWidgets.QLabel, ui_py.translate_label.Ui_Form):
     @override
     def mousePressEvent(self, ev):
         global_pos = self.mapToGlobal(QtCore.QPoint())
-        logs.debug(f"global_pos is {global_pos}, ev.x: {ev.globalX()}, ev.y: {ev.globalY()}")
+        logs.debug("global_pos is %s, ev.x: %s, ev.y: %s", global_pos, ev.globalX(), ev.globalY())
         self._relative.setX(ev.globalX() - global_pos.x())
         self._relative.setY(ev.globalY() - global_pos.y())
 
@@ -322,15 +629,53 @@ class _TranslateLabel(QtWidgets.QLabel, ui_py.translate_label.Ui_Form):
     def mouseMoveEvent(self, ev):
         self.move(ev.globalX() - self._relative.x(), ev.globalY() - self._relative.y())
 
-    @QtCore.Slot(str)
-    def on_translated(self, translated_text: str):
-        self.label.setText(self._format(self._raw_text, translated_text))
+    @QtCore.Slot(int, int, str)
+    def on_segment(self, generation: int, index: int, translated_text: str):
+        if generation != self._generation.value:
+            return
+        self._translated[index] = translated_text
+        if not self._render_timer.isActive():
+            self._render_timer.start()
+
+    @QtCore.Slot(int, str)
+    def on_failed(self, generation: int, reason: str):
+        if generation != self._generation.value:
+            return
+        self._render_timer.stop()
+        self.label.setText(self._format(self._raw_text, f"failed to translate: {reason}"))
+        self._resize()
+
+    def _render(self):
+        translated = [t if t is not None else self._PENDING for t in self._translated]
+        self.label.setText(self._format(self._raw_text, translator.join(translated, self._separators)))
         self._resize()
+        if not self._first_shown:
+            self._first_shown = True
+            trace.record("translate.first_visible", time.perf_counter() - self._created)
 
-    def _start_translate(self):
-        translated_text = translator.translate(self._raw_text)
-        logs.debug(f"translated text: {translated_text}")
-        self.on_translated_sig.emit(translated_text)
+    @staticmethod
+    def _start_translate(relay: _Relay, current: _Generation, generation: int, text: str, from_lang: str | None,
+                         image: QtGui.QImage | None):
+        # runs in a thread of its own and only emits on relay, the label may be deleted at any time meanwhile.
+        # a text replaced or a label deleted meanwhile is neither translated further nor kept in the history
+        segments, separators = translator.split(text)
+        translated = [""] * len(segments)
+        try:
+            for index, translated_text in translator.translate_iter(text, from_lang):
+                if current.value != generation:
+                    return
+                translated[index] = translated_text
+                relay.segment_sig.emit(generation, index, translated_text)
+            if current.value != generation:
+                return
+            history.record(text, translator.join(translated, separators),
+                           from_lang or conf.translator.from_lang, conf.ocr.to_lang, image)
+        except Exception as e:
+            # anything but a failure shown in the label would leave it translating forever
+            logs.error("failed to translate: %s", e)
+            relay.failed_sig.emit(generation, f"{e}" or type(e).__name__)
+        finally:
+            relay.deleteLater()
 
     def _resize(self):
         self.label.adjustSize()
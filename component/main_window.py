@@ -1,13 +1,18 @@
-import win32con
+from typing import TYPE_CHECKING, override
+
 import ui_py
 from PySide6 import QtWidgets, QtGui, QtCore
 
-from pkg import logs, hotkey
-from . import clip_window
+from pkg import logs, hotkey, trace
+
+if TYPE_CHECKING:
+    from . import clip_window
 
 
 class Window(QtWidgets.QMainWindow, ui_py.mainwindow.Ui_MainWindow):
     clip_sig = QtCore.Signal()
+    # emitted from any thread once the clip window module is imported, see component.prewarm
+    clip_window_imported_sig = QtCore.Signal()
 
     def __init__(self, parent=None, hk_manager: hotkey.HotkeyManager = None):
         super(Window, self).__init__(parent)
@@ -18,13 +23,14 @@ class Window(QtWidgets.QMainWindow, ui_py.mainwindow.Ui_MainWindow):
                 hotkey.Hotkey(
                     self.clip_sig.emit,
                     hotkey.HotkeyFsModifiers.MOD_NONE,
-                    win32con.VK_F4,
+                    hotkey.VirtualKey.F4,
                 )
             )
 
-        self.fullscreen_widget: clip_window.ClipWindow | None = None
+        self.fullscreen_widget: "clip_window.ClipWindow | None" = None
         self.screenshot_btn.clicked.connect(self.clip)
         self.clip_sig.connect(self.clip)
+        self.clip_window_imported_sig.connect(self._prebuild_clip_window)
 
     def clip(self):
         if self.fullscreen_widget is not None and self.fullscreen_widget.isVisible():
@@ -38,5 +44,32 @@ class Window(QtWidgets.QMainWindow, ui_py.mainwindow.Ui_MainWindow):
             logs.error("screen is None")
             return
 
-        original_pixmap = screen.grabWindow(0)
-        self.fullscreen_widget = clip_window.ClipWindow(original_pixmap)
+        with trace.span("clip.grab"):
+            original_pixmap = screen.grabWindow(0)
+        with trace.span("clip.window"):
+            self._prebuild_clip_window()
+            self.fullscreen_widget.open(original_pixmap)
+
+    @QtCore.Slot()
+    def _prebuild_clip_window(self):
+        # the window is built once and reused by every clip
+        if self.fullscreen_widget is not None:
+            return
+        # imported here unless component.prewarm got to it first, it pulls in ocr and translator
+        from . import clip_window
+        self.fullscreen_widget = clip_window.ClipWindow()
+
+    @override
+    def closeEvent(self, event):
+        super().closeEvent(event)
+        self._dispose_clip_window()
+
+    def _dispose_clip_window(self):
+        # the clip window has no parent, nothing frees it and the regions pinned from it but this
+        widget, self.fullscreen_widget = self.fullscreen_widget, None
+        if widget is None:
+            return
+        for region in list(widget.pinned):
+            region.stop()
+        widget.close()
+        widget.deleteLater()
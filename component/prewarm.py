@@ -0,0 +1,36 @@
+import importlib
+import threading
+import time
+from typing import Callable
+
+from pkg import logs
+
+
+# everything the first clip needs and the main window does not: the clip window with ocr and translator,
+# the ocr engine of the thread clips are recognized on and a connection to the translation service.
+# runs once the main window is shown
+
+def warm_up(on_imported: Callable[[], None] | None = None):
+    # on_imported is called on this thread once the clip window can be built, e.g. a signal emit
+    start = time.perf_counter()
+    clip_window = importlib.import_module("component.clip_window")
+    from pkg import translator
+    logs.info(f"clip window is imported in {(time.perf_counter() - start) * 1000:.0f}ms")
+    if on_imported is not None:
+        on_imported()
+
+    for name, fn in (("ocr engine", clip_window.warm_up_ocr), ("translator", translator.warm_up)):
+        start = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            # the first clip retries and reports it
+            logs.warning(f"failed to warm up {name}: {e}")
+            continue
+        logs.info(f"{name} is warmed up in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+
+def start(on_imported: Callable[[], None] | None = None) -> threading.Thread:
+    t = threading.Thread(target=warm_up, args=(on_imported,), name="warm-up", daemon=True)
+    t.start()
+    return t
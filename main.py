@@ -3,21 +3,26 @@ import sys
 from PySide6 import QtWidgets
 
 import component
-from pkg import logs, hotkey
+from pkg import logs, hotkey, trace
 
 
 def main():
     logs.init()
     logs.info("start process")
+    trace.init()
 
     app = QtWidgets.QApplication(sys.argv)
     m = hotkey.HotkeyManager()
 
     window = component.Window(hk_manager=m)
     window.showMinimized()
+    component.prewarm.start(window.clip_window_imported_sig.emit)
 
     m.start()
-    sys.exit(app.exec())
+    code = app.exec()
+    m.stop()
+    trace.close()
+    sys.exit(code)
 
 
 if __name__ == "__main__":
@@ -1,3 +1,14 @@
-from . import *
+import importlib
 
-__all__ = ["logs", "hotkey", "conf", "fsm", "ocr", "translator"]
+from . import logs, hotkey, conf, trace, fsm
+
+__all__ = ["logs", "hotkey", "conf", "trace", "fsm", "ocr", "translator", "history"]
+
+# ocr, translator and history pull in numpy, pillow, requests and qt, they are imported on first use
+_LAZY = {"ocr", "translator", "history"}
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
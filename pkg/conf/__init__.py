@@ -1 +1 @@
-from . import key, ocr
+from . import batch, history, key, logs, ocr, pin, translator, trace
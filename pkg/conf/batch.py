@@ -0,0 +1,8 @@
+# `python batch.py` recognizes and translates image files without a window
+
+# files with these extensions are read from directories, files named on the command line are read whatever they are
+extensions = [".png", ".jpg", ".jpeg", ".bmp", ".gif", ".tif", ".tiff", ".webp"]
+# processes recognizing whole files in parallel, 0 uses every core
+workers = 0
+# texts being translated at once
+translate_workers = 4
@@ -0,0 +1,16 @@
+import os
+
+# every translated clip is kept with a small thumbnail in a sqlite file with a full-text index, None disables it
+path = os.path.join(os.path.expanduser("~"), ".ragdoll", "history.sqlite3")
+
+# the oldest clips are deleted once any of these is exceeded, None for no limit
+max_entries = 50_000
+# bytes of text and thumbnails, the sqlite file is somewhat larger because of the index
+max_bytes = 256 << 20
+# seconds
+max_age = None
+
+# thumbnails are scaled to fit max_width x max_height and stored as jpeg of this quality
+thumbnail_max_width = 320
+thumbnail_max_height = 180
+thumbnail_quality = 60
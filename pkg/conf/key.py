@@ -2,3 +2,7 @@ from PySide6.QtCore import Qt
 
 confirm_clip = Qt.Key.Key_Q
 cancel_clip = Qt.Key.Key_Escape
+# keeps translating the selected region while it changes, e.g. subtitles, see pkg.conf.pin
+pin_clip = Qt.Key.Key_P
+# seconds after a global hotkey's callback returns during which presses of the same hotkey are dropped
+hotkey_debounce = 0.3
@@ -0,0 +1,7 @@
+# records are written by a background thread, logging calls only queue them
+async_mode = True
+# log files are rotated at this size keeping backup_count old files, 0 never rotates
+max_bytes = 10 << 20
+backup_count = 3
+# json lines instead of plain text
+structured = False
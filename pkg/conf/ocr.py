@@ -1,4 +1,45 @@
 exec_path = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+# libtesseract shipped with the windows installer, `ctypes.util.find_library` is used if it does not exist
+lib_path = r"C:\Program Files\Tesseract-OCR\libtesseract-5.dll"
+tessdata_path = r"C:\Program Files\Tesseract-OCR\tessdata"
 
-from_lang = "eng"
+# "auto" prefers the in-process libtesseract engine and falls back to the tesseract executable,
+# "capi" and "cli" force one of them
+engine = "auto"
+
+# tesseract language of the clips, e.g. "eng" or "eng+jpn". "auto" detects per clip which one of `auto_langs`
+# a clip is in, so that only that model runs, and tells the translator the source language.
+# with a single auto language nothing is detected, more than one needs osd.traineddata
+from_lang = "auto"
+auto_langs = ["eng"]
+# confidence below which tesseract's script detection is ignored and the last language is kept
+auto_min_confidence = 1.0
 to_lang = "zh"
+
+# results of recently seen clips are reused when the clip shows the same content again, 0 disables it
+result_cache_entries = 32
+# clips are compared at no more than this many pixels
+result_cache_max_pixels = 1 << 18
+# per-pixel gray level difference counted as noise, and the fraction of pixels allowed to exceed it
+result_cache_tolerance = 16
+result_cache_outliers = 0.001
+
+# steps run on a clip before the engine, in order, see pkg.ocr.preprocess.STEPS.
+# "binarize" helps on busy backgrounds but costs a few milliseconds per megapixel
+preprocess = ["grayscale", "invert", "normalize", "trim", "rescale"]
+# height in pixels a text line is rescaled to
+preprocess_text_height = 40
+
+# clips of at least this many pixels (after preprocessing) are split into text blocks
+# which are recognized in parallel by `workers` processes, 0 workers uses every core, 1 disables it
+parallel_min_pixels = 1 << 20
+workers = 0
+
+# "adaptive" picks tesseract's page segmentation from the shape of the clip (a word, a line, a block or a page),
+# "fixed" always uses `psm`, see pkg.ocr.engine.Psm
+segmentation = "adaptive"
+psm = 3
+# adaptive mode recognizes again with the slower, thorough `thorough_psm` when the mean word confidence (0 to 100)
+# of the fast pass is below `min_confidence`. lower trades accuracy on hard clips for latency, 0 never retries
+min_confidence = 60
+thorough_psm = 3
@@ -0,0 +1,8 @@
+# a pinned region is captured at most max_fps times per second, and recognized and translated again
+# only when its content changed and stayed the same for one more capture
+max_fps = 4
+# a capture differs from the last one when more than `outliers` of its pixels differ by more than
+# `tolerance` gray levels, captures are compared at no more than `max_pixels` pixels
+tolerance = 24
+outliers = 0.0002
+max_pixels = 1 << 16
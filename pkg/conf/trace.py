@@ -0,0 +1,9 @@
+import os
+
+# per-stage latency histograms of the clip -> ocr -> translate flow, see pkg.trace
+enabled = False
+# percentiles cover this many recent samples of every stage
+window = 1024
+# the snapshot is written here and summarized in the log every dump_interval seconds, None disables it
+dump_path = os.path.join(os.path.expanduser("~"), ".ragdoll", "trace.json")
+dump_interval = 60
@@ -0,0 +1,26 @@
+import os
+
+# one of pkg.translator.backends(): "default" (the `translate` package), "mymemory", "libre"
+backend = "default"
+# extra keyword arguments of the backend, e.g. {"url": "http://localhost:5000"} for "libre"
+backend_options = {}
+# "auto" lets the backend detect the source language
+from_lang = "auto"
+
+# seconds per request
+timeout = 10
+retries = 2
+# hosts kept in the keep-alive connection pool
+pool_hosts = 4
+
+# translations are cached in memory and in a sqlite file that survives restarts, None disables the file
+cache_path = os.path.join(os.path.expanduser("~"), ".ragdoll", "translation_cache.sqlite3")
+cache_memory_entries = 1024
+cache_disk_entries = 100_000
+# seconds, None keeps entries until they are evicted by size
+cache_ttl = 30 * 24 * 60 * 60
+
+# text is translated line by line, unique uncached lines are packed into requests of at most
+# batch_max_chars characters, and up to batch_workers requests are in flight at once
+batch_max_chars = 450
+batch_workers = 4
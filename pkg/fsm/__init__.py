@@ -1,8 +1,19 @@
 from .machine import *
+from .compiled import CompiledMachine, Result, Tracer
+from .events import EventMachine, Transition, Stats, Guard, Action, Executor
 
 __all__ = ["Str",
            "State",
            "Machine",
+           "CompiledMachine",
+           "Result",
+           "Tracer",
+           "EventMachine",
+           "Transition",
+           "Stats",
+           "Guard",
+           "Action",
+           "Executor",
            "Callable",
 
            "Error",
@@ -0,0 +1,93 @@
+import argparse
+import time
+
+from .compiled import CompiledMachine
+from .events import EventMachine, Transition
+from .machine import Machine, State, Error
+
+# transitions per second of Machine, CompiledMachine and EventMachine on the clipper's state graph, replaying
+# the calls of a drag: press, moves, release, and an illegal transition handled by the caller
+# usage: python -m pkg.fsm.bench_machine [-n 200000]
+
+_DRAG = ["empty", "clipping"] + ["clipping"] * 8 + ["clipped", "clipped", "empty"]
+
+
+def _states() -> set[State]:
+    return {
+        State(name="empty", next_states={"clipping"}),
+        State(name="clipping", next_states={"empty", "clipped"}),
+        State(name="clipped", next_states={"empty", "clipping"}, on_enter=lambda s: None, on_exit=lambda s: None),
+    }
+
+
+def _raising(m, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        for name in _DRAG:
+            m.trans_to(name)
+        try:
+            m.trans_to("clipped")
+        except Error:
+            pass
+    return time.perf_counter() - start
+
+
+def _non_raising(m: CompiledMachine, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        for name in _DRAG:
+            m.try_trans_to(name)
+        m.try_trans_to("clipped")
+    return time.perf_counter() - start
+
+
+def _by_id(m: CompiledMachine, n: int) -> float:
+    ids = [m.id_of(name) for name in _DRAG]
+    illegal = m.id_of("clipped")
+    start = time.perf_counter()
+    for _ in range(n):
+        for i in ids:
+            m.try_trans_to_id(i)
+        m.try_trans_to_id(illegal)
+    return time.perf_counter() - start
+
+
+def _posted(n: int) -> float:
+    # the same drag as events, the transitions between different states are what the table has to find
+    m = EventMachine(_states(), "empty", [
+        Transition("press", {"empty", "clipped"}, "clipping"),
+        Transition("release", "clipping", "clipped"),
+        Transition("cancel", {"clipping", "clipped"}, "empty"),
+    ])
+    events = ["press"] * 10 + ["release", "release", "cancel", "release"]
+    start = time.perf_counter()
+    for _ in range(n):
+        for event in events:
+            m.post(event)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=200_000)
+    args = parser.parse_args()
+
+    transitions = args.n * (len(_DRAG) + 1)
+    cases = [
+        ("Machine.trans_to", lambda: _raising(Machine(_states(), "empty"), args.n)),
+        ("CompiledMachine.trans_to", lambda: _raising(CompiledMachine(_states(), "empty"), args.n)),
+        ("CompiledMachine.try_trans_to", lambda: _non_raising(CompiledMachine(_states(), "empty"), args.n)),
+        ("CompiledMachine.try_trans_to_id", lambda: _by_id(CompiledMachine(_states(), "empty"), args.n)),
+        ("  with counters", lambda: _non_raising(CompiledMachine(_states(), "empty", count=True), args.n)),
+        ("EventMachine.post", lambda: _posted(args.n)),
+    ]
+    baseline = None
+    for name, run in cases:
+        elapsed = run()
+        rate = transitions / elapsed
+        baseline = baseline or rate
+        print(f"{name:>32}: {rate / 1e6:6.2f} M transitions/s ({rate / baseline:4.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
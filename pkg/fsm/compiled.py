@@ -0,0 +1,136 @@
+import enum
+from typing import Callable
+
+from .machine import Str, State, StateNotFound, StateTransIllegal
+
+
+# a Machine for hot paths: states are interned to small integers and the legal transitions are
+# precomputed into a matrix, so a transition is one dict lookup and one list index.
+# try_trans_to reports a Result instead of raising
+
+class Result(enum.Enum):
+    Moved = "moved"
+    Unchanged = "unchanged"
+    NotFound = "not_found"
+    Illegal = "illegal"
+
+    @property
+    def ok(self) -> bool:
+        return self is Result.Moved or self is Result.Unchanged
+
+
+_MOVED, _UNCHANGED, _NOT_FOUND, _ILLEGAL = Result.Moved, Result.Unchanged, Result.NotFound, Result.Illegal
+
+# (from state, to state, result), to state is the requested name for NotFound
+Tracer = Callable[[Str, Str, Result], None]
+
+
+class CompiledMachine:
+    __slots__ = ("_names", "_ids", "_matrix", "_on_enter", "_on_exit", "_current", "_current_name", "_tracer",
+                 "_counts", "_rejected")
+
+    def __init__(self, states: set[State], initial_state: Str, tracer: Tracer | None = None, count: bool = False):
+        # states get ids in name order, so that ids do not depend on set iteration order
+        ordered = sorted(states, key=lambda s: s.name)
+        self._names: tuple[Str, ...] = tuple(s.name for s in ordered)
+        self._ids: dict[Str, int] = {name: i for i, name in enumerate(self._names)}
+
+        for state in ordered:
+            for next_state in state.next_states:
+                if next_state not in self._ids:
+                    raise StateNotFound(f"{state.name}'s next state: {next_state} is not in states")
+        if initial_state not in self._ids:
+            raise StateNotFound(f"initial state: {initial_state} is not in states")
+
+        self._matrix: tuple[tuple[bool, ...], ...] = tuple(
+            tuple(name in s.next_states for name in self._names) for s in ordered
+        )
+        self._on_enter = tuple(s.on_enter for s in ordered)
+        self._on_exit = tuple(s.on_exit for s in ordered)
+        self._current = self._ids[initial_state]
+        self._current_name = self._names[self._current]
+
+        self._tracer = tracer
+        # transitions taken, counts[from id][to id], and transitions rejected, when count is set
+        self._counts: list[list[int]] | None = [[0] * len(ordered) for _ in ordered] if count else None
+        self._rejected = 0
+
+    def state(self) -> Str:
+        return self._current_name
+
+    def state_id(self) -> int:
+        return self._current
+
+    def id_of(self, name: Str) -> int:
+        # ids are fixed for the life of the machine, callers on hot paths can resolve them once
+        i = self._ids.get(name)
+        if i is None:
+            raise StateNotFound(f"{name} is not in current state machine")
+        return i
+
+    def trans_to(self, next_state_name: Str):
+        # same behavior as Machine.trans_to
+        if next_state_name == self._current_name:
+            return
+        result = self.try_trans_to(next_state_name)
+        if result is _NOT_FOUND:
+            raise StateNotFound(f"{next_state_name} is not in current state machine")
+        if result is _ILLEGAL:
+            raise StateTransIllegal(f"{next_state_name} can not be trans from {self.state()}")
+
+    def try_trans_to(self, next_state_name: Str) -> Result:
+        # the common cases are inlined here and in try_trans_to_id, a transition is the rare one
+        if next_state_name == self._current_name and self._tracer is None:
+            return _UNCHANGED
+        i = self._ids.get(next_state_name)
+        if i is None:
+            self._rejected += 1
+            if self._tracer is not None:
+                self._tracer(self._names[self._current], next_state_name, _NOT_FOUND)
+            return _NOT_FOUND
+        return self._trans(i)
+
+    def try_trans_to_id(self, i: int) -> Result:
+        if i == self._current and self._tracer is None:
+            return _UNCHANGED
+        return self._trans(i)
+
+    def _trans(self, i: int) -> Result:
+        current = self._current
+        if i == current:
+            result = _UNCHANGED
+        elif not self._matrix[current][i]:
+            self._rejected += 1
+            result = _ILLEGAL
+        else:
+            on_exit = self._on_exit[current]
+            if on_exit is not None:
+                on_exit(self._names[i])
+            self._current = i
+            self._current_name = self._names[i]
+            on_enter = self._on_enter[i]
+            if on_enter is not None:
+                on_enter(self._names[current])
+            if self._counts is not None:
+                self._counts[current][i] += 1
+            result = _MOVED
+
+        if self._tracer is not None:
+            self._tracer(self._names[current], self._names[i], result)
+        return result
+
+    def can_trans_to(self, next_state_name: Str) -> bool:
+        i = self._ids.get(next_state_name)
+        return i is not None and (i == self._current or self._matrix[self._current][i])
+
+    def counters(self) -> dict[tuple[Str, Str], int]:
+        # (from, to) -> times taken, empty unless the machine counts
+        if self._counts is None:
+            return {}
+        return {
+            (self._names[f], self._names[t]): n
+            for f, row in enumerate(self._counts) for t, n in enumerate(row) if n
+        }
+
+    def rejected(self) -> int:
+        return self._rejected
@@ -0,0 +1,151 @@
+import collections
+import threading
+from typing import Callable, Any
+
+from pkg import logs
+from .compiled import CompiledMachine, Tracer
+from .machine import Str, State, StateTransIllegal
+
+# an event-driven layer over CompiledMachine: any thread posts named events, one thread at a time
+# dispatches them in order, and every event runs to completion (guard, transition, action) before the next.
+# a post while another thread dispatches only queues the event, the dispatching thread picks it up
+
+Guard = Callable[[Any], bool]
+Action = Callable[[Any], None]
+# runs on_enter/on_exit callbacks, e.g. on the gui thread, inline by default
+Executor = Callable[[Callable[[], None]], None]
+
+
+class Transition:
+    __slots__ = ("event", "sources", "target", "guard", "action")
+
+    def __init__(
+            self,
+            event: Str,
+            sources: set[Str] | Str,
+            target: Str,
+            guard: Guard | None = None,
+            action: Action | None = None,
+    ):
+        # guard and action get the payload of the event, action runs after a successful transition
+        self.event = event
+        self.sources = {sources} if isinstance(sources, str) else set(sources)
+        self.target = target
+        self.guard = guard
+        self.action = action
+
+
+class Stats:
+    __slots__ = ("posted", "coalesced", "dispatched", "rejected")
+
+    def __init__(self):
+        self.posted = 0
+        # dropped because the same event was already waiting at the end of the queue
+        self.coalesced = 0
+        self.dispatched = 0
+        # no transition for the event in the current state, or every guard said no
+        self.rejected = 0
+
+
+class EventMachine:
+    def __init__(
+            self,
+            states: set[State],
+            initial_state: Str,
+            transitions: list[Transition],
+            executor: Executor | None = None,
+            coalesce: bool = False,
+            tracer: Tracer | None = None,
+    ):
+        # with coalesce, an event posted while the same event is the last one waiting replaces it,
+        # bursts of one event collapse into one dispatch with the newest payload
+        if executor is not None:
+            states = {_deferred(s, executor) for s in states}
+        self._machine = CompiledMachine(states, initial_state, tracer=tracer)
+        self._coalesce = coalesce
+
+        # (state id, event) -> transitions in the order given, the first one whose guard passes is taken
+        next_states = {s.name: s.next_states for s in states}
+        self._table: dict[tuple[int, Str], list[tuple[int, Transition]]] = {}
+        for t in transitions:
+            target = self._machine.id_of(t.target)
+            for source in t.sources:
+                source_id = self._machine.id_of(source)
+                if t.target != source and t.target not in next_states[source]:
+                    raise StateTransIllegal(f"event {t.event}: {t.target} can not be trans from {source}")
+                self._table.setdefault((source_id, t.event), []).append((target, t))
+
+        self._queue: collections.deque[tuple[Str, Any]] = collections.deque()
+        self._lock = threading.Lock()
+        self._dispatching = False
+        self._idle = threading.Condition(self._lock)
+        self.stats = Stats()
+
+    def state(self) -> Str:
+        return self._machine.state()
+
+    def post(self, event: Str, payload: Any = None):
+        with self._lock:
+            self.stats.posted += 1
+            if self._coalesce and self._queue and self._queue[-1][0] == event:
+                self._queue[-1] = (event, payload)
+                self.stats.coalesced += 1
+            else:
+                self._queue.append((event, payload))
+            if self._dispatching:
+                return
+            self._dispatching = True
+
+        self._run()
+
+    def wait_idle(self, timeout: float | None = None) -> bool:
+        # blocks until every posted event is dispatched
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._dispatching and not self._queue, timeout)
+
+    def _run(self):
+        idle = False
+        try:
+            while True:
+                with self._lock:
+                    if not self._queue:
+                        # cleared under the same lock as the check, or a concurrent post could queue an event
+                        # nobody dispatches
+                        self._dispatching = False
+                        self._idle.notify_all()
+                        idle = True
+                        return
+                    event, payload = self._queue.popleft()
+
+                try:
+                    self._dispatch(event, payload)
+                except Exception as e:
+                    # one failing callback must not stop the events queued behind it
+                    logs.error("failed to dispatch event %s in state %s: %s", event, self.state(), e)
+        finally:
+            if not idle:
+                # a KeyboardInterrupt or SystemExit out of a callback, the events still queued are dispatched
+                # by the next post
+                with self._lock:
+                    self._dispatching = False
+                    self._idle.notify_all()
+
+    def _dispatch(self, event: Str, payload: Any):
+        self.stats.dispatched += 1
+        for target, t in self._table.get((self._machine.state_id(), event), ()):
+            if t.guard is not None and not t.guard(payload):
+                continue
+            self._machine.try_trans_to_id(target)
+            if t.action is not None:
+                t.action(payload)
+            return
+        self.stats.rejected += 1
+
+
+def _deferred(state: State, executor: Executor) -> State:
+    def defer(callback):
+        if callback is None:
+            return None
+        return lambda name: executor(lambda: callback(name))
+
+    return State(state.name, state.next_states, defer(state.on_enter), defer(state.on_exit))
@@ -17,6 +17,8 @@ class StateTransIllegal(Error):
 
 
 class State:
+    __slots__ = ("name", "next_states", "on_enter", "on_exit")
+
     def __init__(
             self,
             name: Str,
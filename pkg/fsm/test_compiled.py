@@ -0,0 +1,82 @@
+import unittest
+
+from .compiled import *
+from .machine import State, StateNotFound, StateTransIllegal
+
+
+def _states(**callbacks) -> set[State]:
+    return {
+        State(name="state1", next_states={"state2"}, **callbacks.get("state1", {})),
+        State(name="state2", next_states={"state1", "state3"}, **callbacks.get("state2", {})),
+        State(name="state3"),
+    }
+
+
+class TestCompiledMachine(unittest.TestCase):
+    def test_init_errors(self):
+        with self.assertRaises(StateNotFound):
+            CompiledMachine({State(name="state1", next_states={"state2"})}, "state1")
+        with self.assertRaises(StateNotFound):
+            CompiledMachine({State(name="state1")}, "state_not_exist")
+
+    def test_try_trans_to(self):
+        m = CompiledMachine(_states(), "state1")
+        self.assertEqual(Result.Illegal, m.try_trans_to("state3"))
+        self.assertEqual(Result.NotFound, m.try_trans_to("not_exist_state"))
+        self.assertEqual("state1", m.state())
+        self.assertEqual(Result.Unchanged, m.try_trans_to("state1"))
+        self.assertEqual(Result.Moved, m.try_trans_to("state2"))
+        self.assertEqual("state2", m.state())
+        self.assertTrue(Result.Moved.ok)
+        self.assertTrue(Result.Unchanged.ok)
+        self.assertFalse(Result.Illegal.ok)
+        self.assertEqual(2, m.rejected())
+
+    def test_trans_to_raises_like_machine(self):
+        m = CompiledMachine(_states(), "state1")
+        with self.assertRaises(StateNotFound):
+            m.trans_to("not_exist_state")
+        with self.assertRaises(StateTransIllegal):
+            m.trans_to("state3")
+        m.trans_to("state2")
+        m.trans_to("state3")
+        self.assertEqual("state3", m.state())
+
+    def test_ids(self):
+        m = CompiledMachine(_states(), "state1")
+        state2 = m.id_of("state2")
+        self.assertEqual(Result.Moved, m.try_trans_to_id(state2))
+        self.assertEqual(state2, m.state_id())
+        self.assertTrue(m.can_trans_to("state3"))
+        self.assertFalse(m.can_trans_to("not_exist_state"))
+        with self.assertRaises(StateNotFound):
+            m.id_of("not_exist_state")
+
+    def test_callbacks(self):
+        calls = []
+        m = CompiledMachine(_states(
+            state1={"on_exit": lambda to: calls.append(("exit state1", to))},
+            state2={"on_enter": lambda frm: calls.append(("enter state2", frm))},
+        ), "state1")
+        m.trans_to("state2")
+        self.assertEqual([("exit state1", "state2"), ("enter state2", "state1")], calls)
+
+    def test_trace_and_counters(self):
+        traced = []
+        m = CompiledMachine(_states(), "state1", tracer=lambda *t: traced.append(t), count=True)
+        for _ in range(3):
+            m.try_trans_to("state2")
+            m.try_trans_to("state1")
+        m.try_trans_to("state3")
+        self.assertEqual({("state1", "state2"): 3, ("state2", "state1"): 3}, m.counters())
+        self.assertEqual(("state1", "state3", Result.Illegal), traced[-1])
+        self.assertEqual(7, len(traced))
+
+    def test_no_counters(self):
+        m = CompiledMachine(_states(), "state1")
+        m.trans_to("state2")
+        self.assertEqual({}, m.counters())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,187 @@
+import threading
+import time
+import unittest
+
+from .events import *
+from .machine import State, StateNotFound, StateTransIllegal
+
+
+def _states(**callbacks) -> set[State]:
+    return {
+        State(name="idle", next_states={"busy"}, **callbacks.get("idle", {})),
+        State(name="busy", next_states={"idle"}, **callbacks.get("busy", {})),
+    }
+
+
+class TestEventMachine(unittest.TestCase):
+    def test_transitions_and_guards(self):
+        m = EventMachine(_states(), "idle", [
+            Transition("start", "idle", "busy", guard=lambda payload: payload != "refused"),
+            Transition("stop", "busy", "idle"),
+        ])
+        m.post("start", "refused")
+        self.assertEqual("idle", m.state())
+        m.post("stop")
+        self.assertEqual("idle", m.state())
+        m.post("start")
+        self.assertEqual("busy", m.state())
+        self.assertEqual(2, m.stats.rejected)
+        self.assertEqual(3, m.stats.dispatched)
+
+    def test_first_passing_guard_wins(self):
+        taken = []
+        m = EventMachine(_states(), "idle", [
+            Transition("start", "idle", "busy", guard=lambda n: n > 10, action=lambda n: taken.append("big")),
+            Transition("start", "idle", "busy", action=lambda n: taken.append("small")),
+        ])
+        m.post("start", 1)
+        self.assertEqual(["small"], taken)
+
+    def test_invalid_transitions(self):
+        with self.assertRaises(StateNotFound):
+            EventMachine(_states(), "idle", [Transition("start", "idle", "not_exist_state")])
+        with self.assertRaises(StateTransIllegal):
+            EventMachine({State(name="idle"), State(name="busy")}, "idle", [Transition("start", "idle", "busy")])
+
+    def test_run_to_completion(self):
+        # an event posted by an action is dispatched after the action returns, not inside it
+        log = []
+        m = None
+
+        def on_start(payload):
+            m.post("stop")
+            log.append(("start done", m.state()))
+
+        m = EventMachine(_states(), "idle", [
+            Transition("start", "idle", "busy", action=on_start),
+            Transition("stop", "busy", "idle", action=lambda payload: log.append(("stop done", m.state()))),
+        ])
+        m.post("start")
+        self.assertEqual([("start done", "busy"), ("stop done", "idle")], log)
+
+    def test_executor(self):
+        deferred = []
+        entered = []
+        m = EventMachine(_states(busy={"on_enter": entered.append}), "idle",
+                         [Transition("start", "idle", "busy")], executor=deferred.append)
+        m.post("start")
+        self.assertEqual("busy", m.state())
+        self.assertEqual([], entered)
+        for fn in deferred:
+            fn()
+        self.assertEqual(["idle"], entered)
+
+    def test_failing_action(self):
+        def fail(payload):
+            raise ValueError("boom")
+
+        m = EventMachine(_states(), "idle", [
+            Transition("start", "idle", "busy", action=fail),
+            Transition("stop", "busy", "idle"),
+        ])
+        m.post("start")
+        m.post("stop")
+        self.assertEqual("idle", m.state())
+
+    def test_interrupted_action(self):
+        def interrupt(payload):
+            raise KeyboardInterrupt
+
+        m = EventMachine(_states(), "idle", [
+            Transition("start", "idle", "busy", action=interrupt),
+            Transition("stop", "busy", "idle"),
+        ])
+        with self.assertRaises(KeyboardInterrupt):
+            m.post("start")
+        self.assertEqual("busy", m.state())
+        m.post("stop")
+        self.assertTrue(m.wait_idle(1))
+        self.assertEqual("idle", m.state())
+
+    def test_coalesce(self):
+        # a slow action keeps the dispatcher busy while the burst queues up behind it
+        release = threading.Event()
+        seen = []
+
+        def action(payload):
+            seen.append(payload)
+            if payload == 0:
+                release.wait(5)
+
+        m = EventMachine(_states(), "idle", [Transition("ping", {"idle", "busy"}, "idle", action=action)],
+                         coalesce=True)
+        t = threading.Thread(target=m.post, args=("ping", 0))
+        t.start()
+        while not seen:
+            time.sleep(0.001)
+        for i in range(1, 100):
+            m.post("ping", i)
+        release.set()
+        t.join()
+        self.assertTrue(m.wait_idle(5))
+        self.assertEqual([0, 99], seen)
+        self.assertEqual(98, m.stats.coalesced)
+
+
+class TestEventMachineStress(unittest.TestCase):
+    _THREADS = 8
+    _EVENTS = 5000
+
+    def _flood(self, m: EventMachine):
+        barrier = threading.Barrier(self._THREADS)
+
+        def work(n):
+            barrier.wait()
+            for i in range(self._EVENTS):
+                m.post("toggle", (n, i))
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(self._THREADS)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertTrue(m.wait_idle(10))
+        return time.perf_counter() - start
+
+    def test_order_and_throughput(self):
+        seen = []
+        concurrent = 0
+        max_concurrent = 0
+
+        def action(payload):
+            nonlocal concurrent, max_concurrent
+            concurrent += 1
+            max_concurrent = max(max_concurrent, concurrent)
+            seen.append(payload)
+            concurrent -= 1
+
+        m = EventMachine(_states(), "idle", [
+            Transition("toggle", "idle", "busy", action=action),
+            Transition("toggle", "busy", "idle", action=action),
+        ])
+        elapsed = self._flood(m)
+
+        total = self._THREADS * self._EVENTS
+        self.assertEqual(total, len(seen))
+        self.assertEqual(total, m.stats.dispatched)
+        # one event at a time, and the events of every thread in the order they were posted
+        self.assertEqual(1, max_concurrent)
+        for n in range(self._THREADS):
+            self.assertEqual(list(range(self._EVENTS)), [i for t, i in seen if t == n])
+        # an even number of toggles ends where it started
+        self.assertEqual("idle", m.state())
+        self.assertLess(elapsed, 10)
+
+    def test_coalesced_flood(self):
+        m = EventMachine(_states(), "idle", [
+            Transition("toggle", "idle", "busy"),
+            Transition("toggle", "busy", "idle"),
+        ], coalesce=True)
+        self._flood(m)
+        self.assertEqual(self._THREADS * self._EVENTS, m.stats.posted)
+        self.assertEqual(m.stats.posted, m.stats.dispatched + m.stats.coalesced)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,18 @@
+from .history import init, record, search, recent, thumbnail_of, thumbnail, flush, close, Writer
+from .store import Store, Entry, Error
+
+__all__ = ["init",
+           "record",
+           "search",
+           "recent",
+           "thumbnail_of",
+           "thumbnail",
+           "flush",
+           "close",
+
+           "Store",
+           "Entry",
+           "Writer",
+
+           "Error",
+           ]
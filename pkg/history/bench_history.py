@@ -0,0 +1,73 @@
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from PySide6 import QtGui
+
+from pkg import trace
+
+from .history import thumbnail
+from .store import Store
+
+# search latency over a full history: fills a store with --entries clips of made-up sentences and a
+# thumbnail each, then times searches for words, substrings and misses. prints the file size too
+# usage: python -m pkg.history.bench_history [--entries 50000] [--searches 200]
+
+_WORDS = ("file edit view window help save changes before closing settings network error connection "
+          "download update restart server password account language subtitle chapter level quest").split()
+
+
+def _sentence(rng: random.Random) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(3, 12))) + f" {rng.randint(0, 99999)}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=50_000)
+    parser.add_argument("--searches", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    image = QtGui.QImage(1200, 120, QtGui.QImage.Format.Format_RGB32)
+    image.fill(QtGui.QColor("white"))
+    start = time.perf_counter()
+    thumb = thumbnail(image, 320, 180, 60)
+    encode = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "history.sqlite3")
+        store = Store(path)
+        start = time.perf_counter()
+        for _ in range(0, args.entries, 500):
+            store.add([(time.time(), "en", "zh", _sentence(rng), _sentence(rng), thumb) for _ in range(500)])
+        fill = time.perf_counter() - start
+
+        queries = {
+            "word": lambda: rng.choice(_WORDS),
+            "phrase": lambda: " ".join(rng.sample(_WORDS, 2)),
+            "substring": lambda: rng.choice(_WORDS)[1:5],
+            "number": lambda: str(rng.randint(0, 99999)),
+            "miss": lambda: "zzz" + rng.choice(_WORDS),
+            "short": lambda: rng.choice(_WORDS)[:2],
+        }
+        print(f"{len(store)} clips in {fill:.2f}s ({fill / len(store) * 1e6:.0f} us per clip), "
+              f"thumbnail {len(thumb)} bytes in {encode * 1000:.2f} ms, "
+              f"file {os.path.getsize(path) / (1 << 20):.1f} MiB")
+        for name, query in queries.items():
+            times = []
+            for _ in range(args.searches):
+                q = query()
+                start = time.perf_counter()
+                store.search(q)
+                times.append(time.perf_counter() - start)
+            times.sort()
+            print(f"search {name:<9} p50 {statistics.median(times) * 1000:.2f} ms, "
+                  f"p99 {trace.nearest_rank(times, 99) * 1000:.2f} ms")
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
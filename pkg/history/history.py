@@ -0,0 +1,181 @@
+import atexit
+import queue
+import threading
+import time
+from typing import AnyStr, LiteralString
+
+from PySide6 import QtCore, QtGui
+
+from pkg import conf, logs, trace
+from .store import Store, Entry
+
+Str = AnyStr | LiteralString
+
+# the store is opened on first use, or by init
+_store: Store | None = None
+_writer: "Writer | None" = None
+_lock = threading.Lock()
+# set when the configured path is None or the store cannot be opened, records are dropped
+_disabled = False
+
+
+def thumbnail(image: QtGui.QImage, max_width: int, max_height: int, quality: int) -> bytes:
+    # a jpeg of image scaled down to fit max_width x max_height, QImage is safe to use off the gui thread
+    if image.width() > max_width or image.height() > max_height:
+        image = image.scaled(max_width, max_height, QtCore.Qt.AspectRatioMode.KeepAspectRatio,
+                             QtCore.Qt.TransformationMode.SmoothTransformation)
+    data = QtCore.QByteArray()
+    buffer = QtCore.QBuffer(data)
+    buffer.open(QtCore.QIODevice.OpenModeFlag.WriteOnly)
+    image.save(buffer, "JPG", quality)
+    buffer.close()
+    return data.data()
+
+
+# scales, compresses and stores clips in a thread of its own: record only queues, so the gui thread
+# never waits for jpeg encoding or the disk. clips queued while a batch is written go in one transaction
+class Writer:
+    # clips written per transaction at most
+    _BATCH = 256
+
+    def __init__(self, store: Store):
+        self._store = store
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, text: str, translated: str, from_lang: str, to_lang: str, image: QtGui.QImage | None):
+        self._queue.put((time.time(), from_lang, to_lang, text, translated, image))
+
+    def flush(self, timeout: float | None = None) -> bool:
+        # waits until everything queued before the call is stored
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: float | None = None):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            while len(items) < self._BATCH:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            rows = [item for item in items if isinstance(item, tuple)]
+            if rows:
+                self._write(rows)
+            for item in items:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if None in items:
+                return
+
+    def _write(self, rows: list[tuple]):
+        try:
+            with trace.span("history.write"):
+                entries = []
+                for created_at, from_lang, to_lang, text, translated, image in rows:
+                    thumb = None
+                    if image is not None and not image.isNull():
+                        thumb = thumbnail(image, conf.history.thumbnail_max_width,
+                                          conf.history.thumbnail_max_height, conf.history.thumbnail_quality)
+                    entries.append((created_at, from_lang, to_lang, text, translated, thumb))
+                self._store.add(entries)
+        except Exception as e:
+            logs.error(f"failed to write {len(rows)} clips to history: {e}")
+
+
+def init(path: Str | None = None, store: Store | None = None):
+    # opens the store at path, conf.history.path by default, or uses store
+    with _lock:
+        _close()
+        _init(store if store is not None else _open(path))
+
+
+def _init(store: Store | None):
+    global _store, _writer, _disabled
+    _store = store
+    _writer = Writer(store) if store is not None else None
+    _disabled = store is None
+
+
+def record(text: Str, translated: Str, from_lang: Str, to_lang: Str, image: QtGui.QImage | None = None):
+    # keeps a translated clip, returns at once
+    if not text.strip():
+        return
+    writer = _get_writer()
+    if writer is not None:
+        writer.put(text, translated, from_lang, to_lang, image)
+
+
+@trace.timed("history.search")
+def search(query: Str, limit: int = 20) -> list[Entry]:
+    # clips whose text or translation contains query, the newest first
+    store = _get_store()
+    return store.search(query, limit) if store is not None else []
+
+
+def recent(limit: int = 20) -> list[Entry]:
+    store = _get_store()
+    return store.recent(limit) if store is not None else []
+
+
+def thumbnail_of(entry_id: int) -> bytes | None:
+    store = _get_store()
+    return store.thumbnail(entry_id) if store is not None else None
+
+
+def flush(timeout: float | None = None) -> bool:
+    writer = _writer
+    return writer.flush(timeout) if writer is not None else True
+
+
+def close():
+    with _lock:
+        _close()
+
+
+def _close():
+    # the next use opens the store again
+    global _store, _writer, _disabled
+    _disabled = False
+    if _writer is not None:
+        _writer.close()
+        _writer = None
+    if _store is not None:
+        _store.close()
+        _store = None
+
+
+def _open(path: Str | None) -> Store | None:
+    if path is None:
+        path = conf.history.path
+    if not path:
+        return None
+    try:
+        return Store(path, conf.history.max_entries, conf.history.max_bytes, conf.history.max_age)
+    except Exception as e:
+        logs.error(f"failed to open history {path}, clips are not kept: {e}")
+        return None
+
+
+def _get_store() -> Store | None:
+    if _store is None and not _disabled:
+        with _lock:
+            if _store is None and not _disabled:
+                _init(_open(None))
+    return _store
+
+
+def _get_writer() -> Writer | None:
+    _get_store()
+    return _writer
+
+
+atexit.register(close)
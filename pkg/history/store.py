@@ -0,0 +1,181 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import AnyStr, LiteralString, NamedTuple
+
+from pkg import logs
+
+Str = AnyStr | LiteralString
+
+
+class Error(RuntimeError):
+    pass
+
+
+class Entry(NamedTuple):
+    id: int
+    created_at: float
+    from_lang: str
+    to_lang: str
+    text: str
+    translated: str
+
+
+# clips in a sqlite file: the text and its translation, a compressed thumbnail, and an fts5 index over both texts.
+# the trigram tokenizer indexes any 3 characters, so substrings and text without spaces (chinese, japanese)
+# are found too. thumbnails are only read by id, searches never touch them
+class Store:
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS clip (
+            id INTEGER PRIMARY KEY,
+            created_at REAL NOT NULL,
+            from_lang TEXT NOT NULL,
+            to_lang TEXT NOT NULL,
+            text TEXT NOT NULL,
+            translated TEXT NOT NULL,
+            thumbnail BLOB,
+            size INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS clip_created_at ON clip (created_at);
+        CREATE VIRTUAL TABLE IF NOT EXISTS clip_fts USING fts5(
+            text, translated, content='clip', content_rowid='id', tokenize='{tokenize}'
+        );
+        CREATE TRIGGER IF NOT EXISTS clip_insert AFTER INSERT ON clip BEGIN
+            INSERT INTO clip_fts (rowid, text, translated) VALUES (new.id, new.text, new.translated);
+        END;
+        CREATE TRIGGER IF NOT EXISTS clip_delete AFTER DELETE ON clip BEGIN
+            INSERT INTO clip_fts (clip_fts, rowid, text, translated) VALUES ('delete', old.id, old.text, old.translated);
+        END;
+    """
+    # the trigram tokenizer needs sqlite 3.34, older ones get words only
+    _TOKENIZERS = ("trigram", "unicode61")
+    _MIN_TRIGRAM = 3
+    _COLUMNS = "clip.id, clip.created_at, clip.from_lang, clip.to_lang, clip.text, clip.translated"
+    # enforcing the limits needs sums over the table, do it once per this many adds
+    _EVICT_INTERVAL = 64
+
+    def __init__(self, path: Str, max_entries: int | None = None, max_bytes: int | None = None,
+                 max_age: float | None = None):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._adds = 0
+        # the writer thread adds while the gui thread searches, one connection is shared and guarded by a lock
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self.tokenizer = self._create_schema()
+        self.evict()
+
+    def _create_schema(self) -> str:
+        row = self._conn.execute("SELECT sql FROM sqlite_master WHERE name = 'clip_fts'").fetchone()
+        if row is not None:
+            return next((t for t in self._TOKENIZERS if t in row[0]), self._TOKENIZERS[-1])
+
+        for tokenizer in self._TOKENIZERS:
+            try:
+                self._conn.executescript(self._SCHEMA.format(tokenize=tokenizer))
+                return tokenizer
+            except sqlite3.OperationalError as e:
+                logs.warning(f"history index without {tokenizer} tokenizer: {e}")
+        raise Error("sqlite has no fts5")
+
+    def add(self, entries: list[tuple[float, str, str, str, str, bytes | None]]):
+        # (created_at, from_lang, to_lang, text, translated, thumbnail) in one transaction
+        rows = [(*entry, _size(*entry[3:])) for entry in entries]
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "INSERT INTO clip (created_at, from_lang, to_lang, text, translated, thumbnail, size) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+                )
+            self._adds += len(rows)
+            if self._adds >= self._EVICT_INTERVAL:
+                self._adds = 0
+                self.evict()
+
+    def search(self, query: Str, limit: int = 20) -> list[Entry]:
+        # clips whose text or translation contains query, the newest first
+        query = " ".join(query.split())
+        if not query:
+            return self.recent(limit)
+
+        if self.tokenizer == "trigram" and len(query) < self._MIN_TRIGRAM:
+            # too short for the trigram index, a scan of the newest clips
+            pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            sql = (f"SELECT {self._COLUMNS} FROM clip WHERE text LIKE ? ESCAPE '\\' OR translated LIKE ? ESCAPE '\\' "
+                   "ORDER BY id DESC LIMIT ?")
+            params = (pattern, pattern, limit)
+        else:
+            # newest first straight from the index: ranking would score every match, a common word matches
+            # thousands of clips
+            sql = (f"SELECT {self._COLUMNS} FROM clip JOIN (SELECT rowid FROM clip_fts WHERE clip_fts MATCH ? "
+                   "ORDER BY rowid DESC LIMIT ?) AS hit ON clip.id = hit.rowid ORDER BY clip.id DESC")
+            params = ('"' + query.replace('"', '""') + '"', limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [Entry(*row) for row in rows]
+
+    def recent(self, limit: int = 20) -> list[Entry]:
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {self._COLUMNS} FROM clip ORDER BY id DESC LIMIT ?",
+                                      (limit,)).fetchall()
+        return [Entry(*row) for row in rows]
+
+    def thumbnail(self, entry_id: int) -> bytes | None:
+        with self._lock:
+            row = self._conn.execute("SELECT thumbnail FROM clip WHERE id = ?", (entry_id,)).fetchone()
+        return row[0] if row else None
+
+    def evict(self):
+        # deletes the oldest clips until every limit holds
+        deleted = 0
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            if self.max_age is not None:
+                deleted += self._conn.execute("DELETE FROM clip WHERE created_at < ?",
+                                              (time.time() - self.max_age,)).rowcount
+
+            count, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM clip").fetchone()
+            if self.max_entries is not None and count > self.max_entries:
+                deleted += self._delete_oldest(count - self.max_entries)
+                count, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM clip").fetchone()
+
+            if self.max_bytes is not None and size > self.max_bytes:
+                # the newest clips that fit, everything older goes
+                row = self._conn.execute(
+                    "SELECT id FROM (SELECT id, SUM(size) OVER (ORDER BY id DESC) AS total FROM clip) "
+                    "WHERE total > ? ORDER BY id DESC LIMIT 1", (self.max_bytes,)
+                ).fetchone()
+                if row is not None:
+                    deleted += self._conn.execute("DELETE FROM clip WHERE id <= ?", (row[0],)).rowcount
+
+        if deleted:
+            logs.info(f"evicted {deleted} clips from history")
+
+    def _delete_oldest(self, n: int) -> int:
+        return self._conn.execute("DELETE FROM clip WHERE id IN (SELECT id FROM clip ORDER BY id LIMIT ?)",
+                                  (n,)).rowcount
+
+    def size(self) -> int:
+        # bytes of text and thumbnails counted against max_bytes
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM clip").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM clip").fetchone()[0]
+
+
+def _size(text: str, translated: str, thumbnail: bytes | None) -> int:
+    return len(text.encode()) + len(translated.encode()) + (len(thumbnail) if thumbnail else 0)
@@ -0,0 +1,115 @@
+import os
+import tempfile
+import time
+import unittest
+
+from PySide6 import QtGui
+
+from .history import *
+from .store import *
+from . import history
+
+
+def _rows(*texts: str, created_at: float | None = None) -> list:
+    now = time.time() if created_at is None else created_at
+    return [(now, "en", "zh", text, f"<{text}>", None) for text in texts]
+
+
+class TestStore(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._dir.name, "history.sqlite3")
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_search_substrings(self):
+        s = Store(self._path)
+        s.add(_rows("File Edit View", "Save changes before closing?", "設定を保存しますか", "Edit"))
+        self.assertEqual(["Save changes before closing?"], [e.text for e in s.search("changes before")])
+        self.assertEqual(["設定を保存しますか"], [e.text for e in s.search("保存しま")])
+        # matches in the translation count too, and case does not matter
+        self.assertEqual(["File Edit View"], [e.text for e in s.search("<FILE")])
+        # shorter than a trigram
+        self.assertEqual(["Edit", "File Edit View"], [e.text for e in s.search("Ed")])
+        self.assertEqual([], s.search('"; DROP TABLE clip; --'))
+        self.assertEqual(4, len(s.recent()))
+        s.close()
+
+    def test_survives_restart(self):
+        s = Store(self._path)
+        s.add([(time.time(), "en", "zh", "hello", "你好", b"jpeg")])
+        s.close()
+
+        s = Store(self._path)
+        entry, = s.search("hello")
+        self.assertEqual(("en", "zh", "你好"), (entry.from_lang, entry.to_lang, entry.translated))
+        self.assertEqual(b"jpeg", s.thumbnail(entry.id))
+        s.close()
+
+    def test_max_entries(self):
+        s = Store(self._path, max_entries=3)
+        s.add(_rows(*(f"clip {i}" for i in range(5))))
+        s.evict()
+        self.assertEqual(["clip 4", "clip 3", "clip 2"], [e.text for e in s.recent()])
+        # evicted clips are gone from the index as well
+        self.assertEqual([], s.search("clip 0"))
+        s.close()
+
+    def test_max_bytes(self):
+        s = Store(self._path, max_bytes=250)
+        s.add([(time.time(), "en", "zh", f"clip {i}", "", b"x" * 100) for i in range(5)])
+        s.evict()
+        self.assertEqual(["clip 4", "clip 3"], [e.text for e in s.recent()])
+        self.assertLessEqual(s.size(), 250)
+        s.close()
+
+    def test_max_age(self):
+        s = Store(self._path, max_age=60)
+        s.add(_rows("old", created_at=time.time() - 120) + _rows("new"))
+        s.evict()
+        self.assertEqual(["new"], [e.text for e in s.recent()])
+        s.close()
+
+
+class TestHistory(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        init(os.path.join(self._dir.name, "history.sqlite3"))
+
+    def tearDown(self):
+        close()
+        self._dir.cleanup()
+
+    def test_record_and_search(self):
+        image = QtGui.QImage(1200, 80, QtGui.QImage.Format.Format_RGB32)
+        image.fill(QtGui.QColor("white"))
+        record("Save changes before closing?", "关闭前保存更改？", "en", "zh", image)
+        record("   ", "", "en", "zh")
+        self.assertTrue(flush(5))
+
+        entry, = search("before closing")
+        self.assertEqual("关闭前保存更改？", entry.translated)
+        thumb = QtGui.QImage.fromData(thumbnail_of(entry.id))
+        self.assertEqual((320, 21), (thumb.width(), thumb.height()))
+        self.assertEqual(1, len(recent()))
+
+    def test_record_does_not_wait(self):
+        image = QtGui.QImage(1920, 1080, QtGui.QImage.Format.Format_RGB32)
+        start = time.perf_counter()
+        for i in range(20):
+            record(f"clip {i}", "", "en", "zh", image)
+        self.assertLess(time.perf_counter() - start, 0.05)
+        self.assertTrue(flush(10))
+        self.assertEqual(20, len(recent(100)))
+
+    def test_disabled(self):
+        init("")
+        record("hello", "你好", "en", "zh")
+        self.assertTrue(flush())
+        self.assertEqual([], search("hello"))
+        self.assertIsNone(history._store)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,5 @@
-from .hotkey import Hotkey, HotkeyManager, HotkeyFsModifiers
+from .hotkey import Hotkey, HotkeyManager, HotkeyFsModifiers, VirtualKey
+from .backend import Backend, Win32Backend, FakeBackend, default_backend
 
-__all__ = ["Hotkey", "HotkeyManager", "HotkeyFsModifiers"]
+__all__ = ["Hotkey", "HotkeyManager", "HotkeyFsModifiers", "VirtualKey",
+           "Backend", "Win32Backend", "FakeBackend", "default_backend"]
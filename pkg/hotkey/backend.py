@@ -0,0 +1,109 @@
+import abc
+import ctypes
+import ctypes.wintypes
+import enum
+import queue
+import sys
+import threading
+from typing import Callable
+
+from pkg import logs
+
+if sys.platform == "win32":
+    import win32con
+
+    user32 = ctypes.windll.user32
+    kernel32 = ctypes.windll.kernel32
+
+# where key presses come from. a backend registers (id, modifiers, virtual key) triples,
+# then run() blocks on its event source and calls dispatch(id) for every press until stop()
+
+Dispatch = Callable[[int], None]
+
+
+class HotkeyFsModifiers(enum.IntEnum):
+    MOD_NONE = 0x0
+    MOD_ALT = 0x0001
+    MOD_CONTROL = 0x0002
+    # don't repeat WM_HOTKEY while a key is held down
+    MOD_NOREPEAT = 0x4000
+    MOD_SHIFT = 0x0004
+    MOD_WIN = 0x0008
+
+
+class Backend(abc.ABC):
+    @abc.abstractmethod
+    def run(self, hotkeys: dict[int, tuple[int, int]], dispatch: Dispatch):
+        # hotkeys is id -> (modifiers, virtual key)
+        ...
+
+    @abc.abstractmethod
+    def stop(self):
+        # makes run() return, callable from any thread
+        ...
+
+
+class Win32Backend(Backend):
+    # RegisterHotKey binds a hotkey to the calling thread, so registering, the message loop
+    # and unregistering all happen in run()
+    def __init__(self):
+        self._thread_id: int | None = None
+        self._started = threading.Event()
+
+    def run(self, hotkeys: dict[int, tuple[int, int]], dispatch: Dispatch):
+        self._thread_id = kernel32.GetCurrentThreadId()
+        registered = []
+        for hk_id, (fs_modifiers, vk) in hotkeys.items():
+            if user32.RegisterHotKey(None, hk_id, fs_modifiers | HotkeyFsModifiers.MOD_NOREPEAT, vk):
+                registered.append(hk_id)
+            else:
+                logs.info(f"failed to register hotkey: {hk_id}")
+        self._started.set()
+
+        try:
+            msg = ctypes.wintypes.MSG()
+            # 0 is WM_QUIT posted by stop, -1 is an error
+            while user32.GetMessageA(ctypes.byref(msg), None, 0, 0) > 0:
+                if msg.message == win32con.WM_HOTKEY:
+                    dispatch(msg.wParam)
+                    continue
+                user32.TranslateMessage(ctypes.byref(msg))
+                user32.DispatchMessageA(ctypes.byref(msg))
+        finally:
+            for hk_id in registered:
+                user32.UnregisterHotKey(None, hk_id)
+
+    def stop(self):
+        self._started.wait(1)
+        if self._thread_id is not None:
+            user32.PostThreadMessageA(self._thread_id, win32con.WM_QUIT, 0, 0)
+
+
+class FakeBackend(Backend):
+    # in-process key presses for tests and platforms without global hotkeys, press() from any thread
+    def __init__(self):
+        self._events: queue.SimpleQueue[tuple[int, int] | None] = queue.SimpleQueue()
+        self._keys: dict[tuple[int, int], int] = {}
+        # presses of a registered hotkey handed to dispatch
+        self.dispatched = 0
+
+    def press(self, vk: int, fs_modifiers: int = 0):
+        self._events.put((fs_modifiers, vk))
+
+    def run(self, hotkeys: dict[int, tuple[int, int]], dispatch: Dispatch):
+        self._keys = {key: hk_id for hk_id, key in hotkeys.items()}
+        while (event := self._events.get()) is not None:
+            hk_id = self._keys.get(event)
+            if hk_id is not None:
+                self.dispatched += 1
+                dispatch(hk_id)
+
+    def stop(self):
+        self._events.put(None)
+
+
+def default_backend() -> Backend:
+    if sys.platform == "win32":
+        return Win32Backend()
+    logs.warning("global hotkeys are only supported on windows, hotkeys only come from FakeBackend.press")
+    return FakeBackend()
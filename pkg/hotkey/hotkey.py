@@ -1,23 +1,26 @@
 import enum
 import threading
+import time
 from typing import Callable
 
-import win32con
-import ctypes
-import ctypes.wintypes
+from pkg import logs, conf
+from .backend import Backend, HotkeyFsModifiers, default_backend
 
-from pkg import logs
 
-user32 = ctypes.windll.user32
-
-
-class HotkeyFsModifiers(enum.IntEnum):
-    MOD_NONE = 0x0
-    MOD_ALT = 0x0001
-    MOD_CONTROL = 0x0002
-    MOD_NOREPEAT = 0x4000
-    MOD_SHIFT = 0x0004
-    MOD_WIN = 0x0008
+class VirtualKey(enum.IntEnum):
+    # https://learn.microsoft.com/en-us/windows/win32/inputdev/virtual-key-codes
+    F1 = 0x70
+    F2 = 0x71
+    F3 = 0x72
+    F4 = 0x73
+    F5 = 0x74
+    F6 = 0x75
+    F7 = 0x76
+    F8 = 0x77
+    F9 = 0x78
+    F10 = 0x79
+    F11 = 0x7A
+    F12 = 0x7B
 
 
 class Hotkey:
@@ -25,62 +28,68 @@ class Hotkey:
             self,
             callback: Callable,
             fs_modifiers: HotkeyFsModifiers,
-            vk: int,  # from win32con.VK
+            vk: int,  # VirtualKey or win32con.VK_*
+            debounce: float | None = None,
     ):
+        # presses within debounce seconds after the callback of the last accepted press returned are dropped,
+        # so a held key or a burst of presses runs the callback once
         self.callback = callback
         self.fs_modifiers = fs_modifiers
         self.vk = vk
+        self.debounce = conf.key.hotkey_debounce if debounce is None else debounce
 
 
-# TODO: support gracefully exit
 class HotkeyManager(threading.Thread):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, backend: Backend | None = None):
+        super().__init__(name="hotkey")
         self.id = 100
-        self.hotkeys: list[tuple[int, Hotkey]] = []
+        self.hotkeys: dict[int, Hotkey] = {}
+        self.backend = backend or default_backend()
         self.daemon = True
+        # id -> monotonic time the last accepted press was done, and presses dropped by debouncing
+        self._done: dict[int, float] = {}
+        self.dropped = 0
 
-    def register(self, hk: Hotkey):
+    def register(self, hk: Hotkey) -> int:
         if self.is_alive():
             logs.info("failed to register hotkey, please register hotkey before thread is running")
+            return -1
 
-        logs.info(f"register {hk.vk} successfully, id is {self.id}")
-        self.hotkeys.append((self.id, hk))
+        hk_id = self.id
+        self.hotkeys[hk_id] = hk
         self.id += 1
+        logs.info(f"register {hk.vk} successfully, id is {hk_id}")
+        return hk_id
 
     def unregister(self, hk_id: int):
-        for (_hk_id, _) in self.hotkeys:
-            if _hk_id == hk_id:
-                user32.UnregisterHotKey(None, hk_id)
-                return
+        # presses of an unregistered hotkey are ignored, the backend releases the key when it stops
+        self.hotkeys.pop(hk_id, None)
 
     def unregister_all(self):
-        for (hk_id, _) in self.hotkeys:
-            self.unregister(hk_id)
+        self.hotkeys.clear()
 
     def run(self):
-        for (hk_id, hk) in self.hotkeys:
-            if not user32.RegisterHotKey(None, hk_id, hk.fs_modifiers, hk.vk):
-                logs.info(f"failed to register hotkey: {hk_id}")
+        keys = {hk_id: (int(hk.fs_modifiers), int(hk.vk)) for hk_id, hk in self.hotkeys.items()}
+        self.backend.run(keys, self._dispatch)
+        logs.info("hotkey manager is stopped")
+
+    def stop(self, timeout: float | None = 1.0):
+        self.backend.stop()
+        if self.is_alive():
+            self.join(timeout)
+
+    def _dispatch(self, hk_id: int):
+        hk = self.hotkeys.get(hk_id)
+        if hk is None:
+            return
+
+        if time.monotonic() - self._done.get(hk_id, -hk.debounce) < hk.debounce:
+            self.dropped += 1
+            return
 
         try:
-            msg = ctypes.wintypes.MSG()
-            while True:
-                if user32.GetMessageA(ctypes.byref(msg), None, 0, 0) != 0:
-                    if msg.message == win32con.WM_HOTKEY:
-                        consumed = False
-                        key_id = msg.wParam
-                        for (hk_id, hk) in self.hotkeys:
-                            if hk_id != key_id:
-                                continue
-
-                            consumed = True
-                            hk.callback()
-
-                        if consumed:
-                            continue
-
-                    user32.TranslateMessage(ctypes.byref(msg))
-                    user32.DispatchMessageA(ctypes.byref(msg))
+            hk.callback()
+        except Exception as e:
+            logs.error(f"hotkey {hk_id} callback failed: {e}")
         finally:
-            self.unregister_all()
+            self._done[hk_id] = time.monotonic()
@@ -0,0 +1,115 @@
+import threading
+import time
+import unittest
+
+from .backend import *
+from .hotkey import *
+
+
+class TestHotkeyManager(unittest.TestCase):
+    def _manager(self, *hotkeys: Hotkey) -> tuple[HotkeyManager, FakeBackend, list[int]]:
+        backend = FakeBackend()
+        m = HotkeyManager(backend=backend)
+        ids = [m.register(hk) for hk in hotkeys]
+        m.start()
+        self.addCleanup(m.stop)
+        return m, backend, ids
+
+    def _drain(self, m: HotkeyManager):
+        # the fake backend dispatches in order, once the stop sentinel is reached every press before it was handled
+        m.stop(5)
+        self.assertFalse(m.is_alive())
+
+    def test_dispatch_by_id(self):
+        pressed = []
+        m, backend, ids = self._manager(
+            Hotkey(lambda: pressed.append("f4"), HotkeyFsModifiers.MOD_NONE, VirtualKey.F4, debounce=0),
+            Hotkey(lambda: pressed.append("ctrl+f4"), HotkeyFsModifiers.MOD_CONTROL, VirtualKey.F4, debounce=0),
+        )
+        self.assertEqual([100, 101], ids)
+        backend.press(VirtualKey.F4)
+        backend.press(VirtualKey.F4, HotkeyFsModifiers.MOD_CONTROL)
+        backend.press(VirtualKey.F5)
+        self._drain(m)
+        self.assertEqual(["f4", "ctrl+f4"], pressed)
+
+    def test_register_after_start(self):
+        m, backend, ids = self._manager()
+        self.assertEqual(-1, m.register(Hotkey(lambda: None, HotkeyFsModifiers.MOD_NONE, VirtualKey.F4)))
+
+    def test_unregister(self):
+        pressed = []
+        m, backend, (hk_id,) = self._manager(
+            Hotkey(lambda: pressed.append(1), HotkeyFsModifiers.MOD_NONE, VirtualKey.F4, debounce=0),
+        )
+        m.unregister(hk_id)
+        backend.press(VirtualKey.F4)
+        self._drain(m)
+        self.assertEqual([], pressed)
+
+    def test_failing_callback(self):
+        pressed = []
+
+        def fail():
+            pressed.append(1)
+            raise ValueError("boom")
+
+        m, backend, _ = self._manager(Hotkey(fail, HotkeyFsModifiers.MOD_NONE, VirtualKey.F4, debounce=0))
+        backend.press(VirtualKey.F4)
+        backend.press(VirtualKey.F4)
+        self._drain(m)
+        self.assertEqual([1, 1], pressed)
+
+    def test_flood_is_bounded(self):
+        # a held key: thousands of presses from several threads while a slow callback runs
+        calls = 0
+        started, release = threading.Event(), threading.Event()
+
+        def slow():
+            nonlocal calls
+            calls += 1
+            started.set()
+            release.wait(5)
+
+        m, backend, _ = self._manager(Hotkey(slow, HotkeyFsModifiers.MOD_NONE, VirtualKey.F4, debounce=60))
+        backend.press(VirtualKey.F4)
+        self.assertTrue(started.wait(5))
+
+        def flood():
+            for _ in range(2000):
+                backend.press(VirtualKey.F4)
+
+        threads = [threading.Thread(target=flood) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        release.set()
+        self._drain(m)
+
+        # every press after the first lands within the debounce window and is dropped without running the callback
+        self.assertEqual(8001, backend.dispatched)
+        self.assertEqual(1, calls)
+        self.assertEqual(8000, m.dropped)
+
+    def test_debounce_expires(self):
+        pressed = []
+        m, backend, _ = self._manager(
+            Hotkey(lambda: pressed.append(1), HotkeyFsModifiers.MOD_NONE, VirtualKey.F4, debounce=0.05),
+        )
+        backend.press(VirtualKey.F4)
+        backend.press(VirtualKey.F4)
+        time.sleep(0.2)
+        backend.press(VirtualKey.F4)
+        self._drain(m)
+        self.assertEqual([1, 1], pressed)
+        self.assertEqual(1, m.dropped)
+
+    def test_stop_before_start(self):
+        m = HotkeyManager(backend=FakeBackend())
+        m.stop()
+        self.assertFalse(m.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,5 @@
-from .logging_log import init, info, debug, warning, error
+from .logging_log import init, shutdown, info, debug, warning, error, enabled, JsonFormatter, \
+    DEBUG, INFO, WARNING, ERROR
 
-__all__ = ["info", "debug", "init", "warning", "error"]
+__all__ = ["info", "debug", "init", "shutdown", "warning", "error", "enabled", "JsonFormatter",
+           "DEBUG", "INFO", "WARNING", "ERROR"]
@@ -0,0 +1,51 @@
+import argparse
+import os
+import tempfile
+import time
+
+from PySide6 import QtCore
+
+from . import logging_log as logs
+
+# per-call cost on the caller thread of synchronous and queued file logging, and of a disabled level
+# with an eager f-string and with lazy args
+# usage: python -m pkg.logs.bench_logs [-n 20000]
+
+
+def _measure(fn, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rect = QtCore.QRect(10, 20, 300, 400)
+    calls = {
+        "f-string": lambda: logs.debug(f"rect before resize: {rect}"),
+        "lazy args": lambda: logs.debug("rect before resize: %s", rect),
+    }
+
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "bench.log")
+        for label, options in (
+                ("sync", dict(async_mode=False)),
+                ("async", dict(async_mode=True)),
+                ("async json", dict(async_mode=True, structured=True)),
+                ("disabled", dict(async_mode=True, level=logs.INFO)),
+        ):
+            logs.init(path, max_bytes=1 << 20, backup_count=1, **options)
+            for name, fn in calls.items():
+                cost = _measure(fn, args.n)
+                print(f"{label:>10} {name:>9}: {cost * 1e6:7.2f} us per call")
+            start = time.perf_counter()
+            logs.shutdown()
+            print(f"{label:>10} drained in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
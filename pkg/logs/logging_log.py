@@ -1,28 +1,143 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
+import sys
 from typing import AnyStr, LiteralString
 
+from pkg import conf
+
 _DEFAULT_FORMAT = "%(asctime)s [%(levelname)s] [%(filename)s:%(lineno)d]: %(message)s"
 
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+ERROR = logging.ERROR
+
+_root = logging.getLogger()
+# handlers installed by init, replaced when init is called again
+_handlers: list[logging.Handler] = []
+_listener: logging.handlers.QueueListener | None = None
+
+
+# messages may be %-style templates with args, they are only formatted when the level is enabled:
+#   logs.debug("rect before resize: %s", rect)
+
+def debug(msg: object, *args):
+    if _root.isEnabledFor(DEBUG):
+        _root.debug(msg, *args, stacklevel=2)
+
+
+def info(msg: object, *args):
+    if _root.isEnabledFor(INFO):
+        _root.info(msg, *args, stacklevel=2)
+
+
+def warning(msg: object, *args):
+    if _root.isEnabledFor(WARNING):
+        _root.warning(msg, *args, stacklevel=2)
+
+
+def error(msg: object, *args):
+    if _root.isEnabledFor(ERROR):
+        _root.error(msg, *args, stacklevel=2)
+
+
+def enabled(level: int) -> bool:
+    # for messages that are expensive to build even with lazy args
+    return _root.isEnabledFor(level)
+
+
+class JsonFormatter(logging.Formatter):
+    # one json object per line
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "file": record.filename,
+            "line": record.lineno,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    # the caller thread only merges the args into the message, so that mutable args are captured as they are now;
+    # timestamps, the format string and the file write happen on the listener thread
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def init(
+        filename: AnyStr | LiteralString | None = None,
+        level: int = DEBUG,
+        async_mode: bool | None = None,
+        max_bytes: int | None = None,
+        backup_count: int | None = None,
+        structured: bool | None = None,
+):
+    # log to filename, stderr if None. options default to pkg.conf.logs:
+    # async_mode hands records to a background writer thread, max_bytes > 0 rotates the file
+    # keeping backup_count old files, structured writes json lines
+    if async_mode is None:
+        async_mode = conf.logs.async_mode
+    if max_bytes is None:
+        max_bytes = conf.logs.max_bytes
+    if backup_count is None:
+        backup_count = conf.logs.backup_count
+    if structured is None:
+        structured = conf.logs.structured
 
-def debug(msg: object):
-    logging.debug(msg=msg, stacklevel=2)
+    shutdown()
 
+    if filename is None:
+        handler = logging.StreamHandler(sys.stderr)
+    elif max_bytes > 0:
+        handler = logging.handlers.RotatingFileHandler(filename, maxBytes=max_bytes, backupCount=backup_count,
+                                                       encoding="utf-8")
+    else:
+        handler = logging.FileHandler(filename, encoding="utf-8")
+    handler.setFormatter(JsonFormatter() if structured else logging.Formatter(_DEFAULT_FORMAT))
 
-def info(msg: object):
-    logging.info(msg=msg, stacklevel=2)
+    global _listener
+    if async_mode:
+        q = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(q, handler)
+        _listener.start()
+        _install(_QueueHandler(q), handler)
+    else:
+        _install(handler)
+    _root.setLevel(level)
 
 
-def warning(msg: object):
-    logging.warning(msg=msg, stacklevel=2)
+def shutdown():
+    # flushes pending records and closes the handlers installed by init
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    for handler in _handlers:
+        _root.removeHandler(handler)
+        handler.close()
+    _handlers.clear()
 
 
-def error(msg: object):
-    logging.error(msg=msg, stacklevel=2)
+def _install(handler: logging.Handler, *owned: logging.Handler):
+    _root.addHandler(handler)
+    _handlers.append(handler)
+    _handlers.extend(owned)
 
 
-def init(filename: AnyStr | LiteralString | None = None, level: int = logging.DEBUG):
-    logging.basicConfig(
-        filename=filename,
-        level=level,
-        format=_DEFAULT_FORMAT,
-    )
+atexit.register(shutdown)
@@ -0,0 +1,106 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import unittest
+
+from .logging_log import *
+
+
+class _Counted:
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return "counted"
+
+
+class TestLogs(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._dir.name, "ragdoll.log")
+
+    def tearDown(self):
+        shutdown()
+        self._dir.cleanup()
+
+    def _lines(self, path=None) -> list[str]:
+        with open(path or self._path, encoding="utf-8") as f:
+            return f.read().splitlines()
+
+    def test_async(self):
+        init(self._path, async_mode=True, structured=False)
+        info("hello %s", "world")
+        shutdown()
+        lines = self._lines()
+        self.assertEqual(1, len(lines))
+        self.assertIn("[INFO]", lines[0])
+        self.assertIn("test_logs.py", lines[0])
+        self.assertTrue(lines[0].endswith("hello world"))
+
+    def test_lazy_format(self):
+        init(self._path, level=INFO, async_mode=True)
+        arg = _Counted()
+        debug("skipped %s", arg)
+        self.assertEqual(0, arg.formatted)
+        info("written %s", arg)
+        # args are merged on the caller thread, the writer thread does not format them again
+        formatted = arg.formatted
+        self.assertGreater(formatted, 0)
+        shutdown()
+        self.assertEqual(formatted, arg.formatted)
+        self.assertTrue(self._lines()[0].endswith("written counted"))
+
+    def test_structured(self):
+        init(self._path, async_mode=True, structured=True)
+        warning("line %d", 1)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logging.exception("failed")
+        shutdown()
+        entries = [json.loads(line) for line in self._lines()]
+        self.assertEqual("line 1", entries[0]["message"])
+        self.assertEqual("WARNING", entries[0]["level"])
+        self.assertEqual("test_logs.py", entries[0]["file"])
+        self.assertIn("ValueError: boom", entries[1]["exc"])
+
+    def test_rotation(self):
+        init(self._path, async_mode=True, max_bytes=1024, backup_count=2)
+        for i in range(200):
+            info("message %d", i)
+        shutdown()
+        self.assertTrue(os.path.exists(self._path + ".1"))
+        self.assertTrue(os.path.exists(self._path + ".2"))
+        self.assertFalse(os.path.exists(self._path + ".3"))
+        self.assertTrue(self._lines()[-1].endswith("message 199"))
+
+    def test_threads(self):
+        init(self._path, async_mode=True, max_bytes=0, structured=True)
+
+        def work(n):
+            for i in range(500):
+                info("%d-%d", n, i)
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        shutdown()
+        self.assertEqual(2000, len({json.loads(line)["message"] for line in self._lines()}))
+
+    def test_reinit(self):
+        init(self._path, async_mode=True)
+        other = os.path.join(self._dir.name, "other.log")
+        init(other, async_mode=False)
+        info("only once")
+        shutdown()
+        self.assertEqual([], self._lines())
+        self.assertEqual(1, len(self._lines(other)))
+
+
+if __name__ == '__main__':
+    unittest.main()
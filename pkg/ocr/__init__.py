@@ -1,3 +1,33 @@
-from .ocr import from_file, from_qpixmap
+from .engine import Engine, CApiEngine, CliEngine, Pixels, Mode, Psm, Recognition, Error, EngineUnavailable, new_engine, \
+    default_engine, release
+from .ocr import from_file, from_image, from_pixels, from_qpixmap, read, read_file, read_qpixmap, warm_up, Text
+from .language import Detector, translator_lang
+from .frames import FrameDiff
 
-__all__ = ["from_file", "from_qpixmap"]
+__all__ = ["from_file",
+           "from_image",
+           "from_pixels",
+           "from_qpixmap",
+           "read",
+           "read_file",
+           "read_qpixmap",
+           "warm_up",
+           "Text",
+           "Detector",
+           "translator_lang",
+           "FrameDiff",
+
+           "Engine",
+           "CApiEngine",
+           "CliEngine",
+           "Pixels",
+           "Mode",
+           "Psm",
+           "Recognition",
+           "new_engine",
+           "default_engine",
+           "release",
+
+           "Error",
+           "EngineUnavailable",
+           ]
@@ -0,0 +1,65 @@
+import argparse
+import statistics
+import time
+
+from PIL import Image
+
+from pkg import logs
+from .engine import Pixels, EngineUnavailable, new_engine
+from . import samples
+
+# compare cold start and warm per-call latency of the ocr engines
+# usage: python -m pkg.ocr.bench_engine [-n 20] [--lang eng] [image]
+
+
+def bench(engine_name: str, pixels: Pixels, lang: str, n: int) -> dict | None:
+    start = time.perf_counter()
+    try:
+        engine = new_engine(engine_name)
+    except EngineUnavailable as e:
+        logs.warning(f"skip {engine_name}: {e}")
+        return None
+
+    text = engine.recognize(pixels, lang)
+    cold = time.perf_counter() - start
+
+    warm = []
+    for _ in range(n):
+        start = time.perf_counter()
+        engine.recognize(pixels, lang)
+        warm.append(time.perf_counter() - start)
+    engine.close()
+
+    return {
+        "engine": engine_name,
+        "cold_ms": cold * 1000,
+        "warm_mean_ms": statistics.fmean(warm) * 1000,
+        "warm_p50_ms": statistics.median(warm) * 1000,
+        "warm_min_ms": min(warm) * 1000,
+        "text": text.strip(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("image", nargs="?")
+    parser.add_argument("-n", type=int, default=20)
+    parser.add_argument("--lang", default="eng")
+    args = parser.parse_args()
+
+    logs.init()
+    img = Image.open(args.image) if args.image else samples.render_text()
+    pixels = Pixels.from_image(img)
+
+    for engine_name in ("capi", "cli"):
+        result = bench(engine_name, pixels, args.lang, args.n)
+        if result is None:
+            continue
+        print(f"{result['engine']:>5}: cold {result['cold_ms']:8.1f} ms, "
+              f"warm mean {result['warm_mean_ms']:8.1f} ms, "
+              f"p50 {result['warm_p50_ms']:8.1f} ms, "
+              f"min {result['warm_min_ms']:8.1f} ms, text: {result['text']!r}")
+
+
+if __name__ == "__main__":
+    main()
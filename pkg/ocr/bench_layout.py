@@ -0,0 +1,66 @@
+import argparse
+import os
+import time
+
+import numpy as np
+from PIL import Image
+
+from pkg import logs
+from .engine import Pixels, EngineUnavailable, new_engine
+from . import layout, pool, samples
+
+# block detection cost on a large synthetic page, and single pass OCR against block-parallel OCR
+# with growing core budgets when an engine is available
+# usage: python -m pkg.ocr.bench_layout [--size 3840x2160] [--workers 1,2,4]
+
+
+def page(width: int, height: int) -> np.ndarray:
+    # a grid of paragraphs on a mostly blank page, like a maximized window
+    img = Image.new("L", (width, height), 255)
+    paragraph = "\n".join(f"{samples.DEFAULT_TEXT} {i}" for i in range(4))
+    block = samples.render_text(paragraph, size=(700, 150), origin=(0, 0)).convert("L")
+    for y in range(60, height - 150, 360):
+        for x in range(60, width - 700, 900):
+            img.paste(block, (x, y))
+    return np.asarray(img)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", default="3840x2160")
+    parser.add_argument("--workers", default=f"1,2,4,{os.cpu_count()}")
+    parser.add_argument("--lang", default="eng")
+    args = parser.parse_args()
+
+    logs.init()
+    width, height = (int(v) for v in args.size.split("x"))
+    g = page(width, height)
+
+    start = time.perf_counter()
+    blocks = layout.detect_blocks(g)
+    elapsed = time.perf_counter() - start
+    covered = sum((bottom - top) * (right - left) for top, bottom, left, right in blocks)
+    print(f"detect {len(blocks)} blocks in {elapsed * 1000:.1f} ms, blocks cover {covered / g.size:.1%} of the page")
+
+    try:
+        engine = new_engine("auto")
+    except EngineUnavailable as e:
+        logs.warning(f"no ocr engine, only detection is measured: {e}")
+        return
+
+    start = time.perf_counter()
+    engine.recognize(Pixels.from_array(g), args.lang)
+    print(f"single pass: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    crops = [layout.crop(g, block, 8) for block in blocks]
+    for workers in (int(w) for w in args.workers.split(",")):
+        p = pool.Pool(workers)
+        p.recognize(crops[:workers], args.lang)  # warm up every worker
+        start = time.perf_counter()
+        p.recognize(crops, args.lang)
+        print(f"{workers:>3} workers: {(time.perf_counter() - start) * 1000:.1f} ms")
+        p.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import argparse
+import collections
+import difflib
+import statistics
+import time
+
+from pkg import logs
+from .engine import Pixels, EngineUnavailable, new_engine
+from . import preprocess, samples
+
+# latency of every preprocess step over a synthetic corpus, and the engine latency and
+# character accuracy with and without preprocessing when an engine is available
+# usage: python -m pkg.ocr.bench_preprocess [-n 5] [--engine auto] [--steps grayscale,invert,...]
+
+
+def accuracy(expected: str, actual: str) -> float:
+    return difflib.SequenceMatcher(None, " ".join(expected.split()), " ".join(actual.split())).ratio()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=5)
+    parser.add_argument("--engine", default="auto")
+    parser.add_argument("--lang", default="eng")
+    parser.add_argument("--steps", default="grayscale,invert,normalize,trim,rescale,binarize")
+    args = parser.parse_args()
+
+    logs.init()
+    pipeline = preprocess.Pipeline(args.steps.split(","))
+    try:
+        engine = new_engine(args.engine)
+    except EngineUnavailable as e:
+        logs.warning(f"no ocr engine, only preprocessing is measured: {e}")
+        engine = None
+
+    for name, img, text in samples.corpus():
+        pixels = Pixels.from_image(img)
+        steps = collections.defaultdict(list)
+        for _ in range(args.n):
+            processed, timings = pipeline.run(pixels)
+            for step, elapsed in timings:
+                steps[step].append(elapsed)
+
+        line = f"{name:>16} {img.width:>4}x{img.height:<4}: " + ", ".join(
+            f"{step} {statistics.median(elapsed) * 1000:.2f}" for step, elapsed in steps.items())
+        total = sum(statistics.median(elapsed) for elapsed in steps.values())
+        line += f", total {total * 1000:.2f} ms"
+
+        if engine is not None:
+            for label, p in (("raw", pixels), ("preprocessed", processed)):
+                start = time.perf_counter()
+                result = engine.recognize(p, args.lang)
+                line += f" | {label} ocr {(time.perf_counter() - start) * 1000:.1f} ms, acc {accuracy(text, result):.2f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
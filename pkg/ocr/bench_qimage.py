@@ -0,0 +1,51 @@
+import argparse
+import io
+import statistics
+import time
+
+from PIL import Image
+from PySide6 import QtGui, QtCore
+
+from .engine import Pixels
+from . import qimage, samples
+
+# compare the PNG round trip from_qpixmap used to do with the direct QImage view
+# usage: python -m pkg.ocr.bench_qimage [-n 10] [--size 3840x2160]
+
+
+def png_round_trip(img: QtGui.QImage) -> Pixels:
+    buffer = QtCore.QBuffer()
+    buffer.open(QtCore.QIODeviceBase.OpenModeFlag.ReadWrite)
+    img.save(buffer, "PNG")
+    return Pixels.from_image(Image.open(io.BytesIO(buffer.data().data())))
+
+
+def measure(fn, img: QtGui.QImage, n: int) -> list[float]:
+    elapsed = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn(img)
+        elapsed.append(time.perf_counter() - start)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=10)
+    parser.add_argument("--size", default="3840x2160")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.split("x"))
+    text = "\n".join([samples.DEFAULT_TEXT] * (height // 40))
+    rgb = samples.render_text(text, size=(width, height), font_size=28)
+    img = QtGui.QImage(rgb.tobytes(), width, height, width * 3, QtGui.QImage.Format.Format_RGB888)
+    img = img.convertToFormat(QtGui.QImage.Format.Format_RGB32)  # what screen grabs usually are
+
+    for name, fn in (("png round trip", png_round_trip), ("qimage view", qimage.to_pixels)):
+        elapsed = measure(fn, img, args.n)
+        print(f"{name:>15}: mean {statistics.fmean(elapsed) * 1000:8.2f} ms, "
+              f"p50 {statistics.median(elapsed) * 1000:8.2f} ms, min {min(elapsed) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import statistics
+import time
+
+from pkg import logs
+from .bench_preprocess import accuracy
+from .engine import Pixels, Mode, Psm, EngineUnavailable, new_engine
+from . import preprocess, samples, segmentation
+
+# latency and character accuracy of a fixed page segmentation against the adaptive one, with and without
+# the confidence fallback, over clips shaped like a word, a line, a block and a page.
+# the cost of measuring the shape is reported without an engine
+# usage: python -m pkg.ocr.bench_segmentation [-n 5] [--engine auto] [--min-confidence 60]
+
+
+def _corpus() -> list[tuple[str, object, str]]:
+    block = "Subtitles often wrap\nonto a second line\nand sometimes a third"
+    page = "\n\n".join(f"Paragraph {i} has a few words on\nmore than one line of text" for i in range(3))
+    return [
+        ("word", samples.render_text("Translate", size=(160, 44)), "Translate"),
+        *samples.corpus(),
+        ("block", samples.render_text(block, size=(420, 130)), block),
+        ("page", samples.render_text(page, size=(640, 420)), page),
+    ]
+
+
+def _recognize(engine, pixels: Pixels, fast: Mode, thorough: Mode, min_confidence: float) -> tuple[str, int]:
+    # the text and the number of engine runs
+    result = engine.recognize_words(pixels, "eng", fast)
+    if result.confidence() >= min_confidence or fast == thorough:
+        return result.text, 1
+    retry = engine.recognize_words(pixels, "eng", thorough)
+    return (retry if retry.confidence() >= result.confidence() else result).text, 2
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=5)
+    parser.add_argument("--engine", default="auto")
+    parser.add_argument("--min-confidence", type=float, default=60)
+    args = parser.parse_args()
+
+    logs.init(level=logs.WARNING)
+    pipeline = preprocess.Pipeline(["grayscale", "invert", "normalize", "trim", "rescale"])
+    try:
+        engine = new_engine(args.engine)
+    except EngineUnavailable as e:
+        logs.warning(f"no ocr engine, only the shape measurement is benchmarked: {e}")
+        engine = None
+
+    thorough = Mode(Psm.AUTO)
+    cases = [
+        ("fixed", lambda fast: (thorough, thorough, 0)),
+        ("adaptive", lambda fast: (fast, thorough, 0)),
+        ("adaptive+fallback", lambda fast: (fast, thorough, args.min_confidence)),
+    ]
+    for name, img, text in _corpus():
+        pixels, _ = pipeline.run(Pixels.from_image(img))
+        g = pixels.to_array()
+        elapsed = []
+        for _ in range(args.n):
+            start = time.perf_counter()
+            shape = segmentation.measure(g)
+            elapsed.append(time.perf_counter() - start)
+        fast = segmentation.choose(shape)
+        line = f"{name:>16}: {shape}, {fast.psm.name} measured in {statistics.median(elapsed) * 1000:.2f} ms"
+
+        if engine is not None:
+            for label, modes in cases:
+                fast_mode, thorough_mode, min_confidence = modes(fast)
+                times = []
+                for _ in range(args.n):
+                    start = time.perf_counter()
+                    result, runs = _recognize(engine, pixels, fast_mode, thorough_mode, min_confidence)
+                    times.append(time.perf_counter() - start)
+                line += (f" | {label} {statistics.median(times) * 1000:.1f} ms x{runs}, "
+                         f"acc {accuracy(text, result):.2f}")
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,438 @@
+import abc
+import ctypes
+import ctypes.util
+import enum
+import os
+import shutil
+import threading
+from typing import AnyStr, LiteralString
+
+import numpy as np
+import pytesseract
+from PIL import Image
+from pytesseract import Output
+
+from pkg import conf, logs
+
+Str = AnyStr | LiteralString
+
+
+class Error(RuntimeError):
+    pass
+
+
+class EngineUnavailable(Error):
+    pass
+
+
+# raw pixel buffer handed to an engine, rows are `bytes_per_line` apart,
+# pixels are gray (1 byte), RGB (3 bytes) or RGBA (4 bytes)
+class Pixels:
+    _MODES = {1: "L", 3: "RGB", 4: "RGBA"}
+
+    def __init__(self, data, width: int, height: int, bytes_per_pixel: int, bytes_per_line: int):
+        if bytes_per_pixel not in self._MODES:
+            raise Error(f"unsupported bytes per pixel: {bytes_per_pixel}")
+        if bytes_per_line < width * bytes_per_pixel:
+            raise Error(f"bytes per line {bytes_per_line} is less than {width} * {bytes_per_pixel}")
+
+        self.data = data
+        self.width = width
+        self.height = height
+        self.bytes_per_pixel = bytes_per_pixel
+        self.bytes_per_line = bytes_per_line
+
+    @staticmethod
+    def from_image(img: Image.Image) -> "Pixels":
+        if img.mode not in {"L", "RGB", "RGBA"}:
+            img = img.convert("RGB")
+        bytes_per_pixel = len(img.getbands())
+        return Pixels(img.tobytes(), img.width, img.height, bytes_per_pixel, img.width * bytes_per_pixel)
+
+    @staticmethod
+    def from_array(arr: np.ndarray) -> "Pixels":
+        # arr is a (height, width) or (height, width, channels) uint8 array, rows may be padded
+        height, width = arr.shape[:2]
+        bytes_per_pixel = 1 if arr.ndim == 2 else arr.shape[2]
+        inner_strides = (1,) if arr.ndim == 2 else (bytes_per_pixel, 1)
+        if arr.dtype.itemsize != 1 or arr.strides[1:] != inner_strides or arr.strides[0] < 0:
+            arr = arr.astype(np.uint8, order="C")
+        return Pixels(arr, width, height, bytes_per_pixel, arr.strides[0])
+
+    def mode(self) -> str:
+        return self._MODES[self.bytes_per_pixel]
+
+    def to_array(self) -> np.ndarray:
+        # (height, width) or (height, width, channels) view of the data
+        if isinstance(self.data, np.ndarray):
+            return self.data
+        if self.bytes_per_pixel == 1:
+            return np.ndarray((self.height, self.width), np.uint8, self.data, 0, (self.bytes_per_line, 1))
+        return np.ndarray((self.height, self.width, self.bytes_per_pixel), np.uint8, self.data, 0,
+                          (self.bytes_per_line, self.bytes_per_pixel, 1))
+
+    def to_image(self) -> Image.Image:
+        mode = self.mode()
+        if isinstance(self.data, np.ndarray):
+            return Image.fromarray(self.data)
+        return Image.frombuffer(mode, (self.width, self.height), self.data, "raw", mode, self.bytes_per_line, 1)
+
+
+class Psm(enum.IntEnum):
+    # tesseract page segmentation modes, https://tesseract-ocr.github.io/tessdoc/ImproveQuality.html#page-segmentation-method
+    OSD_ONLY = 0
+    AUTO_OSD = 1
+    AUTO_ONLY = 2
+    AUTO = 3
+    SINGLE_COLUMN = 4
+    SINGLE_BLOCK_VERT_TEXT = 5
+    SINGLE_BLOCK = 6
+    SINGLE_LINE = 7
+    SINGLE_WORD = 8
+    CIRCLE_WORD = 9
+    SINGLE_CHAR = 10
+    SPARSE_TEXT = 11
+    SPARSE_TEXT_OSD = 12
+    RAW_LINE = 13
+
+
+# how one recognition runs: the page segmentation mode, and whether tesseract retries
+# every line inverted when its confidence is low, which preprocessed clips do not need
+class Mode:
+    __slots__ = ("psm", "invert")
+
+    def __init__(self, psm: Psm = Psm.AUTO, invert: bool = True):
+        self.psm = psm
+        self.invert = invert
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Mode) and self.key() == other.key()
+
+    def __hash__(self) -> int:
+        return hash(self.key())
+
+    def __repr__(self) -> str:
+        return f"Mode(psm={self.psm.name}, invert={self.invert})"
+
+    def key(self) -> tuple:
+        return int(self.psm), self.invert
+
+    def cli_config(self) -> str:
+        return f"--psm {int(self.psm)} -c tessedit_do_invert={int(self.invert)}"
+
+
+DEFAULT_MODE = Mode()
+
+
+class Recognition:
+    def __init__(self, text: str, confidences: list[int]):
+        # confidences of the recognized words, 0 to 100
+        self.text = text
+        self.confidences = confidences
+
+    def confidence(self) -> float:
+        # mean word confidence, 0 when nothing is recognized
+        if not self.confidences:
+            return 0.0
+        return sum(self.confidences) / len(self.confidences)
+
+
+class Engine(abc.ABC):
+    name = ""
+
+    @abc.abstractmethod
+    def recognize(self, pixels: Pixels, lang: Str, mode: Mode = DEFAULT_MODE) -> str:
+        ...
+
+    @abc.abstractmethod
+    def recognize_words(self, pixels: Pixels, lang: Str, mode: Mode = DEFAULT_MODE) -> Recognition:
+        # like recognize, with the confidence of every word
+        ...
+
+    @abc.abstractmethod
+    def detect_script(self, pixels: Pixels) -> tuple[str, float]:
+        # the script tesseract's orientation and script detection (osd.traineddata) sees, e.g. "Latin" or "Japanese",
+        # and its confidence. raises Error when there is too little text to tell
+        ...
+
+    def release(self):
+        # frees what the calling thread holds, for a thread that is done recognizing
+        pass
+
+    def close(self):
+        pass
+
+
+# spawns the tesseract executable through pytesseract for every call
+class CliEngine(Engine):
+    name = "cli"
+
+    def __init__(self, exec_path: Str | None = None):
+        if exec_path is None:
+            exec_path = conf.ocr.exec_path
+        if shutil.which(exec_path) is None:
+            raise EngineUnavailable(f"tesseract executable is not found: {exec_path}")
+        pytesseract.pytesseract.tesseract_cmd = exec_path
+
+    def recognize(self, pixels: Pixels, lang: Str, mode: Mode = DEFAULT_MODE) -> str:
+        return pytesseract.image_to_string(pixels.to_image(), lang=lang, config=mode.cli_config())
+
+    def recognize_words(self, pixels: Pixels, lang: Str, mode: Mode = DEFAULT_MODE) -> Recognition:
+        data = pytesseract.image_to_data(pixels.to_image(), lang=lang, config=mode.cli_config(),
+                                         output_type=Output.DICT)
+        # one row per page, block, paragraph, line and word, only words have a confidence
+        lines: dict[tuple[int, int, int], list[str]] = {}
+        confidences = []
+        for i, word in enumerate(data["text"]):
+            conf = float(data["conf"][i])
+            if conf < 0 or not word.strip():
+                continue
+            lines.setdefault((data["block_num"][i], data["par_num"][i], data["line_num"][i]), []).append(word)
+            confidences.append(int(conf))
+
+        text = ""
+        last = None
+        for (block, par, _), words in lines.items():
+            if last is not None:
+                text += "\n" if last == (block, par) else "\n\n"
+            text += " ".join(words)
+            last = (block, par)
+        return Recognition(text, confidences)
+
+    def detect_script(self, pixels: Pixels) -> tuple[str, float]:
+        try:
+            osd = pytesseract.image_to_osd(pixels.to_image(), config="--psm 0", output_type=Output.DICT)
+        except pytesseract.TesseractError as e:
+            raise Error(f"failed to detect script: {e}") from e
+        return osd["script"], float(osd["script_conf"])
+
+
+# keeps libtesseract loaded in process, every thread owns one initialized handle per language set
+# because a TessBaseAPI handle must not be shared between threads
+class CApiEngine(Engine):
+    name = "capi"
+    # screenshots carry no dpi, tell tesseract a screen-like resolution to avoid its guess and warning
+    _SOURCE_RESOLUTION = 96
+    _OSD_LANG = "osd"
+
+    def __init__(self, lib_path: Str | None = None, tessdata_path: Str | None = None):
+        if lib_path is None:
+            lib_path = conf.ocr.lib_path
+        if tessdata_path is None:
+            tessdata_path = conf.ocr.tessdata_path
+
+        self._lib = _load_lib(lib_path)
+        self._tessdata = tessdata_path.encode() if tessdata_path and os.path.isdir(tessdata_path) else None
+        self._local = threading.local()
+        self._handles_lock = threading.Lock()
+        self._handles: list[int] = []
+
+    def recognize(self, pixels: Pixels, lang: Str, mode: Mode = DEFAULT_MODE) -> str:
+        return self._run(pixels, lang, mode, False).text
+
+    def recognize_words(self, pixels: Pixels, lang: Str, mode: Mode = DEFAULT_MODE) -> Recognition:
+        return self._run(pixels, lang, mode, True)
+
+    def _run(self, pixels: Pixels, lang: Str, mode: Mode, words: bool) -> Recognition:
+        handle = self._handle(lang)
+        # handles are reused, so the mode is set on every call
+        self._lib.TessBaseAPISetPageSegMode(handle, int(mode.psm))
+        self._lib.TessBaseAPISetVariable(handle, b"tessedit_do_invert", b"1" if mode.invert else b"0")
+        self._set_image(handle, pixels)
+        text = self._lib.TessBaseAPIGetUTF8Text(handle)
+        confidences = None
+        try:
+            if words:
+                confidences = self._lib.TessBaseAPIAllWordConfidences(handle)
+            return Recognition(
+                ctypes.string_at(text).decode("utf-8", errors="replace") if text else "",
+                _int_array(confidences) if confidences else [],
+            )
+        finally:
+            if text:
+                self._lib.TessDeleteText(text)
+            if confidences:
+                self._lib.TessDeleteIntArray(confidences)
+            self._lib.TessBaseAPIClear(handle)
+
+    def detect_script(self, pixels: Pixels) -> tuple[str, float]:
+        handle = self._handle(self._OSD_LANG)
+        self._set_image(handle, pixels)
+        degrees, degrees_conf = ctypes.c_int(), ctypes.c_float()
+        script, script_conf = ctypes.c_char_p(), ctypes.c_float()
+        try:
+            ok = self._lib.TessBaseAPIDetectOrientationScript(handle, ctypes.byref(degrees), ctypes.byref(degrees_conf),
+                                                              ctypes.byref(script), ctypes.byref(script_conf))
+            if not ok or not script.value:
+                raise Error("failed to detect script, too little text")
+            return script.value.decode(), script_conf.value
+        finally:
+            self._lib.TessBaseAPIClear(handle)
+
+    def _set_image(self, handle: int, pixels: Pixels):
+        data = pixels.data
+        if isinstance(data, np.ndarray):
+            data = data.ctypes.data
+        elif not isinstance(data, bytes):
+            data = _buffer_pointer(data)
+        self._lib.TessBaseAPISetImage(handle, data, pixels.width, pixels.height,
+                                      pixels.bytes_per_pixel, pixels.bytes_per_line)
+        self._lib.TessBaseAPISetSourceResolution(handle, self._SOURCE_RESOLUTION)
+
+    def release(self):
+        handles = getattr(self._local, "handles", None)
+        if not handles:
+            return
+        self._local.handles = {}
+        with self._handles_lock:
+            for handle in handles.values():
+                # close() may have freed them already
+                if handle in self._handles:
+                    self._handles.remove(handle)
+                    self._lib.TessBaseAPIEnd(handle)
+                    self._lib.TessBaseAPIDelete(handle)
+        logs.info(f"release libtesseract handles of thread {threading.current_thread().name}")
+
+    def close(self):
+        with self._handles_lock:
+            for handle in self._handles:
+                self._lib.TessBaseAPIEnd(handle)
+                self._lib.TessBaseAPIDelete(handle)
+            self._handles.clear()
+        self._local = threading.local()
+
+    def _handle(self, lang: Str) -> int:
+        handles = getattr(self._local, "handles", None)
+        if handles is None:
+            handles = self._local.handles = {}
+
+        handle = handles.get(lang)
+        if handle is not None:
+            return handle
+
+        handle = self._lib.TessBaseAPICreate()
+        if self._lib.TessBaseAPIInit3(handle, self._tessdata, lang.encode()) != 0:
+            self._lib.TessBaseAPIDelete(handle)
+            raise Error(f"failed to init libtesseract with lang: {lang}, tessdata: {self._tessdata}")
+
+        logs.info(f"init libtesseract handle for lang {lang} in thread {threading.current_thread().name}")
+        handles[lang] = handle
+        with self._handles_lock:
+            self._handles.append(handle)
+        return handle
+
+
+def _load_lib(lib_path: Str | None) -> ctypes.CDLL:
+    candidates = []
+    if lib_path and os.path.isfile(lib_path):
+        candidates.append(lib_path)
+    for name in ("tesseract", "libtesseract-5", "libtesseract"):
+        found = ctypes.util.find_library(name)
+        if found:
+            candidates.append(found)
+
+    if not candidates:
+        raise EngineUnavailable(f"libtesseract is not found, lib_path: {lib_path}")
+
+    for candidate in candidates:
+        try:
+            if hasattr(os, "add_dll_directory") and os.path.isabs(candidate):
+                # dependencies (leptonica etc.) are installed next to libtesseract on windows
+                os.add_dll_directory(os.path.dirname(candidate))
+            lib = ctypes.CDLL(candidate)
+            _declare(lib)
+            return lib
+        except (OSError, AttributeError) as e:
+            logs.warning(f"failed to load libtesseract from {candidate}: {e}")
+
+    raise EngineUnavailable(f"failed to load libtesseract from {candidates}")
+
+
+def _declare(lib: ctypes.CDLL):
+    handle = ctypes.c_void_p
+    lib.TessBaseAPICreate.restype = handle
+    lib.TessBaseAPICreate.argtypes = []
+    lib.TessBaseAPIInit3.restype = ctypes.c_int
+    lib.TessBaseAPIInit3.argtypes = [handle, ctypes.c_char_p, ctypes.c_char_p]
+    lib.TessBaseAPISetImage.restype = None
+    lib.TessBaseAPISetImage.argtypes = [handle, ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int]
+    lib.TessBaseAPISetSourceResolution.restype = None
+    lib.TessBaseAPISetSourceResolution.argtypes = [handle, ctypes.c_int]
+    lib.TessBaseAPISetPageSegMode.restype = None
+    lib.TessBaseAPISetPageSegMode.argtypes = [handle, ctypes.c_int]
+    lib.TessBaseAPISetVariable.restype = ctypes.c_int
+    lib.TessBaseAPISetVariable.argtypes = [handle, ctypes.c_char_p, ctypes.c_char_p]
+    # -1 terminated, freed by TessDeleteIntArray
+    lib.TessBaseAPIAllWordConfidences.restype = ctypes.POINTER(ctypes.c_int)
+    lib.TessBaseAPIAllWordConfidences.argtypes = [handle]
+    lib.TessDeleteIntArray.restype = None
+    lib.TessDeleteIntArray.argtypes = [ctypes.POINTER(ctypes.c_int)]
+    # the script name points into the handle, it is valid until the handle is cleared
+    lib.TessBaseAPIDetectOrientationScript.restype = ctypes.c_int
+    lib.TessBaseAPIDetectOrientationScript.argtypes = [handle, ctypes.POINTER(ctypes.c_int),
+                                                       ctypes.POINTER(ctypes.c_float),
+                                                       ctypes.POINTER(ctypes.c_char_p),
+                                                       ctypes.POINTER(ctypes.c_float)]
+    # c_void_p instead of c_char_p so the returned pointer can be freed by TessDeleteText
+    lib.TessBaseAPIGetUTF8Text.restype = ctypes.c_void_p
+    lib.TessBaseAPIGetUTF8Text.argtypes = [handle]
+    lib.TessDeleteText.restype = None
+    lib.TessDeleteText.argtypes = [ctypes.c_void_p]
+    lib.TessBaseAPIClear.restype = None
+    lib.TessBaseAPIClear.argtypes = [handle]
+    lib.TessBaseAPIEnd.restype = None
+    lib.TessBaseAPIEnd.argtypes = [handle]
+    lib.TessBaseAPIDelete.restype = None
+    lib.TessBaseAPIDelete.argtypes = [handle]
+
+
+def _int_array(p) -> list[int]:
+    values = []
+    i = 0
+    while p[i] != -1:
+        values.append(p[i])
+        i += 1
+    return values
+
+
+def _buffer_pointer(data) -> ctypes.Array:
+    try:
+        return (ctypes.c_ubyte * len(memoryview(data).cast("B"))).from_buffer(data)
+    except TypeError:
+        # read-only buffer
+        return (ctypes.c_ubyte * len(memoryview(data).cast("B"))).from_buffer_copy(data)
+
+
+def new_engine(name: Str) -> Engine:
+    if name == CApiEngine.name:
+        return CApiEngine()
+    if name == CliEngine.name:
+        return CliEngine()
+    if name == "auto":
+        try:
+            return CApiEngine()
+        except EngineUnavailable as e:
+            logs.warning(f"fallback to tesseract executable: {e}")
+            return CliEngine()
+    raise Error(f"unknown ocr engine: {name}")
+
+
+_engine: Engine | None = None
+_engine_lock = threading.Lock()
+
+
+def default_engine() -> Engine:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = new_engine(conf.ocr.engine)
+                logs.info(f"ocr engine is {_engine.name}")
+    return _engine
+
+
+def release():
+    # frees the default engine's handles of the calling thread, e.g. a worker that recognizes no more.
+    # an engine that is not loaded yet holds nothing
+    if _engine is not None:
+        _engine.release()
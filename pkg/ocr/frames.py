@@ -0,0 +1,49 @@
+import numpy as np
+
+from . import preprocess
+from .engine import Pixels
+
+# change detection between consecutive captures of one screen region, e.g. a subtitle line: captures are
+# sampled down to small gray thumbnails and compared pixel by pixel, so a static region costs well under a
+# millisecond per capture and the engine only runs when the text changed and stopped changing
+
+
+class FrameDiff:
+    def __init__(self, max_pixels: int = 1 << 16, tolerance: int = 24, outliers: float = 0.0002):
+        # thumbnails have at most max_pixels, a capture differs from another when more than `outliers`
+        # of their pixels differ by more than `tolerance` gray levels
+        self.max_pixels = max_pixels
+        self.tolerance = tolerance
+        self.outliers = outliers
+        # the last capture, and the last one reported by settled
+        self._last: np.ndarray | None = None
+        self._settled: np.ndarray | None = None
+
+    def thumbnail(self, pixels: Pixels) -> np.ndarray:
+        # every step-th row and column, averaging would cost more than everything else together and
+        # a changed glyph spans several sampled pixels anyway
+        arr = pixels.to_array()
+        step = 1
+        while -(-arr.shape[0] // step) * -(-arr.shape[1] // step) > self.max_pixels:
+            step += 1
+        return preprocess.grayscale(arr[::step, ::step], preprocess.Options())
+
+    def differs(self, a: np.ndarray | None, b: np.ndarray | None) -> bool:
+        if a is None or b is None or a.shape != b.shape:
+            return a is not b
+        diff = np.abs(a.astype(np.int16) - b)
+        return np.count_nonzero(diff > self.tolerance) > self.outliers * a.size
+
+    def settled(self, pixels: Pixels) -> bool:
+        # True once per change, on the first capture that equals the one before it and differs from
+        # the last settled capture: fades and scrolling are waited out instead of recognized halfway
+        thumb = self.thumbnail(pixels)
+        stable = self._last is not None and not self.differs(self._last, thumb)
+        self._last = thumb
+        if not stable or not self.differs(self._settled, thumb):
+            return False
+        self._settled = thumb
+        return True
+
+    def reset(self):
+        self._last = self._settled = None
@@ -0,0 +1,121 @@
+import re
+import threading
+from typing import AnyStr
+
+from pkg import logs
+from .engine import Engine, Pixels, Error
+
+# picks the tesseract language of a clip out of the languages the user reads, so that only that model runs
+# instead of a combined "eng+jpn+deu". tesseract's script detection narrows the candidates to one script,
+# languages sharing a script (english and german) are told apart by common words in the recognized text.
+# the language last seen in a script is tried first, a run of clips in one language costs one recognition each
+
+AUTO = "auto"
+
+# scripts tesseract's osd reports for the text of a language
+SCRIPTS: dict[str, set[str]] = {
+    "eng": {"Latin"},
+    "deu": {"Latin"},
+    "fra": {"Latin"},
+    "spa": {"Latin"},
+    "ita": {"Latin"},
+    "por": {"Latin"},
+    "nld": {"Latin"},
+    "jpn": {"Japanese", "Han", "Hiragana", "Katakana"},
+    "chi_sim": {"Han"},
+    "chi_tra": {"Han"},
+    "kor": {"Hangul", "Korean"},
+    "rus": {"Cyrillic"},
+    "ukr": {"Cyrillic"},
+    "ell": {"Greek"},
+    "ara": {"Arabic"},
+    "heb": {"Hebrew"},
+    "tha": {"Thai"},
+}
+
+# tesseract language -> the ISO 639-1 code translation services take
+ISO_639_1: dict[str, str] = {
+    "eng": "en", "deu": "de", "fra": "fr", "spa": "es", "ita": "it", "por": "pt", "nld": "nl",
+    "jpn": "ja", "chi_sim": "zh", "chi_tra": "zh", "kor": "ko", "rus": "ru", "ukr": "uk",
+    "ell": "el", "ara": "ar", "heb": "he", "tha": "th",
+}
+
+# a few of the most frequent words of the languages sharing the latin script
+_STOPWORDS: dict[str, frozenset[str]] = {
+    "eng": frozenset("the and of to is in that it you for are with this was on not be have".split()),
+    "deu": frozenset("der die das und ist nicht ich zu den mit sie es ein eine auf sich dem auch".split()),
+    "fra": frozenset("le la les et est un une des du que pas je vous il dans pour sur ce".split()),
+    "spa": frozenset("el la los las y es un una que no de en por con para se del lo".split()),
+    "ita": frozenset("il la le e è un una che non di per con sono del della si gli".split()),
+    "por": frozenset("o a os as e é um uma que não de em para com do da se".split()),
+    "nld": frozenset("de het een en is van niet ik dat je met op te zijn voor".split()),
+}
+_WORD = re.compile(r"\w+")
+
+
+def translator_lang(lang: AnyStr) -> str | None:
+    # None for combined languages like "eng+deu", the translator detects those itself
+    return ISO_639_1.get(lang)
+
+
+def guess(text: AnyStr, candidates: list[str]) -> str | None:
+    # the candidate whose common words are most frequent in text, None when no candidate stands out
+    words = [w.lower() for w in _WORD.findall(text)]
+    scores = {lang: sum(w in _STOPWORDS[lang] for w in words) for lang in candidates if lang in _STOPWORDS}
+    if not scores:
+        return None
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    best, score = ranked[0]
+    runner_up = ranked[1][1] if len(ranked) > 1 else 0
+    # a couple of shared words ("die" is english too) are not enough
+    return best if score >= 2 and score > runner_up * 2 else None
+
+
+class Detector:
+    def __init__(self, langs: list[str], min_confidence: float = 1.0):
+        # langs are the tesseract languages clips are in, the first one is used when nothing can be detected.
+        # scripts detected with less than min_confidence are not trusted
+        if not langs:
+            raise Error("auto language detection needs at least one language")
+        self.langs = list(langs)
+        self.min_confidence = min_confidence
+        self._lock = threading.Lock()
+        # script -> language of the last clip in that script, and the language of the last clip
+        self._last_by_script: dict[str, str] = {}
+        self._last = self.langs[0]
+
+    def detect(self, engine: Engine, pixels: Pixels) -> tuple[str, list[str]]:
+        # the language to recognize pixels with, and the candidates sharing its script for refine
+        if len(self.langs) == 1:
+            return self.langs[0], self.langs
+
+        try:
+            script, confidence = engine.detect_script(pixels)
+        except Error as e:
+            # a word or two is too little for osd, the last language is the best guess
+            logs.debug("keep ocr language %s: %s", self._last, e)
+            return self._last, [self._last]
+
+        candidates = [lang for lang in self.langs if script in SCRIPTS.get(lang, ())]
+        if not candidates or confidence < self.min_confidence:
+            logs.debug("no ocr language for script %s (%.1f), keep %s", script, confidence, self._last)
+            return self._last, [self._last]
+
+        with self._lock:
+            lang = self._last_by_script.get(script, candidates[0])
+        logs.debug("ocr script %s (%.1f), language %s of %s", script, confidence, lang, candidates)
+        return lang, candidates
+
+    def refine(self, text: AnyStr, lang: str, candidates: list[str]) -> str:
+        # the language text is actually in when it was recognized with another one of the same script
+        better = guess(text, candidates) if len(candidates) > 1 else None
+        if better is None:
+            better = lang
+        self.remember(better)
+        return better
+
+    def remember(self, lang: str):
+        with self._lock:
+            for script in SCRIPTS.get(lang, ()):
+                self._last_by_script[script] = lang
+            self._last = lang
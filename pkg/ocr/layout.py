@@ -0,0 +1,75 @@
+import numpy as np
+
+from . import preprocess
+
+# text block detection by recursive XY-cut over ink projection profiles:
+# blank areas are never handed to the engine, and blocks come out in reading order
+
+Block = tuple[int, int, int, int]  # (top, bottom, left, right), bottom and right are exclusive
+
+
+def detect_blocks(g: np.ndarray, row_gap: int | None = None, col_gap: int | None = None) -> list[Block]:
+    # g is a gray image with text differing from the background, e.g. the output of preprocess.Pipeline.
+    # blank bands at least row_gap tall or col_gap wide separate blocks, by default they are derived
+    # from the text line height so that paragraphs and columns are split but lines and words are not
+    if g.size == 0:
+        return []
+
+    height = preprocess.text_height(g)
+    if row_gap is None:
+        row_gap = max(int(height * 0.9), 4)
+    if col_gap is None:
+        col_gap = max(height * 2, 16)
+
+    blocks: list[Block] = []
+    _cut(preprocess.ink_mask(g), 0, g.shape[0], 0, g.shape[1], row_gap, col_gap, blocks)
+    return blocks
+
+
+def crop(g: np.ndarray, block: Block, margin: int) -> np.ndarray:
+    top, bottom, left, right = block
+    return g[max(top - margin, 0):bottom + margin, max(left - margin, 0):right + margin]
+
+
+def _cut(mask: np.ndarray, top: int, bottom: int, left: int, right: int, row_gap: int, col_gap: int,
+         out: list[Block]):
+    rows = np.flatnonzero(mask[top:bottom, left:right].any(axis=1))
+    if rows.size == 0:
+        return
+    top, bottom = top + int(rows[0]), top + int(rows[-1]) + 1
+    cols = np.flatnonzero(mask[top:bottom, left:right].any(axis=0))
+    left, right = left + int(cols[0]), left + int(cols[-1]) + 1
+
+    sub = mask[top:bottom, left:right]
+    row_gaps = _gaps(sub.any(axis=1), row_gap)
+    col_gaps = _gaps(sub.any(axis=0), col_gap)
+    if not row_gaps and not col_gaps:
+        out.append((top, bottom, left, right))
+        return
+
+    # cut along the direction of the widest gap first, rows read top to bottom, columns left to right
+    widest_row_gap = max((end - start for start, end in row_gaps), default=0)
+    widest_col_gap = max((end - start for start, end in col_gaps), default=0)
+    if widest_row_gap >= widest_col_gap:
+        for start, end in _segments(row_gaps, bottom - top):
+            _cut(mask, top + start, top + end, left, right, row_gap, col_gap, out)
+    else:
+        for start, end in _segments(col_gaps, right - left):
+            _cut(mask, top, bottom, left + start, left + end, row_gap, col_gap, out)
+
+
+def _gaps(profile: np.ndarray, min_gap: int) -> list[tuple[int, int]]:
+    # blank runs of at least min_gap in a profile that has ink at both ends
+    blank = np.concatenate(([False], ~profile, [False]))
+    edges = np.flatnonzero(blank[1:] != blank[:-1])
+    return [(int(start), int(end)) for start, end in zip(edges[0::2], edges[1::2]) if end - start >= min_gap]
+
+
+def _segments(gaps: list[tuple[int, int]], length: int) -> list[tuple[int, int]]:
+    segments = []
+    start = 0
+    for gap_start, gap_end in gaps:
+        segments.append((start, gap_start))
+        start = gap_end
+    segments.append((start, length))
+    return segments
@@ -1,24 +1,161 @@
-import io
-from typing import AnyStr
+from typing import AnyStr, NamedTuple
 
-import pytesseract
 from PIL import Image
-from PySide6 import QtGui, QtCore
+from PySide6 import QtGui
 
-from pkg import conf
+from pkg import conf, logs, trace
+from . import qimage, result_cache, preprocess, layout, pool, segmentation, language
+from .engine import Pixels, Mode, Psm, Error, default_engine
 
-pytesseract.pytesseract.tesseract_cmd = conf.ocr.exec_path
+_results = result_cache.ResultCache(
+    conf.ocr.result_cache_entries,
+    tolerance=conf.ocr.result_cache_tolerance,
+    outliers=conf.ocr.result_cache_outliers,
+)
+_pipeline = preprocess.Pipeline(conf.ocr.preprocess, preprocess.Options(text_height=conf.ocr.preprocess_text_height))
+_pool = pool.Pool(conf.ocr.workers)
+_detector = language.Detector(conf.ocr.auto_langs, conf.ocr.auto_min_confidence)
+
+
+class Text(NamedTuple):
+    text: str
+    # the tesseract language the text was recognized with, the detected one for "auto"
+    lang: str
+
+
+def warm_up(lang: AnyStr | None = None):
+    # loads the engine and creates its handles for lang ahead of the first recognition. handles of the capi engine
+    # are per thread, call it on the thread that will recognize, a handle created anywhere else is never used
+    lang = lang or conf.ocr.from_lang
+    pixels = Pixels.from_image(Image.new("L", (32, 32), 255))
+    engine = default_engine()
+    if lang != language.AUTO:
+        engine.recognize(pixels, lang)
+        return
+
+    for lang in _detector.langs:
+        engine.recognize(pixels, lang)
+    if len(_detector.langs) > 1:
+        try:
+            engine.detect_script(pixels)
+        except Error:
+            # a blank image has no script, the osd data is loaded anyway
+            pass
 
 
 def from_file(filepath: AnyStr) -> AnyStr:
-    return pytesseract.image_to_string(Image.open(filepath), lang='eng')
+    return read_file(filepath).text
+
+
+def read_file(filepath: AnyStr, lang: AnyStr | None = None) -> Text:
+    with Image.open(filepath) as image:
+        return read(Pixels.from_image(image), lang)
+
+
+def from_image(image: Image.Image, lang: AnyStr | None = None) -> AnyStr:
+    return from_pixels(Pixels.from_image(image), lang)
+
+
+def from_pixels(pixels: Pixels, lang: AnyStr | None = None) -> AnyStr:
+    return read(pixels, lang).text
+
+
+def read(pixels: Pixels, lang: AnyStr | None = None) -> Text:
+    # like from_pixels, with the language of the text. lang "auto" picks one of conf.ocr.auto_langs per clip
+    if lang is None:
+        lang = conf.ocr.from_lang
+
+    if conf.ocr.result_cache_entries <= 0:
+        return _recognize(pixels, lang)
+
+    settings = (lang, conf.ocr.engine, *_pipeline.key(),
+                conf.ocr.segmentation, conf.ocr.psm, conf.ocr.min_confidence, conf.ocr.thorough_psm)
+    if lang == language.AUTO:
+        settings += (*_detector.langs, _detector.min_confidence)
+    with trace.span("ocr.cache"):
+        fp = result_cache.fingerprint(pixels, conf.ocr.result_cache_max_pixels)
+        result = _results.get(fp, settings)
+    if result is not None:
+        logs.debug("ocr result cache hit, content shape is %s", fp.content.shape)
+        return result
+
+    result = _recognize(pixels, lang)
+    _results.put(fp, settings, result)
+    return result
+
+
+def _recognize(pixels: Pixels, lang: AnyStr) -> Text:
+    pixels, timings = _pipeline.run(pixels)
+    for step, elapsed in timings:
+        trace.record(f"ocr.preprocess.{step}", elapsed)
+
+    if lang != language.AUTO:
+        return Text(_recognize_text(pixels, lang), lang)
+
+    with trace.span("ocr.detect"):
+        lang, candidates = _detector.detect(default_engine(), pixels)
+    text = _recognize_text(pixels, lang)
+    # recognized as english but reads as german, recognize again with the right model
+    actual = _detector.refine(text, lang, candidates)
+    if actual != lang:
+        logs.debug("ocr language is %s rather than %s, recognize again", actual, lang)
+        text = _recognize_text(pixels, actual)
+    return Text(text, actual)
+
+
+def _recognize_text(pixels: Pixels, lang: AnyStr) -> AnyStr:
+    adaptive = conf.ocr.segmentation == "adaptive"
+    if _pool.usable() and pixels.width * pixels.height >= conf.ocr.parallel_min_pixels:
+        arr = pixels.to_array()
+        blocks = layout.detect_blocks(preprocess.grayscale(arr, _pipeline.options))
+        logs.debug("detect %d text blocks in %dx%d", len(blocks), pixels.width, pixels.height)
+        if len(blocks) > 1:
+            crops = [layout.crop(arr, block, _pipeline.options.margin) for block in blocks]
+            # every crop is one block of text
+            mode = Mode(Psm.SINGLE_BLOCK, invert=False) if adaptive else Mode(Psm(conf.ocr.psm))
+            try:
+                with trace.span("ocr.engine.parallel"):
+                    texts = [text.strip() for text in _pool.recognize(crops, lang, mode)]
+                return "\n\n".join(text for text in texts if text)
+            except Error as e:
+                logs.error(f"failed to recognize blocks in parallel, recognize the clip in one pass: {e}")
+
+    if not adaptive:
+        with trace.span("ocr.engine"):
+            return default_engine().recognize(pixels, lang, Mode(Psm(conf.ocr.psm)))
+    return _recognize_adaptive(pixels, lang)
+
+
+def _recognize_adaptive(pixels: Pixels, lang: AnyStr) -> AnyStr:
+    with trace.span("ocr.segmentation"):
+        shape = segmentation.measure(preprocess.grayscale(pixels.to_array(), _pipeline.options))
+        fast = segmentation.choose(shape)
+    with trace.span("ocr.engine"):
+        result = default_engine().recognize_words(pixels, lang, fast)
+
+    # without inverting like the fast pass, the retry differs from it in the segmentation only
+    thorough = Mode(Psm(conf.ocr.thorough_psm), invert=False)
+    confidence = result.confidence()
+    if confidence >= conf.ocr.min_confidence or fast == thorough:
+        logs.debug("ocr %s as %s, confidence %.0f", shape, fast, confidence)
+        return result.text
+
+    with trace.span("ocr.engine.thorough"):
+        retry = default_engine().recognize_words(pixels, lang, thorough)
+    logs.debug("ocr %s as %s, confidence %.0f, retry as %s, confidence %.0f",
+               shape, fast, confidence, thorough, retry.confidence())
+    return retry.text if retry.confidence() >= confidence else result.text
+
+
+def from_qpixmap(image: QtGui.QPixmap | QtGui.QImage) -> AnyStr:
+    return read_qpixmap(image).text
 
 
-def from_qpixmap(image: QtGui.QPixmap) -> AnyStr:
-    buffer = QtCore.QBuffer()
-    buffer.open(QtCore.QIODeviceBase.OpenModeFlag.ReadWrite)
-    image.save(buffer, "PNG")
-    return pytesseract.image_to_string(
-        Image.open(io.BytesIO(buffer.data().data())),
-        lang=conf.ocr.from_lang
-    )
+@trace.timed("ocr")
+def read_qpixmap(image: QtGui.QPixmap | QtGui.QImage) -> Text:
+    with trace.span("ocr.convert"):
+        if isinstance(image, QtGui.QPixmap):
+            image = image.toImage()
+        pixels = qimage.to_pixels(image)
+    # `image` keeps the memory viewed by the pixels alive until recognition is done
+    return read(pixels)
@@ -0,0 +1,66 @@
+import multiprocessing
+import os
+import threading
+from concurrent import futures
+from concurrent.futures.process import BrokenProcessPool
+from typing import AnyStr
+
+import numpy as np
+
+from pkg import conf, logs
+from .engine import Pixels, Mode, DEFAULT_MODE, Error, default_engine
+
+# blocks of a large clip are recognized by a pool of worker processes, every worker keeps its own
+# initialized engine so that a block costs only the recognition itself
+
+
+def _init_worker(ocr_conf: dict):
+    # spawned workers start from the conf files, the settings of this process are passed on
+    for name, value in ocr_conf.items():
+        setattr(conf.ocr, name, value)
+    default_engine()
+
+
+def _recognize(arr: np.ndarray, lang: str, mode: Mode) -> str:
+    return default_engine().recognize(Pixels.from_array(arr), lang, mode)
+
+
+class Pool:
+    def __init__(self, workers: int):
+        # 0 uses every core
+        self.workers = workers if workers > 0 else os.cpu_count() or 1
+        self._executor: futures.ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        # set once a worker failed to start or died, blocks are recognized in process from then on
+        self._broken = False
+
+    def usable(self) -> bool:
+        return self.workers > 1 and not self._broken
+
+    def start(self) -> futures.ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    logs.info(f"start ocr pool with {self.workers} workers")
+                    ocr_conf = {name: value for name, value in vars(conf.ocr).items() if not name.startswith("_")}
+                    # spawned rather than forked, this process runs qt and logging threads which are not safe to fork
+                    self._executor = futures.ProcessPoolExecutor(self.workers, multiprocessing.get_context("spawn"),
+                                                                 initializer=_init_worker, initargs=(ocr_conf,))
+        return self._executor
+
+    def recognize(self, arrays: list[np.ndarray], lang: AnyStr, mode: Mode = DEFAULT_MODE) -> list[str]:
+        # results are in the order of arrays
+        executor = self.start()
+        n = len(arrays)
+        try:
+            return list(executor.map(_recognize, [np.ascontiguousarray(arr) for arr in arrays], [lang] * n, [mode] * n))
+        except BrokenProcessPool as e:
+            self._broken = True
+            self.shutdown()
+            raise Error(f"ocr pool is broken, blocks are recognized in process from now on: {e}") from e
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
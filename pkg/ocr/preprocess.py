@@ -0,0 +1,202 @@
+import time
+from typing import Callable
+
+import numpy as np
+from PIL import Image
+
+from pkg import logs
+from .engine import Pixels, Error
+
+# vectorized clean-up of a clip before it reaches the engine, every step takes and returns a gray uint8 array
+# except grayscale, which takes the (height, width[, channels]) view of the pixels
+
+Step = Callable[[np.ndarray, "Options"], np.ndarray]
+
+# a pixel differing from the background by more than this is content
+CONTENT_THRESHOLD = 24
+
+
+class Options:
+    def __init__(
+            self,
+            text_height: int = 40,
+            max_scale: float = 4.0,
+            min_scale: float = 0.25,
+            max_pixels: int = 16 << 20,
+            binarize_window: int = 31,
+            binarize_offset: float = 0.12,
+            clip_percent: float = 1.0,
+            margin: int = 8,
+    ):
+        # target height in pixels of the ink of one text line, tesseract is most accurate around 30-50
+        self.text_height = text_height
+        self.max_scale = max_scale
+        self.min_scale = min_scale
+        self.max_pixels = max_pixels
+        # pixels darker than the mean of the surrounding window by this fraction become ink
+        self.binarize_window = binarize_window
+        self.binarize_offset = binarize_offset
+        # percent of darkest and brightest pixels ignored when stretching contrast
+        self.clip_percent = clip_percent
+        # blank border kept around trimmed content, tesseract misses glyphs touching the edge
+        self.margin = margin
+
+
+def grayscale(arr: np.ndarray, options: Options) -> np.ndarray:
+    if arr.ndim == 2:
+        return arr
+    # integer BT.601 luma, much cheaper than float math and close enough for OCR
+    r = arr[..., 0].astype(np.uint16)
+    g = arr[..., 1].astype(np.uint16)
+    b = arr[..., 2].astype(np.uint16)
+    return ((r * 77 + g * 150 + b * 29) >> 8).astype(np.uint8)
+
+
+def invert(g: np.ndarray, options: Options) -> np.ndarray:
+    # light text on a dark theme, tesseract expects dark text on a light background
+    if g.size == 0 or _background(g) >= 128:
+        return g
+    return 255 - g
+
+
+def normalize(g: np.ndarray, options: Options) -> np.ndarray:
+    if g.size == 0:
+        return g
+    cdf = np.cumsum(np.bincount(g.ravel(), minlength=256))
+    clip = g.size * options.clip_percent / 100
+    low = int(np.searchsorted(cdf, clip))
+    high = int(np.searchsorted(cdf, g.size - clip))
+    if high - low < 2 or (low == 0 and high == 255):
+        return g
+
+    lut = np.clip((np.arange(256, dtype=np.float32) - low) * (255 / (high - low)), 0, 255).astype(np.uint8)
+    return lut[g]
+
+
+def trim(g: np.ndarray, options: Options) -> np.ndarray:
+    content = content_box(g)
+    if content is None:
+        return g
+    top, bottom, left, right = content
+    m = options.margin
+    return g[max(top - m, 0):bottom + m, max(left - m, 0):right + m]
+
+
+def rescale(g: np.ndarray, options: Options) -> np.ndarray:
+    height = text_height(g)
+    if height == 0:
+        return g
+
+    scale = min(max(options.text_height / height, options.min_scale), options.max_scale)
+    if g.size * scale * scale > options.max_pixels:
+        scale = (options.max_pixels / g.size) ** 0.5
+    if 0.85 < scale < 1.2:
+        return g
+
+    size = (max(int(g.shape[1] * scale), 1), max(int(g.shape[0] * scale), 1))
+    resample = Image.Resampling.BICUBIC if scale > 1 else Image.Resampling.BOX
+    return np.asarray(Image.fromarray(g).resize(size, resample))
+
+
+def binarize(g: np.ndarray, options: Options) -> np.ndarray:
+    # bradley local mean threshold over a summed-area table, robust to gradients and busy backgrounds
+    if g.size == 0:
+        return g
+    h, w = g.shape
+    r = options.binarize_window // 2
+    sat = np.zeros((h + 1, w + 1), np.int64)
+    np.cumsum(np.cumsum(g, axis=0, dtype=np.int64), axis=1, out=sat[1:, 1:])
+
+    y0 = np.clip(np.arange(h) - r, 0, h)[:, None]
+    y1 = np.clip(np.arange(h) + r + 1, 0, h)[:, None]
+    x0 = np.clip(np.arange(w) - r, 0, w)[None, :]
+    x1 = np.clip(np.arange(w) + r + 1, 0, w)[None, :]
+    total = sat[y1, x1] - sat[y0, x1] - sat[y1, x0] + sat[y0, x0]
+    area = (y1 - y0) * (x1 - x0)
+
+    ink = g.astype(np.int64) * area * 100 < total * int(100 * (1 - options.binarize_offset))
+    return np.where(ink, 0, 255).astype(np.uint8)
+
+
+STEPS: dict[str, Step] = {
+    "grayscale": grayscale,
+    "invert": invert,
+    "normalize": normalize,
+    "trim": trim,
+    "rescale": rescale,
+    "binarize": binarize,
+}
+
+
+def content_box(g: np.ndarray) -> tuple[int, int, int, int] | None:
+    # (top, bottom, left, right) of pixels that differ from the background, bottom and right are exclusive
+    if g.size == 0:
+        return None
+    mask = ink_mask(g)
+    rows = np.flatnonzero(mask.any(axis=1))
+    if rows.size == 0:
+        return None
+    cols = np.flatnonzero(mask[rows[0]:rows[-1] + 1].any(axis=0))
+    return int(rows[0]), int(rows[-1]) + 1, int(cols[0]), int(cols[-1]) + 1
+
+
+def text_height(g: np.ndarray) -> int:
+    # median height of the horizontal bands that contain ink, i.e. the height of a text line
+    if g.size == 0:
+        return 0
+    ink_rows = np.concatenate(([False], ink_profile(ink_mask(g), axis=1), [False]))
+    edges = np.flatnonzero(ink_rows[1:] != ink_rows[:-1])
+    heights = edges[1::2] - edges[0::2]
+    # one-pixel bands are underlines or table rules, not text
+    heights = heights[heights > 2]
+    return int(np.median(heights)) if heights.size else 0
+
+
+def ink_mask(g: np.ndarray) -> np.ndarray:
+    return np.abs(g.astype(np.int16) - _background(g)) > CONTENT_THRESHOLD
+
+
+def ink_profile(mask: np.ndarray, axis: int) -> np.ndarray:
+    # rows (axis 1) or columns (axis 0) of an ink mask that hold text
+    counts = mask.sum(axis=axis)
+    # on busy backgrounds every row has some ink-like noise, text rows have clearly more than its spread
+    floor = counts.min() + 4 * np.sqrt(counts.min())
+    return counts > max(floor, mask.shape[axis] // 500)
+
+
+def _background(g: np.ndarray) -> int:
+    corners = np.array([g[0, 0], g[0, -1], g[-1, 0], g[-1, -1]])
+    return int(np.median(corners))
+
+
+class Pipeline:
+    def __init__(self, steps: list[str], options: Options | None = None):
+        for step in steps:
+            if step not in STEPS:
+                raise Error(f"unknown preprocess step: {step}, steps are {list(STEPS)}")
+        if steps and steps[0] != "grayscale":
+            # every other step works on gray pixels
+            steps = ["grayscale", *steps]
+        self.steps = steps
+        self.options = options or Options()
+
+    def run(self, pixels: Pixels) -> tuple[Pixels, list[tuple[str, float]]]:
+        # returns the processed pixels and the seconds spent in each step
+        if not self.steps:
+            return pixels, []
+
+        arr = pixels.to_array()
+        timings = []
+        for step in self.steps:
+            start = time.perf_counter()
+            arr = STEPS[step](arr, self.options)
+            timings.append((step, time.perf_counter() - start))
+
+        if logs.enabled(logs.DEBUG):
+            logs.debug("preprocess " + ", ".join(f"{step} {elapsed * 1000:.1f}ms" for step, elapsed in timings)
+                       + f", {pixels.width}x{pixels.height} -> {arr.shape[1]}x{arr.shape[0]}")
+        return Pixels.from_array(arr), timings
+
+    def key(self) -> tuple:
+        # every option changes the output of some step, cached results are keyed by all of them
+        return (*self.steps, *sorted(vars(self.options).items()))
@@ -0,0 +1,85 @@
+import sys
+
+import numpy as np
+from PIL import Image
+from PySide6 import QtGui
+
+from .engine import Pixels
+
+# views over QImage memory without an encode/decode round trip,
+# the QImage must outlive the returned array, image or pixels
+
+_Format = QtGui.QImage.Format
+
+# QImage format -> byte order of a pixel in memory, "X" is a channel ocr ignores.
+# alpha is ignored as well: screen grabs are opaque, so premultiplied pixels equal the straight ones
+_CHANNELS = {
+    _Format.Format_Grayscale8: "L",
+    _Format.Format_RGB888: "RGB",
+    _Format.Format_BGR888: "BGR",
+    _Format.Format_RGBA8888: "RGBX",
+    _Format.Format_RGBX8888: "RGBX",
+    # 32-bit formats are stored as native-endian 0xAARRGGBB words
+    _Format.Format_RGB32: "BGRX" if sys.byteorder == "little" else "XRGB",
+    _Format.Format_ARGB32: "BGRX" if sys.byteorder == "little" else "XRGB",
+    _Format.Format_ARGB32_Premultiplied: "BGRX" if sys.byteorder == "little" else "XRGB",
+}
+
+# byte order -> memory index of R, G and B
+_RGB_INDEX = {
+    "BGR": (2, 1, 0),
+    "BGRX": (2, 1, 0),
+    "XRGB": (1, 2, 3),
+}
+
+
+def channels(image: QtGui.QImage) -> str:
+    return _CHANNELS.get(image.format(), _CHANNELS[_Format.Format_RGBA8888])
+
+
+def to_array(image: QtGui.QImage) -> np.ndarray:
+    # (height, width) or (height, width, channels) uint8 view honouring the row stride,
+    # byte order is given by `channels(image)`.
+    # formats without a direct layout are converted by Qt, then the array owns a copy
+    normalized = _normalize(image)
+    n = len(_CHANNELS[normalized.format()])
+    if n == 1:
+        arr = np.ndarray((normalized.height(), normalized.width()), np.uint8, normalized.constBits(), 0,
+                         (normalized.bytesPerLine(), 1))
+    else:
+        arr = np.ndarray((normalized.height(), normalized.width(), n), np.uint8, normalized.constBits(), 0,
+                         (normalized.bytesPerLine(), n, 1))
+    return arr if normalized is image else arr.copy()
+
+
+def to_pixels(image: QtGui.QImage) -> Pixels:
+    arr = to_array(image)
+    order = channels(image)
+    if order not in _RGB_INDEX:
+        # tesseract reads gray, RGB and RGBX as they are, no copy at all
+        return Pixels.from_array(arr)
+
+    # one vectorized swizzle into packed RGB
+    r, g, b = _RGB_INDEX[order]
+    rgb = np.empty((arr.shape[0], arr.shape[1], 3), np.uint8)
+    rgb[..., 0] = arr[..., r]
+    rgb[..., 1] = arr[..., g]
+    rgb[..., 2] = arr[..., b]
+    return Pixels.from_array(rgb)
+
+
+def to_pil(image: QtGui.QImage) -> Image.Image:
+    # gray and RGBX memory is mapped as is, other layouts are decoded into a new image
+    normalized = _normalize(image)
+    order = _CHANNELS[normalized.format()]
+    mode = {"L": "L", "RGBX": "RGBA"}.get(order, "RGB")
+    raw_mode = "RGBA" if order == "RGBX" else order
+    img = Image.frombuffer(mode, (normalized.width(), normalized.height()), normalized.constBits(),
+                           "raw", raw_mode, normalized.bytesPerLine(), 1)
+    return img if normalized is image else img.copy()
+
+
+def _normalize(image: QtGui.QImage) -> QtGui.QImage:
+    if image.format() in _CHANNELS:
+        return image
+    return image.convertToFormat(_Format.Format_RGBA8888)
@@ -0,0 +1,114 @@
+import collections
+import threading
+from typing import Any
+
+import numpy as np
+from PIL import Image
+
+from .engine import Pixels
+from . import preprocess
+
+# OCR results keyed by what the clip shows rather than by its exact pixels:
+# uniform margins are trimmed, so re-selecting the same dialog with a slightly different rectangle still hits,
+# and small per-pixel noise is tolerated while a changed glyph is not
+
+
+class Fingerprint:
+    def __init__(self, content: np.ndarray, dhash: int):
+        self.content = content
+        self.dhash = dhash
+
+    def nbytes(self) -> int:
+        return self.content.nbytes
+
+
+def trim(g: np.ndarray) -> np.ndarray:
+    content = preprocess.content_box(g)
+    if content is None:
+        return g[:0, :0]
+    top, bottom, left, right = content
+    return g[top:bottom, left:right]
+
+
+def shrink(g: np.ndarray, max_pixels: int) -> np.ndarray:
+    # integer factor block mean so that big clips are compared and stored at a bounded size
+    factor = 1
+    while g.size // (factor * factor) > max_pixels:
+        factor += 1
+    if factor == 1:
+        return np.ascontiguousarray(g)
+
+    h, w = g.shape[0] // factor * factor, g.shape[1] // factor * factor
+    blocks = g[:h, :w].reshape(h // factor, factor, w // factor, factor)
+    return blocks.mean(axis=(1, 3), dtype=np.float32).astype(np.uint8)
+
+
+def dhash(g: np.ndarray) -> int:
+    if g.size == 0:
+        return 0
+    small = np.asarray(Image.fromarray(g).resize((9, 8), Image.Resampling.BOX), np.int16)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def fingerprint(pixels: Pixels, max_pixels: int) -> Fingerprint:
+    content = shrink(trim(preprocess.grayscale(pixels.to_array(), preprocess.Options())), max_pixels)
+    return Fingerprint(content, dhash(content))
+
+
+class ResultCache:
+    def __init__(self, max_entries: int, max_distance: int = 6, tolerance: int = 16, outliers: float = 0.001):
+        self._max_entries = max_entries
+        self._max_distance = max_distance
+        self._tolerance = tolerance
+        self._outliers = outliers
+        self._lock = threading.Lock()
+        self._entries: collections.OrderedDict[int, tuple[tuple, Fingerprint, Any]] = collections.OrderedDict()
+        self._next_id = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, fp: Fingerprint, settings: tuple) -> Any | None:
+        with self._lock:
+            for entry_id, (entry_settings, entry_fp, result) in reversed(self._entries.items()):
+                if entry_settings == settings and self._same(fp, entry_fp):
+                    self._entries.move_to_end(entry_id)
+                    self.hits += 1
+                    return result
+            self.misses += 1
+            return None
+
+    def put(self, fp: Fingerprint, settings: tuple, result: Any):
+        if self._max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[self._next_id] = (settings, fp, result)
+            self._next_id += 1
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def nbytes(self) -> int:
+        with self._lock:
+            return sum(fp.nbytes() for _, fp, _ in self._entries.values())
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _same(self, a: Fingerprint, b: Fingerprint) -> bool:
+        if (a.dhash ^ b.dhash).bit_count() > self._max_distance:
+            return False
+
+        # trimming may disagree by a pixel on anti-aliased edges
+        (ah, aw), (bh, bw) = a.content.shape, b.content.shape
+        if abs(ah - bh) > 1 or abs(aw - bw) > 1:
+            return False
+
+        h, w = min(ah, bh), min(aw, bw)
+        if h * w == 0:
+            return a.content.size == b.content.size
+        diff = np.abs(a.content[:h, :w].astype(np.int16) - b.content[:h, :w])
+        return np.count_nonzero(diff > self._tolerance) <= self._outliers * h * w
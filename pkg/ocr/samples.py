@@ -0,0 +1,53 @@
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+# synthetic screenshots for benchmarks and tests, no real screen is needed
+
+DEFAULT_TEXT = "The quick brown fox jumps over the lazy dog"
+
+
+def render_text(
+        text: str = DEFAULT_TEXT,
+        size: tuple[int, int] = (800, 120),
+        font_size: int = 24,
+        fg: tuple[int, int, int] = (0, 0, 0),
+        bg: tuple[int, int, int] = (255, 255, 255),
+        origin: tuple[int, int] = (10, 10),
+        font_path: str | None = None,
+) -> Image.Image:
+    img = Image.new("RGB", size, bg)
+    draw = ImageDraw.Draw(img)
+    draw.multiline_text(origin, text, fill=fg, font=_font(font_size, font_path), spacing=font_size // 3)
+    return img
+
+
+def busy_background(img: Image.Image, noise: int = 40, seed: int = 0) -> Image.Image:
+    # a diagonal gradient plus noise under the text, like a wallpaper or a game scene
+    arr = np.asarray(img, np.int16)
+    h, w = arr.shape[:2]
+    gradient = (np.add.outer(np.arange(h), np.arange(w)) * 96 // max(h + w, 1)).astype(np.int16)
+    noisy = arr - gradient[..., None] + np.random.default_rng(seed).integers(-noise, noise + 1, arr.shape)
+    return Image.fromarray(np.clip(noisy, 0, 255).astype(np.uint8))
+
+
+def corpus(text: str = DEFAULT_TEXT) -> list[tuple[str, Image.Image, str]]:
+    # (name, image, expected text) covering the cases preprocessing is meant for
+    return [
+        ("plain 24px", render_text(text, font_size=24), text),
+        ("tiny 9px", render_text(text, size=(300, 30), font_size=9, origin=(4, 4)), text),
+        ("huge 96px", render_text(text, size=(2600, 200), font_size=96, origin=(40, 40)), text),
+        ("dark theme", render_text(text, fg=(220, 220, 220), bg=(30, 30, 30)), text),
+        ("low contrast", render_text(text, fg=(120, 120, 120), bg=(160, 160, 160)), text),
+        ("busy background", busy_background(render_text(text)), text),
+        ("wide margins", render_text(text, size=(1920, 1080), origin=(700, 500)), text),
+    ]
+
+
+def _font(font_size: int, font_path: str | None) -> ImageFont.ImageFont | ImageFont.FreeTypeFont:
+    if font_path:
+        return ImageFont.truetype(font_path, font_size)
+    try:
+        return ImageFont.load_default(font_size)
+    except TypeError:
+        # pillow < 10.1 has no sized default font
+        return ImageFont.load_default()
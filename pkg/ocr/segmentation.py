@@ -0,0 +1,59 @@
+import numpy as np
+
+from . import preprocess, layout
+from .engine import Mode, Psm
+
+# picks tesseract's page segmentation from the geometry of a clip: a single word or line skips the
+# page layout analysis, which is most of the engine time on small clips, and a block of lines is read
+# as one uniform block. only pages with several blocks get the full analysis
+
+
+class Shape:
+    def __init__(self, lines: int, words: int, blocks: int):
+        # words are counted only for a single line, blocks only for several lines
+        self.lines = lines
+        self.words = words
+        self.blocks = blocks
+
+    def __repr__(self) -> str:
+        return f"Shape(lines={self.lines}, words={self.words}, blocks={self.blocks})"
+
+
+def measure(g: np.ndarray) -> Shape:
+    # g is a gray image with text differing from the background, e.g. the output of preprocess.Pipeline
+    if g.size == 0:
+        return Shape(0, 0, 0)
+
+    mask = preprocess.ink_mask(g)
+    bands = _bands(preprocess.ink_profile(mask, axis=1))
+    # one-pixel bands are underlines or table rules, not text
+    bands = [(top, bottom) for top, bottom in bands if bottom - top > 2]
+    if len(bands) != 1:
+        blocks = len(layout.detect_blocks(g)) if bands else 0
+        return Shape(len(bands), 0, blocks)
+
+    top, bottom = bands[0]
+    # gaps between words are about a quarter of the line height, gaps between letters are narrower
+    min_gap = max((bottom - top) // 4, 2)
+    words = _bands(preprocess.ink_profile(mask[top:bottom], axis=0))
+    count = 1
+    for (_, end), (start, _) in zip(words, words[1:]):
+        if start - end >= min_gap:
+            count += 1
+    return Shape(1, count, 1)
+
+
+def choose(shape: Shape) -> Mode:
+    # the fast mode for a shape, preprocessed clips are dark on light so tesseract need not try inverting
+    if shape.lines == 1:
+        return Mode(Psm.SINGLE_WORD if shape.words == 1 else Psm.SINGLE_LINE, invert=False)
+    if shape.lines > 1 and shape.blocks == 1:
+        return Mode(Psm.SINGLE_BLOCK, invert=False)
+    return Mode(Psm.AUTO, invert=False)
+
+
+def _bands(profile: np.ndarray) -> list[tuple[int, int]]:
+    # runs of True in a profile, end is exclusive
+    padded = np.concatenate(([False], profile, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return [(int(start), int(end)) for start, end in zip(edges[0::2], edges[1::2])]
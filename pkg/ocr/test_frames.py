@@ -0,0 +1,57 @@
+import time
+import unittest
+
+import numpy as np
+
+from .engine import Pixels
+from .frames import *
+from . import samples
+
+
+def _capture(text: str, noise: int = 0, seed: int = 0) -> Pixels:
+    img = samples.render_text(text, size=(1200, 80), font_size=32)
+    if noise:
+        arr = np.asarray(img, np.int16) + np.random.default_rng(seed).integers(-noise, noise + 1, (80, 1200, 3))
+        return Pixels.from_array(np.clip(arr, 0, 255).astype(np.uint8))
+    return Pixels.from_image(img)
+
+
+class TestFrameDiff(unittest.TestCase):
+    def test_settles_once_per_change(self):
+        d = FrameDiff()
+        captures = ["first line", "first line", "first line", "second line", "second line", "second line"]
+        self.assertEqual([False, True, False, False, True, False], [d.settled(_capture(c)) for c in captures])
+
+    def test_waits_for_changes_to_stop(self):
+        d = FrameDiff()
+        # a caption typed out letter by letter is recognized once it is complete
+        captures = ["H", "He", "Hel", "Hell", "Hello", "Hello"]
+        self.assertEqual([False] * 5 + [True], [d.settled(_capture(c)) for c in captures])
+
+    def test_noise_is_not_a_change(self):
+        d = FrameDiff()
+        self.assertFalse(d.settled(_capture("a line", noise=8, seed=1)))
+        self.assertTrue(d.settled(_capture("a line", noise=8, seed=2)))
+        for seed in range(3, 10):
+            self.assertFalse(d.settled(_capture("a line", noise=8, seed=seed)))
+
+    def test_one_changed_glyph(self):
+        d = FrameDiff()
+        self.assertFalse(d.differs(d.thumbnail(_capture("Total: 1024 items")),
+                                   d.thumbnail(_capture("Total: 1024 items"))))
+        self.assertTrue(d.differs(d.thumbnail(_capture("Total: 1024 items")),
+                                  d.thumbnail(_capture("Total: 1074 items"))))
+
+    def test_static_region_is_cheap(self):
+        d = FrameDiff()
+        capture = _capture("a static subtitle line")
+        d.settled(capture)
+        start = time.perf_counter()
+        for _ in range(50):
+            d.settled(capture)
+        # well under the capture interval, a static region keeps the cpu near idle
+        self.assertLess((time.perf_counter() - start) / 50, 0.01)
+
+
+if __name__ == '__main__':
+    unittest.main()
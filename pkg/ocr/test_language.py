@@ -0,0 +1,75 @@
+import unittest
+
+from . import engine
+from .engine import Engine, Mode, Pixels, Recognition, Error
+from .language import *
+
+
+class _ScriptEngine(Engine):
+    # reports a fixed script, or fails like osd on too little text when script is None
+    def __init__(self, script: str | None, confidence: float = 5.0):
+        self.script = script
+        self.confidence = confidence
+        self.calls = 0
+
+    def recognize(self, pixels: Pixels, lang, mode: Mode = engine.DEFAULT_MODE) -> str:
+        return ""
+
+    def recognize_words(self, pixels: Pixels, lang, mode: Mode = engine.DEFAULT_MODE) -> Recognition:
+        return Recognition("", [])
+
+    def detect_script(self, pixels: Pixels) -> tuple[str, float]:
+        self.calls += 1
+        if self.script is None:
+            raise Error("too few characters")
+        return self.script, self.confidence
+
+
+_PIXELS = Pixels(bytes(4), 2, 2, 1, 2)
+
+
+class TestLanguage(unittest.TestCase):
+    def test_guess(self):
+        self.assertEqual("deu", guess("Das ist nicht der Weg, den ich meine", ["eng", "deu"]))
+        self.assertEqual("eng", guess("This is not the way that I meant", ["eng", "deu"]))
+        # too few common words to tell
+        self.assertIsNone(guess("Hello Welt", ["eng", "deu"]))
+        self.assertIsNone(guess("Das ist nicht der Weg", ["jpn"]))
+
+    def test_translator_lang(self):
+        self.assertEqual("ja", translator_lang("jpn"))
+        self.assertIsNone(translator_lang("eng+deu"))
+
+    def test_single_language_is_not_detected(self):
+        engine = _ScriptEngine("Japanese")
+        self.assertEqual(("eng", ["eng"]), Detector(["eng"]).detect(engine, _PIXELS))
+        self.assertEqual(0, engine.calls)
+
+    def test_detect_by_script(self):
+        d = Detector(["eng", "deu", "jpn"])
+        self.assertEqual(("jpn", ["jpn"]), d.detect(_ScriptEngine("Japanese"), _PIXELS))
+        self.assertEqual(("eng", ["eng", "deu"]), d.detect(_ScriptEngine("Latin"), _PIXELS))
+
+    def test_refine_is_remembered(self):
+        d = Detector(["eng", "deu", "jpn"])
+        lang, candidates = d.detect(_ScriptEngine("Latin"), _PIXELS)
+        self.assertEqual("deu", d.refine("Das ist nicht der Weg, den ich meine", lang, candidates))
+        # the next latin clip starts with german
+        self.assertEqual("deu", d.detect(_ScriptEngine("Latin"), _PIXELS)[0])
+        # a clip too small for osd keeps the last language
+        self.assertEqual(("deu", ["deu"]), d.detect(_ScriptEngine(None), _PIXELS))
+        d.refine("日本語", "jpn", ["jpn"])
+        self.assertEqual("jpn", d.detect(_ScriptEngine(None), _PIXELS)[0])
+
+    def test_low_confidence_and_unknown_script(self):
+        d = Detector(["eng", "jpn"], min_confidence=2)
+        self.assertEqual("eng", d.detect(_ScriptEngine("Japanese", confidence=0.5), _PIXELS)[0])
+        self.assertEqual("eng", d.detect(_ScriptEngine("Cyrillic"), _PIXELS)[0])
+
+    def test_no_languages(self):
+        with self.assertRaises(Error):
+            Detector([])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from .layout import *
+from . import samples
+
+
+def _page() -> np.ndarray:
+    # two columns with two paragraphs each
+    page = Image.new("L", (1600, 800), 255)
+    for x, column in ((40, "left"), (880, "right")):
+        for y, paragraph in ((40, 1), (400, 2)):
+            text = "\n".join(f"{column} paragraph {paragraph} line {i}" for i in range(3))
+            page.paste(samples.render_text(text, size=(600, 200), origin=(0, 0)).convert("L"), (x, y))
+    return np.asarray(page)
+
+
+class TestLayout(unittest.TestCase):
+    def test_blank(self):
+        self.assertEqual([], detect_blocks(np.full((300, 400), 255, np.uint8)))
+
+    def test_single_block(self):
+        g = np.asarray(samples.render_text("one line\nand another line").convert("L"))
+        self.assertEqual(1, len(detect_blocks(g)))
+
+    def test_reading_order(self):
+        g = _page()
+        blocks = detect_blocks(g)
+        self.assertEqual(4, len(blocks))
+
+        # columns are separated by the widest gap, so the left column is read before the right one
+        lefts = [left for _, _, left, _ in blocks]
+        tops = [top for top, _, _, _ in blocks]
+        self.assertEqual(sorted(lefts), lefts)
+        self.assertLess(tops[0], tops[1])
+        self.assertLess(tops[2], tops[3])
+
+        # blocks cover only the ink
+        for top, bottom, left, right in blocks:
+            self.assertLess(g[top:bottom, left:right].min(), 128)
+            self.assertLess((bottom - top) * (right - left), g.size / 4)
+
+    def test_crop_margin(self):
+        g = _page()
+        top, bottom, left, right = detect_blocks(g)[0]
+        self.assertEqual((bottom - top + 16, right - left + 16), crop(g, (top, bottom, left, right), 8).shape)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,27 @@
+import unittest
+
+import numpy as np
+
+from pkg import conf
+from .engine import Error
+from .pool import *
+
+
+class TestPool(unittest.TestCase):
+    def test_broken_pool_is_dropped(self):
+        # workers fail to create their engine, the pool must not stay broken for every later clip
+        engine, conf.ocr.engine = conf.ocr.engine, "not_exist_engine"
+        self.addCleanup(setattr, conf.ocr, "engine", engine)
+        pool = Pool(2)
+        self.assertTrue(pool.usable())
+        with self.assertRaises(Error):
+            pool.recognize([np.full((32, 32), 255, np.uint8)] * 2, "eng")
+        self.assertFalse(pool.usable())
+        self.assertIsNone(pool._executor)
+
+    def test_one_worker_is_not_a_pool(self):
+        self.assertFalse(Pool(1).usable())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+import numpy as np
+
+from .engine import Pixels, Error
+from .preprocess import *
+from . import samples
+
+
+def _gray(img) -> np.ndarray:
+    return grayscale(np.asarray(img), Options())
+
+
+class TestPreprocess(unittest.TestCase):
+    def test_invert_dark_theme(self):
+        g = invert(_gray(samples.render_text(fg=(220, 220, 220), bg=(30, 30, 30))), Options())
+        self.assertGreater(g[0, 0], 200)
+        light = _gray(samples.render_text())
+        self.assertIs(light, invert(light, Options()))
+
+    def test_normalize_stretches_contrast(self):
+        g = normalize(_gray(samples.render_text(fg=(120, 120, 120), bg=(160, 160, 160))), Options())
+        self.assertLess(g.min(), 10)
+        self.assertGreater(g.max(), 245)
+
+    def test_trim_keeps_margin(self):
+        g = _gray(samples.render_text(size=(1920, 1080), origin=(700, 500)))
+        top, bottom, left, right = content_box(g)
+        trimmed = trim(g, Options(margin=8))
+        self.assertEqual((bottom - top + 16, right - left + 16), trimmed.shape)
+
+    def test_rescale_to_text_height(self):
+        for font_size in (9, 96):
+            with self.subTest(font_size=font_size):
+                g = trim(_gray(samples.render_text(size=(3000, 300), font_size=font_size)), Options())
+                scaled = rescale(g, Options(text_height=40))
+                self.assertAlmostEqual(40, text_height(scaled), delta=8)
+
+    def test_binarize(self):
+        g = binarize(_gray(samples.busy_background(samples.render_text())), Options())
+        self.assertEqual({0, 255}, set(np.unique(g).tolist()))
+        # most of the background is white
+        self.assertGreater(np.count_nonzero(g), g.size * 0.8)
+
+    def test_pipeline(self):
+        pixels = Pixels.from_image(samples.render_text(fg=(220, 220, 220), bg=(30, 30, 30), size=(1000, 400)))
+        processed, timings = Pipeline(["invert", "trim"]).run(pixels)
+        self.assertEqual(["grayscale", "invert", "trim"], [step for step, _ in timings])
+        self.assertEqual(1, processed.bytes_per_pixel)
+        self.assertLess(processed.height, pixels.height)
+
+        with self.assertRaises(Error):
+            Pipeline(["not_exist_step"])
+
+    def test_key_covers_every_option(self):
+        base = Pipeline(["trim", "rescale"]).key()
+        self.assertEqual(base, Pipeline(["trim", "rescale"]).key())
+        for name in vars(Options()):
+            options = Options()
+            setattr(options, name, getattr(options, name) * 2)
+            self.assertNotEqual(base, Pipeline(["trim", "rescale"], options).key(), name)
+
+
+if __name__ == '__main__':
+    unittest.main()
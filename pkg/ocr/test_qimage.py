@@ -0,0 +1,73 @@
+import io
+import unittest
+
+import numpy as np
+from PIL import Image
+from PySide6 import QtGui, QtCore
+
+from . import qimage
+
+
+def _random_qimage(width: int, height: int, fmt: QtGui.QImage.Format) -> QtGui.QImage:
+    rgb = np.random.default_rng(width * height).integers(0, 256, (height, width, 3), np.uint8)
+    img = QtGui.QImage(rgb.tobytes(), width, height, width * 3, QtGui.QImage.Format.Format_RGB888)
+    return img.convertToFormat(fmt)
+
+
+def _png_round_trip(img: QtGui.QImage) -> Image.Image:
+    # the path ocr.from_qpixmap used before
+    buffer = QtCore.QBuffer()
+    buffer.open(QtCore.QIODeviceBase.OpenModeFlag.ReadWrite)
+    img.save(buffer, "PNG")
+    return Image.open(io.BytesIO(buffer.data().data()))
+
+
+class TestQImage(unittest.TestCase):
+    _FORMATS = [
+        QtGui.QImage.Format.Format_RGB32,
+        QtGui.QImage.Format.Format_ARGB32,
+        QtGui.QImage.Format.Format_ARGB32_Premultiplied,
+        QtGui.QImage.Format.Format_RGB888,
+        QtGui.QImage.Format.Format_BGR888,
+        QtGui.QImage.Format.Format_RGBA8888,
+        QtGui.QImage.Format.Format_RGBX8888,
+        QtGui.QImage.Format.Format_Grayscale8,
+        QtGui.QImage.Format.Format_RGB16,
+    ]
+
+    def test_pixels_match_png_round_trip(self):
+        # odd widths leave padding at the end of each row
+        for fmt in self._FORMATS:
+            for width, height in [(1, 1), (7, 5), (33, 17)]:
+                with self.subTest(fmt=fmt, width=width, height=height):
+                    img = _random_qimage(width, height, fmt)
+                    expected = _png_round_trip(img)
+                    mode = "L" if expected.mode == "L" else "RGB"
+
+                    pixels = qimage.to_pixels(img)
+                    self.assertEqual((width, height), (pixels.width, pixels.height))
+                    self.assertEqual(expected.convert(mode).tobytes(), pixels.to_image().convert(mode).tobytes())
+                    self.assertEqual(expected.convert(mode).tobytes(), qimage.to_pil(img).convert(mode).tobytes())
+
+    def test_to_array_is_a_view(self):
+        img = _random_qimage(7, 5, QtGui.QImage.Format.Format_RGB888)
+        arr = qimage.to_array(img)
+        self.assertEqual((5, 7, 3), arr.shape)
+        self.assertEqual(img.bytesPerLine(), arr.strides[0])
+        self.assertFalse(arr.flags.owndata)
+
+        color = img.pixelColor(3, 2)
+        self.assertEqual([color.red(), color.green(), color.blue()], arr[2, 3].tolist())
+
+    def test_rgb32_pixels_are_swizzled(self):
+        img = QtGui.QImage(2, 1, QtGui.QImage.Format.Format_RGB32)
+        img.setPixelColor(0, 0, QtGui.QColor(10, 20, 30))
+        img.setPixelColor(1, 0, QtGui.QColor(40, 50, 60))
+
+        pixels = qimage.to_pixels(img)
+        self.assertEqual(3, pixels.bytes_per_pixel)
+        self.assertEqual([[[10, 20, 30], [40, 50, 60]]], pixels.data.tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+import numpy as np
+
+from .engine import Pixels
+from .result_cache import *
+from . import samples
+
+
+def _fingerprint(text=samples.DEFAULT_TEXT, size=(600, 80), origin=(10, 10), noise=0) -> Fingerprint:
+    img = samples.render_text(text, size=size, origin=origin)
+    arr = np.asarray(img, np.int16)
+    if noise:
+        arr = arr + np.random.default_rng(0).integers(-noise, noise + 1, arr.shape)
+    return fingerprint(Pixels.from_array(np.clip(arr, 0, 255).astype(np.uint8)), 1 << 18)
+
+
+class TestResultCache(unittest.TestCase):
+    _SETTINGS = ("eng", "auto")
+
+    def test_hit_with_different_margins(self):
+        c = ResultCache(8)
+        c.put(_fingerprint(), self._SETTINGS, "text")
+        self.assertEqual("text", c.get(_fingerprint(size=(640, 70), origin=(30, 5)), self._SETTINGS))
+        self.assertEqual(1, c.hits)
+
+    def test_hit_with_noise(self):
+        c = ResultCache(8)
+        c.put(_fingerprint(), self._SETTINGS, "text")
+        self.assertEqual("text", c.get(_fingerprint(noise=8), self._SETTINGS))
+
+    def test_miss_on_changed_text(self):
+        c = ResultCache(8)
+        c.put(_fingerprint("Total: 1024 items"), self._SETTINGS, "text")
+        self.assertIsNone(c.get(_fingerprint("Total: 1074 items"), self._SETTINGS))
+        self.assertEqual(1, c.misses)
+
+    def test_miss_on_other_settings(self):
+        c = ResultCache(8)
+        c.put(_fingerprint(), self._SETTINGS, "text")
+        self.assertIsNone(c.get(_fingerprint(), ("jpn", "auto")))
+
+    def test_bounded(self):
+        c = ResultCache(2)
+        for i in range(5):
+            c.put(_fingerprint(f"line {i}"), self._SETTINGS, str(i))
+        self.assertEqual(2, len(c))
+        self.assertIsNone(c.get(_fingerprint("line 0"), self._SETTINGS))
+        self.assertEqual("4", c.get(_fingerprint("line 4"), self._SETTINGS))
+
+    def test_shrink_bounds_pixels(self):
+        fp = fingerprint(Pixels.from_image(samples.render_text(size=(3840, 2160), font_size=64)), 1 << 12)
+        self.assertLessEqual(fp.content.size, 1 << 12)
+
+
+if __name__ == '__main__':
+    unittest.main()
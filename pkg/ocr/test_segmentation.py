@@ -0,0 +1,88 @@
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from pkg import conf
+from . import engine, ocr
+from .engine import Engine, Error, Mode, Pixels, Psm, Recognition
+from .segmentation import *
+from .test_layout import _page
+from . import samples
+
+
+class _ModeEngine(Engine):
+    # recognizes nothing with no confidence, keeps the mode of every call
+    def __init__(self):
+        self.modes = []
+
+    def recognize(self, pixels: Pixels, lang, mode: Mode = engine.DEFAULT_MODE) -> str:
+        self.modes.append(mode)
+        return ""
+
+    def recognize_words(self, pixels: Pixels, lang, mode: Mode = engine.DEFAULT_MODE) -> Recognition:
+        self.modes.append(mode)
+        return Recognition("", [])
+
+    def detect_script(self, pixels: Pixels) -> tuple[str, float]:
+        raise Error("too few characters")
+
+
+def _gray(text: str, size: tuple[int, int]) -> np.ndarray:
+    return np.asarray(samples.render_text(text, size=size).convert("L"))
+
+
+class TestSegmentation(unittest.TestCase):
+    def test_blank(self):
+        shape = measure(np.full((40, 200), 255, np.uint8))
+        self.assertEqual(0, shape.lines)
+        self.assertEqual(Psm.AUTO, choose(shape).psm)
+
+    def test_single_word(self):
+        shape = measure(_gray("Hello", (120, 40)))
+        self.assertEqual((1, 1), (shape.lines, shape.words))
+        self.assertEqual(Mode(Psm.SINGLE_WORD, invert=False), choose(shape))
+
+    def test_single_line(self):
+        shape = measure(_gray(samples.DEFAULT_TEXT, (800, 60)))
+        self.assertEqual((1, 9), (shape.lines, shape.words))
+        self.assertEqual(Psm.SINGLE_LINE, choose(shape).psm)
+
+    def test_block(self):
+        shape = measure(_gray("line one of text\nline two of text\nline three", (600, 200)))
+        self.assertEqual((3, 1), (shape.lines, shape.blocks))
+        self.assertEqual(Psm.SINGLE_BLOCK, choose(shape).psm)
+
+    def test_page(self):
+        shape = measure(_page())
+        self.assertEqual(4, shape.blocks)
+        self.assertEqual(Psm.AUTO, choose(shape).psm)
+
+    def test_mode(self):
+        self.assertEqual("--psm 7 -c tessedit_do_invert=0", Mode(Psm.SINGLE_LINE, invert=False).cli_config())
+        self.assertNotEqual(Mode(Psm.SINGLE_LINE), Mode(Psm.SINGLE_LINE, invert=False))
+
+    def test_every_tesseract_psm(self):
+        self.assertEqual(list(range(14)), [int(Psm(i)) for i in range(14)])
+
+    def test_retry_in_another_mode_only(self):
+        fake = _ModeEngine()
+        default, engine._engine = engine._engine, fake
+        self.addCleanup(setattr, engine, "_engine", default)
+        psm = conf.ocr.thorough_psm
+        self.addCleanup(setattr, conf.ocr, "thorough_psm", psm)
+        # a blank clip is recognized as a page with no confidence
+        pixels = Pixels.from_image(Image.new("L", (200, 40), 255))
+
+        conf.ocr.thorough_psm = Psm.AUTO
+        ocr._recognize_adaptive(pixels, "eng")
+        self.assertEqual([Mode(Psm.AUTO, invert=False)], fake.modes)
+
+        fake.modes.clear()
+        conf.ocr.thorough_psm = Psm.SPARSE_TEXT
+        ocr._recognize_adaptive(pixels, "eng")
+        self.assertEqual([Mode(Psm.AUTO, invert=False), Mode(Psm.SPARSE_TEXT, invert=False)], fake.modes)
+
+
+if __name__ == '__main__':
+    unittest.main()
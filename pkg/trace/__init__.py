@@ -0,0 +1,21 @@
+from .histogram import Histogram, nearest_rank
+from .trace import init, close, enable, disable, enabled, span, timed, record, histogram, reset, snapshot, dump, \
+    log_summary
+
+__all__ = ["init",
+           "close",
+           "enable",
+           "disable",
+           "enabled",
+           "span",
+           "timed",
+           "record",
+           "histogram",
+           "reset",
+           "snapshot",
+           "dump",
+           "log_summary",
+
+           "Histogram",
+           "nearest_rank",
+           ]
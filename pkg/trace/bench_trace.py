@@ -0,0 +1,46 @@
+import argparse
+import time
+
+from . import trace
+
+# per-call overhead of a span and a timed function with tracing disabled and enabled
+# usage: python -m pkg.trace.bench_trace [-n 1000000]
+
+
+def _measure(fn, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n
+
+
+def _span():
+    with trace.span("bench"):
+        pass
+
+
+@trace.timed("bench")
+def _timed():
+    pass
+
+
+def _bare():
+    pass
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    baseline = _measure(_bare, args.n)
+    for label, enable in (("disabled", trace.disable), ("enabled", trace.enable)):
+        enable()
+        for name, fn in (("span", _span), ("timed", _timed)):
+            cost = _measure(fn, args.n) - baseline
+            print(f"{label:>8} {name:>5}: {cost * 1e9:7.1f} ns per call")
+    trace.disable()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+import bisect
+import collections
+import math
+import threading
+
+# latency histogram over the most recent samples with log-spaced buckets,
+# 4 buckets per doubling from 10us up to about 3 minutes
+
+_MIN_SECONDS = 1e-5
+_BUCKETS_PER_DOUBLING = 4
+BOUNDS = [_MIN_SECONDS * 2 ** (i / _BUCKETS_PER_DOUBLING) for i in range(24 * _BUCKETS_PER_DOUBLING + 1)]
+
+
+class Histogram:
+    def __init__(self, window: int = 1024):
+        # percentiles and buckets cover the last `window` samples, count/total/max the whole lifetime
+        self._recent: collections.deque[float] = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._recent.append(seconds)
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def samples(self) -> list[float]:
+        with self._lock:
+            return list(self._recent)
+
+    def percentile(self, p: float) -> float:
+        return nearest_rank(sorted(self.samples()), p)
+
+    def buckets(self) -> list[tuple[float, int]]:
+        # (upper bound in seconds, samples) of the non-empty buckets, the last bound is inf for outliers
+        counts = collections.Counter(bisect.bisect_left(BOUNDS, s) for s in self.samples())
+        return [(BOUNDS[i] if i < len(BOUNDS) else math.inf, counts[i]) for i in sorted(counts)]
+
+    def summary(self) -> dict:
+        recent = sorted(self.samples())
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1000,
+            "max_ms": self.max * 1000,
+            "window": len(recent),
+            "p50_ms": nearest_rank(recent, 50) * 1000,
+            "p95_ms": nearest_rank(recent, 95) * 1000,
+            "p99_ms": nearest_rank(recent, 99) * 1000,
+        }
+
+
+def nearest_rank(ordered: list[float], p: float) -> float:
+    # nearest-rank percentile of sorted values
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))]
@@ -0,0 +1,133 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from .trace import *
+from .histogram import Histogram
+
+
+class TestHistogram(unittest.TestCase):
+    def test_percentiles(self):
+        h = Histogram()
+        for ms in range(1, 101):
+            h.add(ms / 1000)
+        self.assertAlmostEqual(0.050, h.percentile(50))
+        self.assertAlmostEqual(0.095, h.percentile(95))
+        self.assertAlmostEqual(0.100, h.percentile(100))
+        self.assertEqual(100, h.count)
+        self.assertAlmostEqual(0.1, h.max)
+
+    def test_rolling_window(self):
+        h = Histogram(window=10)
+        for _ in range(100):
+            h.add(1.0)
+        for _ in range(10):
+            h.add(0.001)
+        # percentiles forget old samples, lifetime counters do not
+        self.assertAlmostEqual(0.001, h.percentile(99))
+        self.assertEqual(110, h.count)
+        self.assertAlmostEqual(1.0, h.max)
+
+    def test_buckets(self):
+        h = Histogram()
+        for seconds in (0.001, 0.001, 0.1, 1e6):
+            h.add(seconds)
+        buckets = h.buckets()
+        self.assertEqual(4, sum(n for _, n in buckets))
+        self.assertEqual(3, len(buckets))
+        self.assertEqual(float("inf"), buckets[-1][0])
+        bound, n = buckets[0]
+        self.assertEqual(2, n)
+        self.assertTrue(0.001 <= bound < 0.001 * 2 ** 0.25)
+
+    def test_empty(self):
+        self.assertEqual(0, Histogram().summary()["p99_ms"])
+
+
+class TestTrace(unittest.TestCase):
+    def setUp(self):
+        reset()
+
+    def tearDown(self):
+        close()
+        disable()
+        reset()
+
+    def test_disabled(self):
+        disable()
+        with span("stage"):
+            pass
+        timed("decorated")(lambda: None)()
+        record("recorded", 1.0)
+        self.assertEqual({}, snapshot()["stages"])
+
+    def test_span(self):
+        enable()
+        for _ in range(3):
+            with span("stage"):
+                pass
+        self.assertEqual(3, snapshot()["stages"]["stage"]["count"])
+
+    def test_span_exception(self):
+        enable()
+        with self.assertRaises(ValueError):
+            with span("stage"):
+                raise ValueError()
+        self.assertEqual(1, histogram("stage").count)
+
+    def test_timed(self):
+        @timed("decorated")
+        def add(a, b):
+            return a + b
+
+        self.assertEqual(3, add(1, 2))
+        enable()
+        self.assertEqual(5, add(2, b=3))
+        self.assertEqual(1, histogram("decorated").count)
+        self.assertEqual("add", add.__name__)
+
+    def test_threads(self):
+        enable()
+
+        def work():
+            for _ in range(1000):
+                with span("stage"):
+                    pass
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(8000, histogram("stage").count)
+
+    def test_dump(self):
+        enable()
+        record("stage", 0.002)
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "sub", "trace.json")
+            dump(path)
+            with open(path) as f:
+                stats = json.load(f)["stages"]["stage"]
+        self.assertAlmostEqual(2, stats["p50_ms"])
+        self.assertEqual(1, sum(n for _, n in stats["buckets"]))
+
+    def test_init_dumper(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "trace.json")
+            init(enabled=True, dump_path=path, dump_interval=3600)
+            record("stage", 0.001)
+            # closing writes the last snapshot
+            close()
+            with open(path) as f:
+                self.assertIn("stage", json.load(f)["stages"])
+
+    def test_init_disabled(self):
+        init(enabled=False)
+        self.assertFalse(enabled())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+import functools
+import json
+import os
+import threading
+import time
+from typing import AnyStr, Callable, LiteralString
+
+from pkg import conf, logs
+from .histogram import Histogram
+
+# per-stage latency spans, e.g.
+#   with trace.span("ocr.engine"): ...
+#   @trace.timed("translate")
+# spans cost one global lookup when tracing is disabled
+
+_enabled = False
+_window = 1024
+_histograms: dict[str, Histogram] = {}
+_histograms_lock = threading.Lock()
+_dumper: "_Dumper | None" = None
+
+
+class _Span:
+    __slots__ = ("_histogram", "_start")
+
+    def __init__(self, histogram: Histogram):
+        self._histogram = histogram
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._histogram.add(time.perf_counter() - self._start)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(window: int | None = None):
+    global _enabled, _window
+    if window is not None:
+        _window = window
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def span(name: str) -> _Span | _NoopSpan:
+    if not _enabled:
+        return _NOOP
+    return _Span(histogram(name))
+
+
+def timed(name: str):
+    def decorator(fn: Callable):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(histogram(name)):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def record(name: str, seconds: float):
+    if _enabled:
+        histogram(name).add(seconds)
+
+
+def histogram(name: str) -> Histogram:
+    h = _histograms.get(name)
+    if h is None:
+        with _histograms_lock:
+            h = _histograms.setdefault(name, Histogram(_window))
+    return h
+
+
+def reset():
+    with _histograms_lock:
+        _histograms.clear()
+
+
+def snapshot() -> dict:
+    with _histograms_lock:
+        histograms = dict(_histograms)
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "stages": {
+            name: {**h.summary(), "buckets": [[bound * 1000, n] for bound, n in h.buckets()]}
+            for name, h in sorted(histograms.items())
+        },
+    }
+
+
+def dump(path: AnyStr | LiteralString) -> dict:
+    # the file is replaced atomically, readers never see a partial snapshot
+    result = snapshot()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(result, f, indent=2)
+    os.replace(tmp, path)
+    return result
+
+
+def log_summary():
+    for name, stats in snapshot()["stages"].items():
+        logs.info(f"{name}: count {stats['count']}, p50 {stats['p50_ms']:.2f}ms, p95 {stats['p95_ms']:.2f}ms, "
+                  f"p99 {stats['p99_ms']:.2f}ms, max {stats['max_ms']:.2f}ms")
+
+
+def init(
+        enabled: bool | None = None,
+        dump_path: AnyStr | LiteralString | None = None,
+        dump_interval: float | None = None,
+):
+    # arguments default to pkg.conf.trace; with a dump path the snapshot is written and summarized
+    # every dump_interval seconds on a background thread until close()
+    global _dumper
+    if enabled is None:
+        enabled = conf.trace.enabled
+    if dump_path is None:
+        dump_path = conf.trace.dump_path
+    if dump_interval is None:
+        dump_interval = conf.trace.dump_interval
+
+    close()
+    if not enabled:
+        disable()
+        return
+
+    enable(conf.trace.window)
+    if dump_path and dump_interval > 0:
+        _dumper = _Dumper(dump_path, dump_interval)
+        _dumper.start()
+
+
+def close():
+    global _dumper
+    if _dumper is not None:
+        _dumper.stop()
+        _dumper = None
+
+
+class _Dumper(threading.Thread):
+    def __init__(self, path: AnyStr | LiteralString, interval: float):
+        super().__init__(name="trace-dumper", daemon=True)
+        self._path = path
+        self._interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self._interval):
+            self._dump()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        # the last interval is not lost
+        self._dump()
+
+    def _dump(self):
+        try:
+            dump(self._path)
+            log_summary()
+        except OSError as e:
+            logs.error(f"failed to dump trace snapshot to {self._path}: {e}")
@@ -1,3 +1,23 @@
-from .translator import init, translate
+from .backend import (Translator, DefaultTranslator, MyMemoryTranslator, LibreTranslator,
+                      register, backends, new_translator, Error, BackendNotFound)
+from .translator import init, translate, translate_iter, split, join, warm_up, cache_stats
 
-__all__ = ["init", "translate"]
+__all__ = ["init",
+           "translate",
+           "translate_iter",
+           "split",
+           "join",
+           "warm_up",
+           "cache_stats",
+
+           "Translator",
+           "DefaultTranslator",
+           "MyMemoryTranslator",
+           "LibreTranslator",
+           "register",
+           "backends",
+           "new_translator",
+
+           "Error",
+           "BackendNotFound",
+           ]
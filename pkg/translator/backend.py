@@ -0,0 +1,242 @@
+import abc
+import copy
+import re
+import threading
+from typing import AnyStr, LiteralString, Callable, override
+
+import requests
+from requests import adapters
+
+from pkg import conf, logs
+
+Str = AnyStr | LiteralString
+
+AUTO_LANG = "auto"
+
+# notices free services answer with in place of a translation, with a success status: quota exhausted,
+# text too long, a language they do not know. they must never be shown or cached as translations
+_NOTICE = re.compile(
+    r"^\s*(MYMEMORY WARNING|QUERY LENGTH LIMIT EXCEEDED|PLEASE SELECT TWO DISTINCT LANGUAGES|NO QUERY SPECIFIED"
+    r"|INVALID (SOURCE |TARGET )?LANGUAGE|'?[\w-]*'? IS AN INVALID (SOURCE|TARGET) LANGUAGE)"
+)
+
+
+class Error(RuntimeError):
+    pass
+
+
+class BackendNotFound(Error):
+    pass
+
+
+def is_notice(text: Str) -> bool:
+    return _NOTICE.match(text) is not None
+
+
+class _TimeoutAdapter(adapters.HTTPAdapter):
+    # requests has no session wide timeout, every request through the pool gets the default one
+    def __init__(self, timeout: float, **kwargs):
+        self._timeout = timeout
+        super().__init__(**kwargs)
+
+    @override
+    def send(self, request, timeout=None, **kwargs):
+        return super().send(request, timeout=self._timeout if timeout is None else timeout, **kwargs)
+
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def session() -> requests.Session:
+    # one keep-alive connection pool per host shared by every backend and translate worker
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                s = requests.Session()
+                adapter = _TimeoutAdapter(
+                    conf.translator.timeout,
+                    pool_connections=conf.translator.pool_hosts,
+                    pool_maxsize=conf.translator.batch_workers,
+                    max_retries=adapters.Retry(total=conf.translator.retries, backoff_factor=0.1),
+                )
+                s.mount("http://", adapter)
+                s.mount("https://", adapter)
+                _session = s
+    return _session
+
+
+class Translator(abc.ABC):
+    name = ""
+
+    def __init__(self, from_lang: Str = AUTO_LANG, to_lang: Str = "zh", timeout: float | None = None, **kwargs):
+        self.from_lang = from_lang
+        self.to_lang = to_lang
+        self.timeout = conf.translator.timeout if timeout is None else timeout
+
+    @abc.abstractmethod
+    def translate(self, text: Str) -> str:
+        ...
+
+    def _check(self, translated: Str) -> str:
+        if is_notice(translated):
+            raise Error(f"{self.name} responds with a notice instead of a translation: {translated[:200]}")
+        return translated
+
+    def warm_up(self):
+        # opens a keep-alive connection to the service, so that the first translation skips the handshakes
+        pass
+
+    def with_from_lang(self, from_lang: Str) -> "Translator":
+        # the same backend translating from another source language, e.g. the one ocr detected.
+        # backends that bake the source language into their state override it
+        t = copy.copy(self)
+        t.from_lang = from_lang
+        return t
+
+    def close(self):
+        pass
+
+    def _connect(self, url: Str):
+        try:
+            session().head(url, timeout=self.timeout)
+        except requests.RequestException as e:
+            logs.warning(f"failed to connect to {url} ahead of translating: {e}")
+
+
+_BACKENDS: dict[str, type[Translator]] = {}
+
+
+def register(name: Str) -> Callable[[type[Translator]], type[Translator]]:
+    def wrapper(cls: type[Translator]) -> type[Translator]:
+        cls.name = name
+        _BACKENDS[name] = cls
+        return cls
+
+    return wrapper
+
+
+def backends() -> list[str]:
+    return list(_BACKENDS.keys())
+
+
+def new_translator(name: Str, **kwargs) -> Translator:
+    if name not in _BACKENDS:
+        raise BackendNotFound(f"translator backend: {name} is not in {backends()}")
+    return _BACKENDS[name](**kwargs)
+
+
+# the `translate` package, with its connections moved into the shared pool
+@register("default")
+class DefaultTranslator(Translator):
+    def __init__(self, from_lang: Str = AUTO_LANG, to_lang: Str = "zh", timeout: float | None = None, **kwargs):
+        super().__init__(from_lang, to_lang, timeout)
+        self._kwargs = kwargs
+        # only this backend needs the `translate` package
+        import translate as tr
+
+        self._translator = tr.Translator(
+            to_lang=to_lang,
+            from_lang="autodetect" if from_lang == AUTO_LANG else from_lang,
+            **kwargs
+        )
+        self._translator.provider.session = session()
+
+    @override
+    def translate(self, text: Str) -> str:
+        try:
+            translated = self._translator.translate(text)
+        except Exception as e:
+            raise Error(f"failed to translate by {self._translator.provider.name}: {e}") from e
+        return self._check(translated)
+
+    @override
+    def warm_up(self):
+        url = getattr(self._translator.provider, "base_url", None)
+        if url:
+            self._connect(url)
+
+    @override
+    def with_from_lang(self, from_lang: Str) -> Translator:
+        return DefaultTranslator(from_lang, self.to_lang, self.timeout, **self._kwargs)
+
+
+@register("mymemory")
+class MyMemoryTranslator(Translator):
+    _URL = "https://api.mymemory.translated.net/get"
+
+    def __init__(self, from_lang: Str = AUTO_LANG, to_lang: Str = "zh", timeout: float | None = None,
+                 url: Str | None = None, email: Str | None = None, **kwargs):
+        super().__init__(from_lang, to_lang, timeout)
+        self._url = url or self._URL
+        self._params = {"langpair": self._langpair(from_lang, to_lang)}
+        if email:
+            self._params["de"] = email
+
+    @staticmethod
+    def _langpair(from_lang: Str, to_lang: Str) -> str:
+        return f"{'autodetect' if from_lang == AUTO_LANG else from_lang}|{to_lang}"
+
+    @override
+    def translate(self, text: Str) -> str:
+        try:
+            resp = session().get(self._url, params={**self._params, "q": text}, timeout=self.timeout)
+            resp.raise_for_status()
+            data = resp.json()
+        except (requests.RequestException, ValueError) as e:
+            raise Error(f"failed to request {self._url}: {e}") from e
+
+        if data.get("responseStatus") != 200:
+            raise Error(f"mymemory responds {data.get('responseStatus')}: {data.get('responseDetails')}")
+        return self._check(data["responseData"]["translatedText"])
+
+    @override
+    def warm_up(self):
+        self._connect(self._url)
+
+    @override
+    def with_from_lang(self, from_lang: Str) -> Translator:
+        t = super().with_from_lang(from_lang)
+        t._params = {**self._params, "langpair": self._langpair(from_lang, self.to_lang)}
+        return t
+
+
+@register("libre")
+class LibreTranslator(Translator):
+    def __init__(self, from_lang: Str = AUTO_LANG, to_lang: Str = "zh", timeout: float | None = None,
+                 url: Str | None = None, api_key: Str | None = None, **kwargs):
+        super().__init__(from_lang, to_lang, timeout)
+        if not url:
+            raise Error("libre translator needs an url")
+        self._url = url.rstrip("/") + "/translate"
+        self._api_key = api_key
+
+    @override
+    def translate(self, text: Str) -> str:
+        body = {"q": text, "source": self.from_lang, "target": self.to_lang, "format": "text"}
+        if self._api_key:
+            body["api_key"] = self._api_key
+
+        try:
+            resp = session().post(self._url, json=body, timeout=self.timeout)
+            resp.raise_for_status()
+            translated = resp.json()["translatedText"]
+        except (requests.RequestException, ValueError, KeyError) as e:
+            raise Error(f"failed to request {self._url}: {e}") from e
+        return self._check(translated)
+
+    @override
+    def warm_up(self):
+        self._connect(self._url)
+
+
+def from_conf() -> Translator:
+    t = new_translator(
+        conf.translator.backend,
+        from_lang=conf.translator.from_lang,
+        to_lang=conf.ocr.to_lang,
+        **conf.translator.backend_options,
+    )
+    logs.info(f"translator backend is {conf.translator.backend}")
+    return t
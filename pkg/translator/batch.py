@@ -0,0 +1,151 @@
+import re
+from concurrent import futures
+from typing import Callable, Iterator
+
+from pkg import logs
+from . import cache
+
+TranslateFn = Callable[[str], str]
+
+# line breaks together with the spaces around them, kept as is between translated segments
+_SEPARATOR = re.compile(r"(\s*\n\s*)")
+# segments of a batch are sent as lines of one request
+_JOINER = "\n"
+# a line ending in one of these ends its sentence, one ending in a continuation mark does not
+_TERMINAL = frozenset(".!?:;…\"')]」』）。！？")
+_CONTINUATION = frozenset(",-，、")
+# a line wrapped mid-sentence has a few words, shorter lines are labels, menu items and table cells
+_WRAP_MIN_WORDS = 3
+
+
+def split(text: str) -> tuple[list[str], list[str]]:
+    # returns segments and the separators between them, len(separators) == len(segments) - 1.
+    # a segment is a paragraph line: lines wrapped mid-sentence, e.g. a two line subtitle, are joined
+    # into one segment, a fragment of a sentence translates badly on its own
+    parts = _SEPARATOR.split(text.strip())
+    segments, separators = parts[:1], []
+    for separator, line in zip(parts[1::2], parts[2::2]):
+        if separator.count("\n") == 1 and _wraps(segments[-1], line):
+            last = segments[-1][-1]
+            segments[-1] += line if last == "-" or not last.isascii() else " " + line
+        else:
+            separators.append(separator)
+            segments.append(line)
+    return segments, separators
+
+
+def _wraps(line: str, next_line: str) -> bool:
+    # whether next_line continues the sentence of line, a blank line always ends a paragraph
+    last = line[-1]
+    if last in _CONTINUATION:
+        return True
+    if last in _TERMINAL:
+        return False
+    return next_line[0].islower() and len(line.split()) >= _WRAP_MIN_WORDS
+
+
+def join(segments: list[str], separators: list[str]) -> str:
+    pieces = [segments[0]] if segments else []
+    for separator, segment in zip(separators, segments[1:]):
+        pieces.append(separator)
+        pieces.append(segment)
+    return "".join(pieces)
+
+
+def pack(segments: list[str], max_chars: int) -> list[list[str]]:
+    batches: list[list[str]] = []
+    size = 0
+    for segment in segments:
+        if not batches or size + len(_JOINER) + len(segment) > max_chars:
+            batches.append([])
+            size = -len(_JOINER)
+        batches[-1].append(segment)
+        size += len(_JOINER) + len(segment)
+    return batches
+
+
+class Batcher:
+    def __init__(self, translate_fn: TranslateFn, max_chars: int, max_workers: int):
+        self._translate_fn = translate_fn
+        self._max_chars = max_chars
+        self._executor = futures.ThreadPoolExecutor(max_workers, thread_name_prefix="translate")
+
+    def translate(
+            self,
+            text: str,
+            c: cache.Cache | None,
+            from_lang: str,
+            to_lang: str,
+            translate_fn: TranslateFn | None = None,
+    ) -> str:
+        segments, separators = split(text)
+        translated = self.translate_segments(segments, c, from_lang, to_lang, translate_fn)
+        return join([translated[s] for s in segments], separators)
+
+    def translate_segments(
+            self,
+            segments: list[str],
+            c: cache.Cache | None,
+            from_lang: str,
+            to_lang: str,
+            translate_fn: TranslateFn | None = None,
+    ) -> dict[str, str]:
+        # returns segment -> translation for every segment, duplicates and cached segments are not sent
+        return dict(self.translate_iter(segments, c, from_lang, to_lang, translate_fn))
+
+    def translate_iter(
+            self,
+            segments: list[str],
+            c: cache.Cache | None,
+            from_lang: str,
+            to_lang: str,
+            translate_fn: TranslateFn | None = None,
+    ) -> Iterator[tuple[str, str]]:
+        # yields (segment, translation) once for every unique segment: cached ones first,
+        # then every batch as soon as it is translated, whatever the order of the batches.
+        # translate_fn replaces the batcher's for this call, e.g. one translating from another language
+        missing: list[str] = []
+        for segment in dict.fromkeys(segments):
+            if not segment:
+                yield segment, segment
+                continue
+
+            hit = c.get(segment, from_lang, to_lang) if c is not None else None
+            if hit is None:
+                missing.append(segment)
+            else:
+                yield segment, hit
+
+        if not missing:
+            return
+
+        logs.debug("translate %d of %d segments", len(missing), len(segments))
+        fn = translate_fn or self._translate_fn
+        pending = {self._executor.submit(self._translate_batch, batch, fn): batch
+                   for batch in pack(missing, self._max_chars)}
+        try:
+            for future in futures.as_completed(pending):
+                for segment, result in zip(pending[future], future.result()):
+                    if c is not None and result:
+                        c.put(segment, from_lang, to_lang, result)
+                    yield segment, result
+        finally:
+            # the caller stopped early or a batch failed, batches that have not started are dropped
+            for future in pending:
+                future.cancel()
+
+    @staticmethod
+    def _translate_batch(batch: list[str], fn: TranslateFn) -> list[str]:
+        if len(batch) == 1:
+            return [fn(batch[0])]
+
+        lines = fn(_JOINER.join(batch)).split(_JOINER)
+        if len(lines) == len(batch):
+            return [line.strip() for line in lines]
+
+        # the provider merged or split lines, the batch can not be mapped back, translate one by one
+        logs.warning(f"batch of {len(batch)} segments came back as {len(lines)} lines, translate them separately")
+        return [fn(segment) for segment in batch]
+
+    def close(self):
+        self._executor.shutdown(wait=False)
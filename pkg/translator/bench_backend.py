@@ -0,0 +1,50 @@
+import argparse
+import statistics
+import time
+
+import requests
+
+from .backend import new_translator
+from .local_server import LocalServer
+
+# per-call latency against the local stand-in service with a new connection per call
+# (what a session-less client does) and with the shared keep-alive pool
+# usage: python -m pkg.translator.bench_backend [-n 200]
+
+
+def new_connection_per_call(url: str, text: str) -> str:
+    resp = requests.post(url + "/translate", json={"q": text, "source": "en", "target": "zh"},
+                         headers={"Connection": "close"}, timeout=10)
+    return resp.json()["translatedText"]
+
+
+def measure(fn, n: int) -> list[float]:
+    elapsed = []
+    for i in range(n):
+        start = time.perf_counter()
+        fn(f"hello {i}")
+        elapsed.append(time.perf_counter() - start)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=200)
+    args = parser.parse_args()
+
+    with LocalServer() as server:
+        pooled = new_translator("libre", from_lang="en", to_lang="zh", url=server.url)
+        cases = (
+            ("new connection", lambda text: new_connection_per_call(server.url, text)),
+            ("pooled", pooled.translate),
+        )
+        for name, fn in cases:
+            connections = server.connections
+            elapsed = measure(fn, args.n)
+            print(f"{name:>14}: mean {statistics.fmean(elapsed) * 1000:6.3f} ms, "
+                  f"p50 {statistics.median(elapsed) * 1000:6.3f} ms, "
+                  f"connections {server.connections - connections}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import collections
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import AnyStr, LiteralString
+
+from pkg import logs
+from .backend import is_notice
+
+Str = AnyStr | LiteralString
+Key = tuple[str, str, str]  # (normalized text, from_lang, to_lang)
+
+
+def normalize(text: Str) -> str:
+    # OCR output of the same label differs in line breaks and spaces, they do not change the translation
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def key(text: Str, from_lang: Str, to_lang: Str) -> Key:
+    return normalize(text), from_lang, to_lang
+
+
+class Stats:
+    def __init__(self):
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return f"Stats(memory_hits={self.memory_hits}, disk_hits={self.disk_hits}, misses={self.misses})"
+
+
+class LruCache:
+    def __init__(self, max_entries: int, ttl: float | None = None):
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._entries: collections.OrderedDict[Key, tuple[str, float]] = collections.OrderedDict()
+
+    def get(self, k: Key) -> str | None:
+        entry = self._entries.get(k)
+        if entry is None:
+            return None
+
+        value, created_at = entry
+        if self._ttl is not None and time.time() - created_at > self._ttl:
+            del self._entries[k]
+            return None
+
+        self._entries.move_to_end(k)
+        return value
+
+    def put(self, k: Key, value: str, created_at: float | None = None):
+        self._entries[k] = (value, time.time() if created_at is None else created_at)
+        self._entries.move_to_end(k)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SqliteStore:
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS translation (
+            text TEXT NOT NULL,
+            from_lang TEXT NOT NULL,
+            to_lang TEXT NOT NULL,
+            translated TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            accessed_at REAL NOT NULL,
+            PRIMARY KEY (text, from_lang, to_lang)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS translation_accessed_at ON translation (accessed_at);
+    """
+    # trimming to max_entries needs a count, do it once per this many puts instead of every time
+    _EVICT_INTERVAL = 64
+
+    def __init__(self, path: Str, max_entries: int, ttl: float | None = None):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._puts = 0
+        # translate runs in worker threads, one connection is shared and guarded by the cache lock
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self._SCHEMA)
+        self.evict()
+
+    def get(self, k: Key) -> tuple[str, float] | None:
+        row = self._conn.execute(
+            "SELECT translated, created_at FROM translation WHERE text = ? AND from_lang = ? AND to_lang = ?", k
+        ).fetchone()
+        if row is None:
+            return None
+
+        translated, created_at = row
+        now = time.time()
+        if self._ttl is not None and now - created_at > self._ttl:
+            self._conn.execute("DELETE FROM translation WHERE text = ? AND from_lang = ? AND to_lang = ?", k)
+            return None
+
+        self._conn.execute(
+            "UPDATE translation SET accessed_at = ? WHERE text = ? AND from_lang = ? AND to_lang = ?", (now, *k)
+        )
+        return translated, created_at
+
+    def put(self, k: Key, value: str):
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO translation VALUES (?, ?, ?, ?, ?, ?)", (*k, value, now, now)
+        )
+        self._puts += 1
+        if self._puts % self._EVICT_INTERVAL == 0:
+            self.evict()
+
+    def evict(self):
+        if self._ttl is not None:
+            self._conn.execute("DELETE FROM translation WHERE created_at < ?", (time.time() - self._ttl,))
+
+        count = self._conn.execute("SELECT COUNT(*) FROM translation").fetchone()[0]
+        if count > self._max_entries:
+            self._conn.execute(
+                "DELETE FROM translation WHERE (text, from_lang, to_lang) IN "
+                "(SELECT text, from_lang, to_lang FROM translation ORDER BY accessed_at LIMIT ?)",
+                (count - self._max_entries,),
+            )
+            logs.info(f"evicted {count - self._max_entries} translations from disk cache")
+
+    def clear(self):
+        self._conn.execute("DELETE FROM translation")
+
+    def close(self):
+        self._conn.close()
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM translation").fetchone()[0]
+
+
+# memory LRU in front of a persistent sqlite store, safe to share between threads
+class Cache:
+    def __init__(self, memory: LruCache, disk: SqliteStore | None = None):
+        self._memory = memory
+        self._disk = disk
+        self._lock = threading.Lock()
+        self.stats = Stats()
+
+    def get(self, text: Str, from_lang: Str, to_lang: Str) -> str | None:
+        k = key(text, from_lang, to_lang)
+        with self._lock:
+            value = self._memory.get(k)
+            if value is not None:
+                self.stats.memory_hits += 1
+                return value
+
+            if self._disk is not None:
+                entry = self._disk.get(k)
+                if entry is not None:
+                    self.stats.disk_hits += 1
+                    self._memory.put(k, *entry)
+                    return entry[0]
+
+            self.stats.misses += 1
+            return None
+
+    def put(self, text: Str, from_lang: Str, to_lang: Str, translated: str):
+        k = key(text, from_lang, to_lang)
+        # an untranslated echo or a provider notice would be served for cache_ttl, across restarts
+        if not translated or normalize(translated) == k[0] or is_notice(translated):
+            logs.debug("not caching the translation of %r: %r", k[0], translated)
+            return
+        with self._lock:
+            self._memory.put(k, translated)
+            if self._disk is not None:
+                self._disk.put(k, translated)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._disk is not None:
+                self._disk.clear()
+
+    def close(self):
+        with self._lock:
+            if self._disk is not None:
+                self._disk.close()
+                self._disk = None
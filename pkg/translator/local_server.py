@@ -0,0 +1,113 @@
+import json
+import threading
+import time
+import urllib.parse
+from http import server
+from typing import Callable, override
+
+from pkg import logs
+
+# a stand-in translation service on localhost for tests and benchmarks.
+# it speaks the libre (POST /translate) and mymemory (GET /get) protocols,
+# and counts requests and tcp connections so connection reuse can be checked without the internet
+
+
+def upper(text: str, to_lang: str) -> str:
+    return text.upper()
+
+
+class LocalServer:
+    def __init__(self, translate_fn: Callable[[str, str], str] = upper, delay: float = 0):
+        self.translate_fn = translate_fn
+        self.delay = delay
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = _Server(("127.0.0.1", 0), _handler(self))
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="local-translator", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "LocalServer":
+        self._thread.start()
+        logs.info(f"local translator is listening on {self.url}")
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def _on_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    def _translate(self, text: str, to_lang: str) -> str:
+        with self._lock:
+            self.requests += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return self.translate_fn(text, to_lang)
+
+
+class _Server(server.ThreadingHTTPServer):
+    @override
+    def handle_error(self, request, client_address):
+        # clients that time out close the connection before the reply
+        logs.debug("local translator failed to serve %s", client_address)
+
+
+def _handler(local: LocalServer) -> type[server.BaseHTTPRequestHandler]:
+    class Handler(server.BaseHTTPRequestHandler):
+        # HTTP/1.1 keeps connections open between requests
+        protocol_version = "HTTP/1.1"
+        # headers and body are written separately, nagle would hold the body back on a kept-alive connection
+        disable_nagle_algorithm = True
+
+        @override
+        def setup(self):
+            super().setup()
+            local._on_connection()
+
+        def do_GET(self):
+            url = urllib.parse.urlsplit(self.path)
+            if url.path != "/get":
+                self._reply(404, {"error": "not found"})
+                return
+
+            query = urllib.parse.parse_qs(url.query)
+            to_lang = query.get("langpair", ["|"])[0].split("|")[-1]
+            translated = local._translate(query.get("q", [""])[0], to_lang)
+            self._reply(200, {"responseData": {"translatedText": translated}, "responseStatus": 200})
+
+        def do_POST(self):
+            if self.path != "/translate":
+                self._reply(404, {"error": "not found"})
+                return
+
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            self._reply(200, {"translatedText": local._translate(body.get("q", ""), body.get("target", ""))})
+
+        def _reply(self, code: int, body: dict):
+            data = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        @override
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
@@ -0,0 +1,54 @@
+import unittest
+
+from .backend import *
+from .local_server import LocalServer
+
+
+class TestBackend(unittest.TestCase):
+    def test_new_translator_not_found(self):
+        with self.assertRaises(BackendNotFound):
+            new_translator("not_exist_backend")
+
+    def test_libre(self):
+        with LocalServer() as server:
+            t = new_translator("libre", to_lang="zh", url=server.url)
+            for i in range(5):
+                self.assertEqual(f"HELLO {i}", t.translate(f"hello {i}"))
+            self.assertEqual(5, server.requests)
+            # keep-alive: every request goes through the same pooled connection
+            self.assertEqual(1, server.connections)
+
+    def test_mymemory(self):
+        with LocalServer(lambda text, to_lang: f"[{to_lang}] {text}") as server:
+            t = new_translator("mymemory", to_lang="ja", url=server.url + "/get")
+            self.assertEqual("[ja] hello", t.translate("hello"))
+
+    def test_notice_is_an_error(self):
+        quota = ("MYMEMORY WARNING: YOU USED ALL AVAILABLE FREE TRANSLATIONS FOR TODAY. NEXT AVAILABLE IN  "
+                 "10 HOURS 20 MINUTES 51 SECONDS VISIT HTTPS://MYMEMORY.TRANSLATED.NET/DOC/USAGELIMITS.PHP")
+        with LocalServer(lambda text, to_lang: quota) as server:
+            for t in (new_translator("mymemory", url=server.url + "/get"), new_translator("libre", url=server.url)):
+                with self.assertRaisesRegex(Error, "notice"):
+                    t.translate("hello")
+        self.assertTrue(is_notice("'AUTODETECT' IS AN INVALID SOURCE LANGUAGE . EXAMPLE: LANGPAIR=EN|IT"))
+        self.assertFalse(is_notice("Warning: the file is read only"))
+
+    def test_with_from_lang(self):
+        t = new_translator("mymemory", to_lang="ja", url="http://localhost")
+        de = t.with_from_lang("de")
+        self.assertEqual("de|ja", de._params["langpair"])
+        self.assertEqual("autodetect|ja", t._params["langpair"])
+
+        t = new_translator("libre", to_lang="zh", url="http://localhost")
+        self.assertEqual(("de", "zh"), (t.with_from_lang("de").from_lang, t.with_from_lang("de").to_lang))
+        self.assertEqual("auto", t.from_lang)
+
+    def test_timeout(self):
+        with LocalServer(delay=0.5) as server:
+            t = new_translator("libre", url=server.url, timeout=0.05)
+            with self.assertRaises(Error):
+                t.translate("hello")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import threading
+import unittest
+
+from .batch import *
+from .cache import Cache, LruCache
+
+
+class _FakeTranslator:
+    def __init__(self, keep_lines=True):
+        self.requests = []
+        self._keep_lines = keep_lines
+        self._lock = threading.Lock()
+
+    def __call__(self, text: str) -> str:
+        with self._lock:
+            self.requests.append(text)
+        translated = "\n".join(line.upper() for line in text.split("\n"))
+        return translated if self._keep_lines else translated.replace("\n", " ")
+
+
+class TestBatch(unittest.TestCase):
+    def test_split_join(self):
+        text = "Name  Size\n  a.txt 1\n\nName  Size\nb.txt 2"
+        segments, separators = split(text)
+        self.assertEqual(["Name  Size", "a.txt 1", "Name  Size", "b.txt 2"], segments)
+        self.assertEqual(text, join(segments, separators))
+
+    def test_split_joins_wrapped_lines(self):
+        segments, separators = split("I told you not to go\nthere without me.\nRun!\n\nFirst paragraph,\n"
+                                     "Still the first.\nA well-\nknown fact is\nnot news")
+        self.assertEqual(["I told you not to go there without me.", "Run!",
+                          "First paragraph, Still the first.", "A well-known fact is not news"], segments)
+        self.assertEqual(["\n", "\n\n", "\n"], separators)
+        # menus and short labels are kept apart, and so are lines across a blank line
+        self.assertEqual(["File", "edit", "view"], split("File\nedit\nview")[0])
+        self.assertEqual(["the first part of", "the second"], split("the first part of\n\nthe second")[0])
+        self.assertEqual(["設定を保存して、終了します", "ファイル"], split("設定を保存して、\n終了します\nファイル")[0])
+
+    def test_pack(self):
+        self.assertEqual([["aaa", "bb"], ["cccc"], ["dddddd"]], pack(["aaa", "bb", "cccc", "dddddd"], 6))
+
+    def test_order_and_dedup(self):
+        fake = _FakeTranslator()
+        b = Batcher(fake, max_chars=8, max_workers=4)
+        text = "one\ntwo\none\nthree\n\ntwo"
+        self.assertEqual("ONE\nTWO\nONE\nTHREE\n\nTWO", b.translate(text, None, "en", "zh"))
+        sent = "\n".join(fake.requests).split("\n")
+        self.assertEqual(["one", "three", "two"], sorted(sent))
+        b.close()
+
+    def test_fallback_when_lines_are_merged(self):
+        fake = _FakeTranslator(keep_lines=False)
+        b = Batcher(fake, max_chars=100, max_workers=1)
+        self.assertEqual("ONE\nTWO", b.translate("one\ntwo", None, "en", "zh"))
+        self.assertEqual(["one\ntwo", "one", "two"], fake.requests)
+        b.close()
+
+    def test_segment_cache(self):
+        fake = _FakeTranslator()
+        b = Batcher(fake, max_chars=100, max_workers=2)
+        c = Cache(LruCache(16))
+        b.translate("one\ntwo", c, "en", "zh")
+        fake.requests.clear()
+
+        self.assertEqual("ONE\nTWO\nTHREE", b.translate("one\ntwo\nthree", c, "en", "zh"))
+        self.assertEqual(["three"], fake.requests)
+        b.close()
+
+    def test_iter_cached_first(self):
+        fake = _FakeTranslator()
+        b = Batcher(fake, max_chars=100, max_workers=2)
+        c = Cache(LruCache(16))
+        c.put("two", "en", "zh", "cached")
+        results = list(b.translate_iter(["one", "two", "", "one"], c, "en", "zh"))
+        self.assertEqual([("two", "cached"), ("", "")], results[:2])
+        self.assertEqual([("one", "ONE")], results[2:])
+        b.close()
+
+    def test_iter_as_completed(self):
+        # the first batch is slow, the second one is yielded before it
+        release = threading.Event()
+
+        def translate(text: str) -> str:
+            if text == "slow":
+                release.wait(5)
+            return text.upper()
+
+        b = Batcher(translate, max_chars=4, max_workers=2)
+        it = b.translate_iter(["slow", "fast"], None, "en", "zh")
+        self.assertEqual(("fast", "FAST"), next(it))
+        release.set()
+        self.assertEqual([("slow", "SLOW")], list(it))
+        b.close()
+
+    def test_iter_error(self):
+        def translate(text: str) -> str:
+            raise RuntimeError("service is down")
+
+        b = Batcher(translate, max_chars=4, max_workers=1)
+        with self.assertRaises(RuntimeError):
+            list(b.translate_iter(["one", "two"], None, "en", "zh"))
+        b.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import tempfile
+import time
+import unittest
+
+from .cache import *
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._dir.name, "cache.sqlite3")
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def _new_cache(self, memory_entries=8, disk_entries=100, ttl=None) -> Cache:
+        return Cache(LruCache(memory_entries, ttl), SqliteStore(self._path, disk_entries, ttl))
+
+    def test_normalize(self):
+        self.assertEqual("File Edit View", normalize("  File\nEdit \t View \n"))
+
+    def test_memory_hit(self):
+        c = self._new_cache()
+        self.assertIsNone(c.get("hello", "en", "zh"))
+        c.put("hello", "en", "zh", "你好")
+        self.assertEqual("你好", c.get("hello\n", "en", "zh"))
+        self.assertIsNone(c.get("hello", "en", "ja"))
+        self.assertEqual(1, c.stats.memory_hits)
+        self.assertEqual(2, c.stats.misses)
+        c.close()
+
+    def test_survives_restart(self):
+        c = self._new_cache()
+        c.put("hello", "en", "zh", "你好")
+        c.close()
+
+        c = self._new_cache()
+        self.assertEqual("你好", c.get("hello", "en", "zh"))
+        self.assertEqual("你好", c.get("hello", "en", "zh"))
+        self.assertEqual(1, c.stats.disk_hits)
+        self.assertEqual(1, c.stats.memory_hits)
+        c.close()
+
+    def test_echo_and_notice_are_not_cached(self):
+        c = self._new_cache()
+        c.put("1024", "en", "zh", "1024")
+        c.put("hello", "en", "zh", "MYMEMORY WARNING: YOU USED ALL AVAILABLE FREE TRANSLATIONS FOR TODAY.")
+        c.put("bye", "en", "zh", "")
+        self.assertIsNone(c.get("1024", "en", "zh"))
+        self.assertIsNone(c.get("hello", "en", "zh"))
+        self.assertIsNone(c.get("bye", "en", "zh"))
+        c.close()
+        c = self._new_cache()
+        self.assertIsNone(c.get("hello", "en", "zh"))
+        c.close()
+
+    def test_lru_eviction(self):
+        lru = LruCache(2)
+        lru.put(("a", "en", "zh"), "A")
+        lru.put(("b", "en", "zh"), "B")
+        lru.get(("a", "en", "zh"))
+        lru.put(("c", "en", "zh"), "C")
+        self.assertEqual(2, len(lru))
+        self.assertIsNone(lru.get(("b", "en", "zh")))
+        self.assertEqual("A", lru.get(("a", "en", "zh")))
+
+    def test_ttl(self):
+        lru = LruCache(2, ttl=10)
+        lru.put(("a", "en", "zh"), "A", created_at=time.time() - 11)
+        self.assertIsNone(lru.get(("a", "en", "zh")))
+
+        store = SqliteStore(self._path, 100, ttl=-1)
+        store.put(("a", "en", "zh"), "A")
+        self.assertIsNone(store.get(("a", "en", "zh")))
+        store.close()
+
+    def test_disk_eviction_by_size(self):
+        store = SqliteStore(self._path, 10)
+        for i in range(25):
+            store.put((str(i), "en", "zh"), str(i))
+        store.evict()
+        self.assertEqual(10, len(store))
+        self.assertIsNone(store.get(("0", "en", "zh")))
+        self.assertIsNotNone(store.get(("24", "en", "zh")))
+        store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,33 +1,127 @@
-from typing import AnyStr, LiteralString, override
+import functools
+import threading
+import time
+from typing import AnyStr, LiteralString, Iterator
 
-import translate as tr
+from pkg import conf, logs, trace
+from . import cache, batch, backend
 
-from pkg import conf
+# the backend and the cache are created on first use, or ahead of it by warm_up
+_translator: backend.Translator | None = None
+_cache: cache.Cache | None = None
+_cache_lock = threading.Lock()
+# source language -> the backend translating from it, derived from _translator when a caller knows the language
+_by_lang: dict[str, backend.Translator] = {}
 
 
-class Translator:
-    def __init__(self):
-        pass
+def _request(text: str, t: backend.Translator | None = None) -> str:
+    with trace.span("translate.request"):
+        return (t or _get_translator()).translate(text)
 
-    def translate(self, text: AnyStr | LiteralString) -> str:
-        return ""
 
+_batcher = batch.Batcher(
+    _request,
+    conf.translator.batch_max_chars,
+    conf.translator.batch_workers,
+)
 
-class DefaultTranslator(Translator):
-    def __init__(self):
-        super().__init__()
 
-    @override
-    def translate(self, text: AnyStr | LiteralString) -> str:
-        return ""
+def init(cache_path: AnyStr | LiteralString | None = None, translator: backend.Translator | None = None):
+    global _cache, _translator
+    with _cache_lock:
+        if translator is not None:
+            if _translator is not None:
+                _translator.close()
+            _translator = translator
+            _by_lang.clear()
 
+        if _cache is not None:
+            _cache.close()
+        _cache = _new_cache(cache_path)
 
-_translator = tr.Translator(to_lang=conf.ocr.to_lang)
 
+def cache_stats() -> cache.Stats:
+    return _get_cache().stats
 
-def init():
-    pass
 
+@trace.timed("translate")
+def translate(text: AnyStr | LiteralString, from_lang: str | None = None) -> str:
+    # from_lang overrides the configured source language, e.g. with the language ocr detected
+    t = _get_translator(from_lang)
+    return _batcher.translate(text, _get_cache(), t.from_lang, t.to_lang, functools.partial(_request, t=t))
 
-def translate(text: AnyStr | LiteralString) -> str:
-    return _translator.translate(text)
+
+def translate_iter(text: AnyStr | LiteralString, from_lang: str | None = None) -> Iterator[tuple[int, str]]:
+    # yields (index, translation) for every segment of split(text) as soon as it is translated,
+    # joining the translations in index order with the separators gives translate(text)
+    t = _get_translator(from_lang)
+    segments, _ = batch.split(text)
+    indexes: dict[str, list[int]] = {}
+    for i, segment in enumerate(segments):
+        indexes.setdefault(segment, []).append(i)
+
+    start = time.perf_counter()
+    first = True
+    for segment, translation in _batcher.translate_iter(segments, _get_cache(), t.from_lang, t.to_lang,
+                                                        functools.partial(_request, t=t)):
+        if first:
+            trace.record("translate.first", time.perf_counter() - start)
+            first = False
+        for i in indexes[segment]:
+            yield i, translation
+
+
+def split(text: AnyStr | LiteralString) -> tuple[list[str], list[str]]:
+    # the segments translate_iter translates, and the separators between them
+    return batch.split(text)
+
+
+def join(segments: list[str], separators: list[str]) -> str:
+    return batch.join(segments, separators)
+
+
+def warm_up():
+    # creates the backend and the cache and opens a connection to the service ahead of the first translation
+    _get_cache()
+    _get_translator().warm_up()
+
+
+def _get_translator(from_lang: str | None = None) -> backend.Translator:
+    global _translator
+    if _translator is None:
+        with _cache_lock:
+            if _translator is None:
+                _translator = backend.from_conf()
+    if from_lang is None or from_lang == _translator.from_lang:
+        return _translator
+
+    t = _by_lang.get(from_lang)
+    if t is None:
+        with _cache_lock:
+            t = _by_lang.get(from_lang)
+            if t is None:
+                t = _by_lang[from_lang] = _translator.with_from_lang(from_lang)
+    return t
+
+
+def _get_cache() -> cache.Cache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = _new_cache(None)
+    return _cache
+
+
+def _new_cache(cache_path: AnyStr | LiteralString | None) -> cache.Cache:
+    if cache_path is None:
+        cache_path = conf.translator.cache_path
+
+    disk = None
+    if cache_path:
+        try:
+            disk = cache.SqliteStore(cache_path, conf.translator.cache_disk_entries, conf.translator.cache_ttl)
+        except Exception as e:
+            logs.error(f"failed to open translation cache {cache_path}, only memory cache is used: {e}")
+
+    return cache.Cache(cache.LruCache(conf.translator.cache_memory_entries, conf.translator.cache_ttl), disk)
@@ -0,0 +1,124 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+import batch
+from pkg import conf, translator
+from pkg.translator import local_server
+
+
+def _fake_recognize(path: str) -> tuple[str, str]:
+    # stands in for tesseract: the "image" holds its text, "slow" takes a while and "broken" fails
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if "broken" in text:
+        raise ValueError("not an image")
+    if "slow" in text:
+        time.sleep(0.5)
+    return text, "eng"
+
+
+class TestBatch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._server = local_server.LocalServer().start()
+        cls._cache_path, conf.translator.cache_path = conf.translator.cache_path, ""
+        translator.init(translator=translator.new_translator("libre", from_lang="auto", to_lang="zh",
+                                                            url=cls._server.url))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._server.stop()
+        conf.translator.cache_path = cls._cache_path
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def _write(self, name: str, text: str) -> str:
+        path = os.path.join(self.dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def _run(self, paths, **kwargs) -> list[dict]:
+        records = []
+        batch.Batch(_fake_recognize, workers=2, **kwargs).run(paths, records.append)
+        return records
+
+    def test_find(self):
+        for name in ["b/2.png", "b/1.JPG", "a/3.png", "a/notes.txt", "4.webp"]:
+            self._write(name, "")
+        extra = self._write("extra.txt", "")
+        found = list(batch.find([self.dir, extra], conf.batch.extensions))
+        self.assertEqual(["4.webp", "a/3.png", "b/1.JPG", "b/2.png", "extra.txt"],
+                         [os.path.relpath(p, self.dir).replace(os.sep, "/") for p in found])
+
+    def test_translates_in_input_order(self):
+        paths = [self._write(f"{i}.png", text) for i, text in enumerate(["slow one", "two", "", "four"])]
+        records = self._run(paths)
+        self.assertEqual(paths, [r["path"] for r in records])
+        self.assertEqual(["SLOW ONE", "TWO", "", "FOUR"], [r["translated"] for r in records])
+        self.assertEqual("eng", records[1]["lang"])
+        self.assertNotIn("translate_ms", records[2])
+
+    def test_completion_order(self):
+        paths = [self._write(f"{i}.png", text) for i, text in enumerate(["slow one", "two", "three"])]
+        records = self._run(paths, ordered=False, translate=False)
+        self.assertEqual(paths[0], records[-1]["path"])
+        self.assertEqual(["", "", ""], [r["translated"] for r in records])
+
+    def test_resume(self):
+        paths = [self._write(f"{i}.png", text) for i, text in enumerate(["one", "broken", "three"])]
+        output = os.path.join(self.dir, "out.jsonl")
+        records = self._run(paths)
+        self.assertIn("ValueError", records[1]["error"])
+        with open(output, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(r) + "\n" for r in records[:2])
+            # cut off by an interrupted run
+            f.write('{"path": "')
+
+        done = batch.load_done(output)
+        self.assertEqual({os.path.abspath(paths[0])}, done)
+        # the failed file goes, it gets a new line when it is tried again
+        with open(output, encoding="utf-8") as f:
+            self.assertEqual([paths[0]], [json.loads(line)["path"] for line in f])
+        # the failed file is tried again, the one that was never written is done now
+        rest = [p for p in paths if os.path.abspath(p) not in done]
+        self.assertEqual(paths[1:], [r["path"] for r in self._run(rest)])
+
+    def test_headless_cli(self):
+        # the command line without a display, recognizing with the fake in the worker processes.
+        # the failed file is tried again on resume and has one line in the end
+        good, broken = self._write("a.png", "hello batch"), self._write("b.png", "broken")
+        output = os.path.join(self.dir, "out.jsonl")
+        env = {k: v for k, v in os.environ.items() if k not in {"DISPLAY", "WAYLAND_DISPLAY", "QT_QPA_PLATFORM"}}
+        script = "import batch, test_batch; batch.recognize = test_batch._fake_recognize; batch.main()"
+
+        def run(*args: str) -> tuple[int, list[dict]]:
+            proc = subprocess.run([sys.executable, "-c", script, "-o", output, "--no-translate", "-j", "1", *args,
+                                   self.dir], cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+                                  capture_output=True, text=True, timeout=60)
+            with open(output, encoding="utf-8") as f:
+                return proc.returncode, [json.loads(line) for line in f]
+
+        code, records = run()
+        self.assertEqual(1, code)
+        self.assertEqual([good, broken], [r["path"] for r in records])
+        self.assertEqual(("hello batch", "eng"), (records[0]["text"], records[0]["lang"]))
+        self.assertIn("ValueError", records[1]["error"])
+
+        self._write("b.png", "fixed")
+        code, records = run("--resume")
+        self.assertEqual(0, code)
+        self.assertEqual([(good, "hello batch"), (broken, "fixed")], [(r["path"], r.get("text")) for r in records])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import unittest
+
+# must be set before Qt is imported
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6 import QtWidgets, QtCore, QtGui
+
+from component import clip_window
+
+
+def _mouse_event(kind: QtCore.QEvent.Type, x: int, y: int) -> QtGui.QMouseEvent:
+    pos = QtCore.QPointF(x, y)
+    return QtGui.QMouseEvent(kind, pos, pos, QtCore.Qt.MouseButton.LeftButton, QtCore.Qt.MouseButton.LeftButton,
+                             QtCore.Qt.KeyboardModifier.NoModifier)
+
+
+class TestImageClipper(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+    def setUp(self):
+        self.clipper = clip_window._ImageClipper()
+        self.clipper.resize(400, 300)
+        self.clipper.show()
+        self.addCleanup(self.clipper.deleteLater)
+        self.clipped, self.pinned = [], []
+        self.clipper.clipped_sig.connect(self.clipped.append)
+        self.clipper.pinned_sig.connect(self.pinned.append)
+
+    def _drag(self, x1: int, y1: int, x2: int, y2: int):
+        self.clipper.mousePressEvent(_mouse_event(QtCore.QEvent.Type.MouseButtonPress, x1, y1))
+        self.clipper.mouseMoveEvent(_mouse_event(QtCore.QEvent.Type.MouseMove, x2, y2))
+        self.clipper.mouseReleaseEvent(_mouse_event(QtCore.QEvent.Type.MouseButtonRelease, x2, y2))
+
+    def test_confirm_emits_the_selection(self):
+        self._drag(110, 60, 10, 10)
+        self.assertEqual("clipped", self.clipper.state())
+        self.clipper.confirm_sig.emit()
+        self.assertEqual([QtCore.QRect(10, 10, 100, 50)], self.clipped)
+        self.assertEqual("empty", self.clipper.state())
+
+    def test_pin_emits_the_selection(self):
+        self._drag(10, 10, 110, 60)
+        self.clipper.pin_sig.emit()
+        self.assertEqual([QtCore.QRect(10, 10, 100, 50)], self.pinned)
+        self.assertEqual([], self.clipped)
+
+    def test_click_is_not_a_selection(self):
+        self._drag(10, 10, 10, 10)
+        self.assertEqual("empty", self.clipper.state())
+        self.clipper.confirm_sig.emit()
+        self.assertEqual([], self.clipped)
+
+    def test_toolkit_is_shown_while_clipped(self):
+        self._drag(10, 10, 110, 60)
+        self.assertTrue(self.clipper._toolkit.isVisible())
+        # a new drag over a selection replaces it
+        self.clipper.mousePressEvent(_mouse_event(QtCore.QEvent.Type.MouseButtonPress, 200, 200))
+        self.assertEqual("clipping", self.clipper.state())
+        self.assertFalse(self.clipper._toolkit.isVisible())
+        self.clipper.cancel_sig.emit()
+        self.assertEqual("empty", self.clipper.state())
+        self.clipper.confirm_sig.emit()
+        self.assertEqual([], self.clipped)
+
+    def test_reset_from_a_slot_runs_after_the_confirm(self):
+        # e.g. the clip window closes itself once the selection is pinned
+        self.clipper.pinned_sig.connect(lambda rect: self.clipper.reset())
+        self._drag(10, 10, 110, 60)
+        self.clipper.pin_sig.emit()
+        self.assertEqual([QtCore.QRect(10, 10, 100, 50)], self.pinned)
+        self.assertEqual("empty", self.clipper.state())
+        self.assertEqual(0, self.clipper._state_machine.stats.rejected)
+
+
+if __name__ == '__main__':
+    unittest.main()
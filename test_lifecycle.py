@@ -0,0 +1,357 @@
+import gc
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+import unittest
+from typing import Callable
+
+# must be set before Qt is imported
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import shiboken6
+from PySide6 import QtWidgets, QtCore, QtGui
+
+from component import main_window, clip_window
+from pkg import conf, history, ocr, translator
+from pkg.translator import local_server
+
+# hundreds of clips in one process must not leave anything behind: every cycle grabs the screen, opens the
+# clip window, shows a translated label for a selection and closes the window again, like a user would.
+# widget counts, python allocations and the resident size are compared between an early and the last cycle
+
+CYCLES = 200
+# cycles before the baseline is taken, caches and pools fill up in the first ones
+WARM_UP = 30
+# growth allowed over all measured cycles, far below one screenshot per cycle
+MAX_TRACED_GROWTH = 1 << 20
+MAX_RSS_GROWTH = 24 << 20
+PIN_CYCLES = 40
+PIN_WARM_UP = 5
+
+
+def _rss() -> int | None:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def _qt_objects(app: QtWidgets.QApplication) -> int:
+    return sum(1 + len(w.findChildren(QtCore.QObject)) for w in app.topLevelWidgets())
+
+
+class _StaticScreen:
+    # offscreen grabs of an area no window covers are undefined, pinned regions capture a fixed image instead
+    def __init__(self, screen: QtGui.QScreen):
+        self._screen = screen
+        self._pixmap = QtGui.QPixmap(screen.size())
+        self._pixmap.fill(QtGui.QColor("white"))
+
+    def grabWindow(self, window: int, x: int, y: int, width: int, height: int) -> QtGui.QPixmap:
+        return self._pixmap.copy(x, y, width, height)
+
+    def geometry(self) -> QtCore.QRect:
+        return self._screen.geometry()
+
+
+class _HandleEngine(ocr.Engine):
+    # like the capi engine: one handle per recognizing thread, freed by release or close. counts them
+    name = "handles"
+
+    def __init__(self, gate: threading.Event | None = None):
+        # with a gate, recognitions wait for it to be set
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.live = 0
+        self.gate = gate
+        self.entered = threading.Event()
+
+    def recognize(self, pixels, lang, mode=ocr.engine.DEFAULT_MODE) -> str:
+        return self.recognize_words(pixels, lang, mode).text
+
+    def recognize_words(self, pixels, lang, mode=ocr.engine.DEFAULT_MODE) -> ocr.Recognition:
+        self._handle()
+        self.entered.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+        return ocr.Recognition("pinned text", [90])
+
+    def detect_script(self, pixels) -> tuple[str, float]:
+        self._handle()
+        raise ocr.Error("too few characters")
+
+    def _handle(self):
+        if getattr(self._local, "handle", False):
+            return
+        self._local.handle = True
+        with self._lock:
+            self.created += 1
+            self.live += 1
+
+    def release(self):
+        if getattr(self._local, "handle", False):
+            self._local.handle = False
+            with self._lock:
+                self.live -= 1
+
+
+class _BlockingTranslator(translator.backend.Translator):
+    # translates once released, or fails with an exception that is not a translator.Error
+    name = "blocking"
+
+    def __init__(self, fail: bool = False):
+        super().__init__()
+        self.fail = fail
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.finished = threading.Event()
+
+    def translate(self, text):
+        self.started.set()
+        self.release.wait(5)
+        try:
+            if self.fail:
+                raise ValueError("unexpected")
+            return f"translated {text}"
+        finally:
+            self.finished.set()
+
+
+class TestClipLifecycle(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+        cls._dir = tempfile.TemporaryDirectory()
+        cls._server = local_server.LocalServer().start()
+        cls._cache_path, conf.translator.cache_path = conf.translator.cache_path, ""
+        translator.init(translator=translator.new_translator("libre", from_lang="auto", to_lang="zh",
+                                                            url=cls._server.url))
+        history.init(os.path.join(cls._dir.name, "history.sqlite3"))
+
+    @classmethod
+    def tearDownClass(cls):
+        history.close()
+        cls._server.stop()
+        conf.translator.cache_path = cls._cache_path
+        cls._dir.cleanup()
+
+    def _settle(self):
+        # runs posted events, deferred deletes included, until nothing is left
+        for _ in range(3):
+            self.app.processEvents()
+            QtCore.QCoreApplication.sendPostedEvents(None, QtCore.QEvent.Type.DeferredDelete)
+        gc.collect()
+
+    def _wait(self, done: Callable[[], bool], timeout: float = 5) -> bool:
+        deadline = time.monotonic() + timeout
+        while not done() and time.monotonic() < deadline:
+            self.app.processEvents(QtCore.QEventLoop.ProcessEventsFlag.AllEvents, 10)
+        return done()
+
+    def _use_engine(self, engine: ocr.Engine):
+        # every recognition reaches the engine
+        default, ocr.engine._engine = ocr.engine._engine, engine
+        self.addCleanup(setattr, ocr.engine, "_engine", default)
+        entries, conf.ocr.result_cache_entries = conf.ocr.result_cache_entries, 0
+        self.addCleanup(setattr, conf.ocr, "result_cache_entries", entries)
+
+    def _cycle(self, window: main_window.Window, i: int):
+        window.clip()
+        clip = window.fullscreen_widget
+        self.assertTrue(clip.isVisible())
+
+        # the selection is recognized as this text, ocr itself is covered by pkg.ocr
+        rect = QtCore.QRect(10 + i % 50, 10, 300, 40)
+        image = clip.img.copy(clip._scale_rect_by_size(rect)).toImage()
+        clip._new_translated_display_widget(f"clip number {i}", "en", image)
+        label = clip.findChildren(clip_window._TranslateLabel)[-1]
+        deadline = time.monotonic() + 5
+        while None in label._translated and time.monotonic() < deadline:
+            self.app.processEvents(QtCore.QEventLoop.ProcessEventsFlag.AllEvents, 10)
+        self.assertNotIn(None, label._translated)
+
+        clip.close()
+        self._settle()
+
+    def test_clip_cycles_are_flat(self):
+        window = main_window.Window()
+        window.show()
+        tracemalloc.start()
+        try:
+            for i in range(WARM_UP):
+                self._cycle(window, i)
+            history.flush(5)
+            self._settle()
+            objects, traced, rss = _qt_objects(self.app), tracemalloc.get_traced_memory()[0], _rss()
+
+            for i in range(WARM_UP, CYCLES):
+                self._cycle(window, i)
+            history.flush(5)
+            self._settle()
+            grown_traced = tracemalloc.get_traced_memory()[0] - traced
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(objects, _qt_objects(self.app))
+        self.assertEqual([], window.fullscreen_widget.findChildren(clip_window._TranslateLabel))
+        self.assertIsNone(window.fullscreen_widget.img)
+        self.assertLess(grown_traced, MAX_TRACED_GROWTH)
+        if rss is not None:
+            self.assertLess(_rss() - rss, MAX_RSS_GROWTH)
+        window.close()
+
+    def test_pin_cycles_are_flat(self):
+        # captures as fast as the timer goes, a cycle takes a few of them
+        fps, conf.pin.max_fps = conf.pin.max_fps, 200
+        self.addCleanup(setattr, conf.pin, "max_fps", fps)
+        engine = _HandleEngine()
+        self._use_engine(engine)
+        window = main_window.Window()
+        objects = None
+        for i in range(PIN_CYCLES):
+            window.clip()
+            clip = window.fullscreen_widget
+            clip._on_pinned(QtCore.QRect(10, 10 + i % 20, 200, 30))
+            region = clip.pinned[-1]
+            region._screen = _StaticScreen(region._screen)
+            # the second capture settles and is recognized. once forgotten, the image settles again
+            self.assertTrue(self._wait(lambda: region.recognitions == 1 and not region._recognizing))
+            region._diff.reset()
+            self.assertTrue(self._wait(lambda: region.recognitions == 2 and not region._recognizing))
+            region.stop()
+            self._settle()
+            self.assertFalse(shiboken6.isValid(region))
+            if i == PIN_WARM_UP:
+                objects = _qt_objects(self.app)
+
+        self.assertEqual([], window.fullscreen_widget.pinned)
+        self.assertEqual(objects, _qt_objects(self.app))
+        # one engine handle per region rather than per recognition, and none left once they stopped
+        self.assertEqual(PIN_CYCLES, engine.created)
+        self.assertTrue(self._wait(lambda: engine.live == 0))
+        window.close()
+
+    def test_stop_while_recognizing(self):
+        engine = _HandleEngine(threading.Event())
+        self._use_engine(engine)
+        window = main_window.Window()
+        window.clip()
+        window.fullscreen_widget._on_pinned(QtCore.QRect(10, 10, 200, 30))
+        region = window.fullscreen_widget.pinned[-1]
+        region._screen = _StaticScreen(region._screen)
+        self.assertTrue(self._wait(engine.entered.is_set))
+
+        region.stop()
+        self._settle()
+        # the worker is still to emit its result to the region
+        self.assertTrue(shiboken6.isValid(region))
+        engine.gate.set()
+        deadline = time.monotonic() + 5
+        while shiboken6.isValid(region) and time.monotonic() < deadline:
+            self._settle()
+        self.assertFalse(shiboken6.isValid(region))
+        self.assertTrue(self._wait(lambda: engine.live == 0))
+        self.assertEqual(1, engine.created)
+        window.close()
+        self._settle()
+
+    def test_ocr_is_warmed_up_on_the_clip_ocr_thread(self):
+        # engine handles are per thread, the one created ahead of the first clip must be the one clips use
+        from component import prewarm
+        warmed, recognized = [], []
+        warm_up, read_qpixmap = ocr.warm_up, ocr.read_qpixmap
+        ocr.warm_up = lambda lang=None: warmed.append(threading.current_thread())
+
+        def read(image):
+            recognized.append(threading.current_thread())
+            return ocr.Text("clipped text", "eng")
+
+        ocr.read_qpixmap = read
+        self.addCleanup(setattr, ocr, "warm_up", warm_up)
+        self.addCleanup(setattr, ocr, "read_qpixmap", read_qpixmap)
+
+        window = main_window.Window()
+        prewarm.start(window.clip_window_imported_sig.emit).join(10)
+        self.assertTrue(self._wait(lambda: window.fullscreen_widget is not None))
+        window.clip()
+        clip = window.fullscreen_widget
+        clip._on_clipped_success(QtCore.QRect(10, 10, 300, 40))
+        self.assertTrue(self._wait(lambda: clip.findChildren(clip_window._TranslateLabel)))
+
+        self.assertEqual(1, len(warmed))
+        self.assertNotEqual(threading.main_thread(), warmed[0])
+        self.assertEqual(warmed, recognized)
+        window.close()
+        self._settle()
+
+    def _use_translator(self, t: translator.backend.Translator):
+        translator.init(translator=t)
+        self.addCleanup(translator.init, translator=translator.new_translator("libre", from_lang="auto", to_lang="zh",
+                                                                              url=self._server.url))
+
+    def test_unexpected_failure_is_shown(self):
+        t = _BlockingTranslator(fail=True)
+        t.release.set()
+        self._use_translator(t)
+        label = clip_window._TranslateLabel(None, "an unexpected failure")
+        self.addCleanup(label.deleteLater)
+        deadline = time.monotonic() + 5
+        while "failed to translate" not in label.label.text() and time.monotonic() < deadline:
+            self.app.processEvents(QtCore.QEventLoop.ProcessEventsFlag.AllEvents, 10)
+        self.assertIn("failed to translate: unexpected", label.label.text())
+
+    def test_label_deleted_while_translating(self):
+        errors = []
+        excepthook, threading.excepthook = threading.excepthook, errors.append
+        self.addCleanup(setattr, threading, "excepthook", excepthook)
+        for fail in (False, True):
+            t = _BlockingTranslator(fail)
+            self._use_translator(t)
+            label = clip_window._TranslateLabel(None, f"deleted while translating {fail}")
+            self.assertTrue(t.started.wait(5))
+            label.deleteLater()
+            self._settle()
+            self.assertFalse(shiboken6.isValid(label))
+            t.release.set()
+            self.assertTrue(t.finished.wait(5))
+            # the thread emits right after the translation returns
+            time.sleep(0.1)
+        self.assertEqual([], errors)
+
+    def test_replaced_text_is_not_recorded(self):
+        t = _BlockingTranslator()
+        self._use_translator(t)
+        label = clip_window._TranslateLabel(None, "a superseded text")
+        self.addCleanup(label.deleteLater)
+        self.assertTrue(t.started.wait(5))
+        label.set_text("the current text")
+        t.release.set()
+        deadline = time.monotonic() + 5
+        while "translated the current text" not in label.label.text() and time.monotonic() < deadline:
+            self.app.processEvents(QtCore.QEventLoop.ProcessEventsFlag.AllEvents, 10)
+        self.assertIn("translated the current text", label.label.text())
+        # the superseded thread stops right after its translation returns
+        time.sleep(0.1)
+        self.assertTrue(history.flush(5))
+        self.assertEqual([], history.search("superseded"))
+        self.assertEqual(["the current text"], [e.text for e in history.search("current")])
+
+    def test_close_frees_the_clip_window(self):
+        window = main_window.Window()
+        window.clip()
+        clip = window.fullscreen_widget
+        clip._on_pinned(QtCore.QRect(10, 10, 200, 30))
+        region = clip.pinned[-1]
+        window.close()
+        self._settle()
+        self.assertIsNone(window.fullscreen_widget)
+        self.assertFalse(shiboken6.isValid(clip))
+        self.assertFalse(shiboken6.isValid(region))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+import unittest
+
+# the main window should come up without the modules that only the first clip needs
+
+HEAVY_MODULES = ["numpy", "PIL", "requests", "translate", "pytesseract", "win32gui",
+                 "pkg.ocr", "pkg.translator", "component.clip_window"]
+# cumulative import time of main in microseconds, PySide6 itself is about a third of it
+IMPORT_BUDGET_US = 1_500_000
+
+
+def _import_main() -> tuple[set[str], dict[str, int]]:
+    # a fresh interpreter, so that nothing is imported yet
+    code = "import sys, main; print(','.join(sys.modules))"
+    env = {**os.environ, "QT_QPA_PLATFORM": "offscreen"}
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True,
+                          cwd=os.path.dirname(os.path.abspath(__file__)), env=env, check=True)
+
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, total, name = line.split("|")
+        if total.strip().isdigit():
+            cumulative[name.strip()] = int(total)
+    return set(proc.stdout.strip().split(",")), cumulative
+
+
+class TestStartup(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.modules, cls.cumulative = _import_main()
+
+    def test_heavy_modules_are_lazy(self):
+        self.assertEqual([], [m for m in HEAVY_MODULES if m in self.modules])
+
+    def test_import_budget(self):
+        self.assertLess(self.cumulative["main"], IMPORT_BUDGET_US)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from watchdog.events import FileModifiedEvent
+
+import ui
+
+# stands in for pyside6-uic: args are <ui file> -o <py file>, and a form containing "broken" fails
+_FAKE_UIC = [sys.executable, "-c",
+             "import sys; src = open(sys.argv[1]).read(); 'broken' in src and sys.exit(1); "
+             "open(sys.argv[3], 'w').write(f'# {src}\\n')"]
+
+
+class TestUiPyManager(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.ui_dir = os.path.join(tmp.name, "ui")
+        self.py_dir = os.path.join(tmp.name, "ui_py")
+        os.mkdir(self.ui_dir)
+        os.mkdir(self.py_dir)
+        self.manager = ui.UiPyManager(self.py_dir, uic=_FAKE_UIC)
+
+    def _write_ui(self, name: str, content: str):
+        with open(os.path.join(self.ui_dir, f"{name}.ui"), "w") as f:
+            f.write(content)
+
+    def _read_py(self, name: str) -> str:
+        with open(os.path.join(self.py_dir, f"{name}.py")) as f:
+            return f.read()
+
+    def test_only_changed_forms_are_regenerated(self):
+        for name in ["b", "a", "c"]:
+            self._write_ui(name, name)
+        self.manager.sync(self.ui_dir)
+        self.assertEqual(3, self.manager.runs)
+        self.assertEqual("from . import a\nfrom . import b\nfrom . import c\n", self._read_py("__init__"))
+
+        self._write_ui("b", "b2")
+        self.manager.sync(self.ui_dir)
+        self.manager.sync(self.ui_dir)
+        self.assertEqual(4, self.manager.runs)
+        self.assertEqual("# b2\n", self._read_py("b"))
+        # the same forms give the same __init__, without duplicate imports
+        self.assertEqual("from . import a\nfrom . import b\nfrom . import c\n", self._read_py("__init__"))
+
+    def test_removed_form(self):
+        self._write_ui("a", "a")
+        self._write_ui("b", "b")
+        self.manager.sync(self.ui_dir)
+        os.remove(os.path.join(self.ui_dir, "b.ui"))
+        self.manager.sync(self.ui_dir)
+        self.assertFalse(os.path.exists(os.path.join(self.py_dir, "b.py")))
+        self.assertEqual("from . import a\n", self._read_py("__init__"))
+
+    def test_failed_uic_keeps_output(self):
+        self._write_ui("a", "a")
+        self.manager.sync(self.ui_dir)
+        self._write_ui("a", "broken")
+        self.manager.sync(self.ui_dir)
+        self.assertEqual("# a\n", self._read_py("a"))
+        self.assertEqual(["__init__.py", "a.py"], sorted(os.listdir(self.py_dir)))
+        # not recorded as generated, the next sync tries again
+        self.manager.sync(self.ui_dir)
+        self.assertEqual(3, self.manager.runs)
+
+    def test_up_to_date_outputs_are_kept_on_start(self):
+        self._write_ui("a", "a")
+        self.manager.sync(self.ui_dir)
+        restarted = ui.UiPyManager(self.py_dir, uic=_FAKE_UIC)
+        restarted.sync(self.ui_dir)
+        self.assertEqual(0, restarted.runs)
+
+    def test_event_burst_is_debounced(self):
+        self._write_ui("a", "a")
+        synced = threading.Event()
+        handler = ui.UiEventHandler(self.ui_dir, self.manager, debounce=0.05)
+        sync = handler.sync
+        handler.sync = lambda: (sync(), synced.set())
+
+        ui_filepath = os.path.join(self.ui_dir, "a.ui")
+        for _ in range(20):
+            handler.on_any_event(FileModifiedEvent(ui_filepath))
+        # generated files do not trigger a sync
+        handler.on_any_event(FileModifiedEvent(os.path.join(self.py_dir, "a.py")))
+        self.assertTrue(synced.wait(5))
+        time.sleep(0.1)
+        self.assertEqual(1, self.manager.runs)
+
+
+if __name__ == '__main__':
+    unittest.main()
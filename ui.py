@@ -1,6 +1,9 @@
+import concurrent.futures
+import hashlib
 import os
 import subprocess
 import sys
+import threading
 from typing import override, LiteralString, AnyStr
 
 from watchdog import observers, events
@@ -10,39 +13,121 @@ from pkg import logs
 
 Str = AnyStr | LiteralString
 
+# designer writes a form as several events in a row, they are handled together after this many seconds of quiet
+DEBOUNCE = 0.2
+
 
 class UiPyManager:
-    def __init__(self, dir_path: Str):
+    # keeps the .py files in dir_path in sync with .ui files, only forms whose content changed are regenerated
+    def __init__(self, dir_path: Str, uic: list[str] | None = None, jobs: int | None = None):
         self.dir_path = dir_path
+        self.uic = uic or ["pyside6-uic"]
+        self.jobs = jobs or min(8, os.cpu_count() or 1)
+        # ui filepath -> content hash of the last successful generation
+        self._hashes: dict[str, str] = {}
+        self._lock = threading.Lock()
+        # uic runs since start
+        self.runs = 0
 
     @staticmethod
     def _get_filename_from_path(filepath: Str) -> str:
         filename = filepath.split(os.sep)[-1]
         return filename.split('.')[0]
 
-    def create(self, ui_filepath: Str):
+    def sync(self, ui_dir: Str):
+        # one sync at a time, a timer that fires during a sync waits for it and then finds nothing changed
+        with self._lock:
+            ui_filepaths = sorted(
+                os.sep.join([ui_dir, file]) for file in os.listdir(ui_dir) if file.endswith(".ui")
+            )
+            changed = {}
+            for ui_filepath in ui_filepaths:
+                digest = self._hash(ui_filepath)
+                if digest is not None and digest != self._hashes.get(ui_filepath) and self._stale(ui_filepath):
+                    changed[ui_filepath] = digest
+                elif digest is not None:
+                    self._hashes[ui_filepath] = digest
+
+            if changed:
+                self.runs += len(changed)
+                with concurrent.futures.ThreadPoolExecutor(self.jobs, thread_name_prefix="uic") as pool:
+                    done = pool.map(self.create, changed)
+                    for ui_filepath, ok in zip(changed, done):
+                        if ok:
+                            self._hashes[ui_filepath] = changed[ui_filepath]
+
+            for ui_filepath in set(self._hashes) - set(ui_filepaths):
+                self._remove(ui_filepath)
+            self._write_init(ui_filepaths)
+
+    def create(self, ui_filepath: Str) -> bool:
         py_filepath = self._py_filepath(ui_filepath)
-        args = ["pyside6-uic", ui_filepath, "-o", py_filepath]
+        # uic writes next to the target and the result replaces it in one step, an importer never sees half a file
+        tmp_filepath = f"{py_filepath}.tmp"
+        args = [*self.uic, ui_filepath, "-o", tmp_filepath]
         try:
-            subprocess.call(args)
+            result = subprocess.run(args, capture_output=True, text=True)
+            if result.returncode != 0:
+                logs.error(f"failed to create {py_filepath}: {result.stderr.strip()}")
+                return False
+            os.replace(tmp_filepath, py_filepath)
             logs.info(f"create {py_filepath} successfully")
-            with open(os.sep.join([self.dir_path, "__init__.py"]), "a") as f:
-                f.write(f"from . import {self._get_filename_from_path(py_filepath)}\n")
+            return True
 
         except Exception as e:
             logs.error(f"failed to create {ui_filepath}: {e}")
+            return False
+        finally:
+            if os.path.exists(tmp_filepath):
+                os.remove(tmp_filepath)
+
+    def _stale(self, ui_filepath: Str) -> bool:
+        # on the first pass the hash is unknown, an output newer than its form is kept
+        if ui_filepath in self._hashes:
+            return True
+        try:
+            return os.path.getmtime(self._py_filepath(ui_filepath)) < os.path.getmtime(ui_filepath)
+        except OSError:
+            return True
 
-    def clear(self):
-        logs.info(f"clear all file in {self.dir_path}")
-        for (_, _, files) in os.walk(self.dir_path):
-            for file in files:
-                if file.endswith("pyc"):
-                    continue
+    def _remove(self, ui_filepath: Str):
+        self._hashes.pop(ui_filepath, None)
+        py_filepath = self._py_filepath(ui_filepath)
+        try:
+            os.remove(py_filepath)
+            logs.info(f"remove {py_filepath}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logs.error(f"failed to delete {py_filepath}: {e}")
 
-                try:
-                    os.remove(os.sep.join([self.dir_path, file]))
-                except Exception as e:
-                    logs.error(f"failed to delete {file}: {e}")
+    def _write_init(self, ui_filepaths: list[str]):
+        names = sorted(self._get_filename_from_path(p) for p in ui_filepaths
+                       if os.path.exists(self._py_filepath(p)))
+        content = "".join(f"from . import {name}\n" for name in names)
+        init_filepath = os.sep.join([self.dir_path, "__init__.py"])
+        try:
+            with open(init_filepath) as f:
+                if f.read() == content:
+                    return
+        except FileNotFoundError:
+            pass
+
+        tmp_filepath = f"{init_filepath}.tmp"
+        with open(tmp_filepath, "w") as f:
+            f.write(content)
+        os.replace(tmp_filepath, init_filepath)
+        logs.info(f"write {init_filepath}")
+
+    @staticmethod
+    def _hash(ui_filepath: Str) -> str | None:
+        try:
+            with open(ui_filepath, "rb") as f:
+                return hashlib.sha1(f.read()).hexdigest()
+        except OSError as e:
+            # deleted or still being written, the event for the next write syncs it again
+            logs.debug("failed to read %s: %s", ui_filepath, e)
+            return None
 
     def _py_filepath(self, ui_filepath: Str) -> str:
         py_filename = f"{self._get_filename_from_path(ui_filepath)}.py"
@@ -50,21 +135,32 @@ class UiPyManager:
 
 
 class UiEventHandler(events.FileSystemEventHandler):
-    def __init__(self, dir_path: Str, pyfile_manager: UiPyManager):
+    def __init__(self, dir_path: Str, pyfile_manager: UiPyManager, debounce: float = DEBOUNCE):
         super().__init__()
         self.dir_path = dir_path
         self.pyfile_manager = pyfile_manager
+        self.debounce = debounce
+        self._timer: threading.Timer | None = None
+        self._lock = threading.Lock()
 
     @override
-    def on_modified(self, event: FileSystemEvent) -> None:
-        if event.is_directory:
+    def on_any_event(self, event: FileSystemEvent) -> None:
+        # only .ui files matter, which also ignores the files generated by the manager itself
+        if event.is_directory or event.event_type in ("opened", "closed", "closed_no_write"):
             return
+        paths = [event.src_path, getattr(event, "dest_path", "")]
+        if not any(str(p).endswith(".ui") for p in paths):
+            return
+
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self.sync)
+            self._timer.daemon = True
+            self._timer.start()
 
-        self.pyfile_manager.clear()
-        for (_, _, files) in os.walk(self.dir_path):
-            for file in files:
-                if file.endswith(".ui"):
-                    self.pyfile_manager.create(os.sep.join([self.dir_path, file]))
+    def sync(self):
+        self.pyfile_manager.sync(self.dir_path)
 
 
 def main():
@@ -74,8 +170,10 @@ def main():
     to_path = sys.argv[2] if len(sys.argv) > 2 else path
     logs.info(f"start watching dir: {path}, generate ui.py in {to_path}")
 
+    handler = UiEventHandler(path, UiPyManager(to_path))
+    handler.sync()
     observer = observers.Observer()
-    observer.schedule(UiEventHandler(path, UiPyManager(to_path)), path, True)
+    observer.schedule(handler, path, True)
     observer.start()
     observer.join()
 